@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Клиент сервера ассемблера: замена `python main.py <in> [<out>]`
+
+Файл ассемблируется запущенным сервером (`python main.py --serve`), так
+что каждый вызов платит только за запуск интерпретатора, а не за импорт
+и построение таблиц. Вывод и код возврата - как у main.py по умолчанию.
+Если сервер недоступен (не запущен, нет Unix-сокетов, например на
+Windows), файл ассемблируется в этом же процессе.
+
+Запуск: python asm_client.py [-q] <input> [<output>]
+"""
+
+import json
+import os
+import socket
+import stat
+import sys
+
+# Должны совпадать с assembler/server.py; модуль не импортируется,
+# чтобы клиент запускался быстро
+SOCKET_ENV = 'RISCV_ASM_SOCKET'
+SOCKET_NAME = 'riscv_asm.sock'
+
+
+def socket_path():
+    """
+    Путь сокета, как у default_socket_path в assembler/server.py. Личный
+    каталог во временном каталоге проверяется так же: к сокету в чужом
+    или открытом другим каталоге клиент не подключается (OSError)
+    """
+    path = os.environ.get(SOCKET_ENV)
+    if path:
+        return path
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR')
+    if runtime_dir:
+        return os.path.join(runtime_dir, SOCKET_NAME)
+    import tempfile
+    uid = os.getuid() if hasattr(os, 'getuid') else os.getpid()
+    directory = os.path.join(tempfile.gettempdir(), f"riscv_asm-{uid}")
+    info = os.lstat(directory)
+    if (not stat.S_ISDIR(info.st_mode) or info.st_mode & 0o077
+            or (hasattr(os, 'getuid') and info.st_uid != os.getuid())):
+        raise OSError(f"unsafe socket directory {directory}")
+    return os.path.join(directory, SOCKET_NAME)
+
+
+def request_server(request):
+    """
+    Один запрос к серверу.
+
+    Raises:
+        OSError: сервер недоступен
+    """
+    if not hasattr(socket, 'AF_UNIX'):
+        raise OSError("Unix domain sockets are not supported")
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(socket_path())
+        sock.sendall(json.dumps(request).encode() + b'\n')
+        with sock.makefile('rb') as reply:
+            line = reply.readline()
+    if not line:
+        raise OSError("server closed the connection")
+    return json.loads(line)
+
+
+def main(argv):
+    quiet = '-q' in argv
+    args = [arg for arg in argv if arg != '-q']
+    if not 1 <= len(args) <= 2 or any(arg.startswith('-') for arg in args):
+        print("Usage: asm_client.py [-q] <input> [<output>]", file=sys.stderr)
+        return 2
+
+    input_file = args[0]
+    output_file = args[1] if len(args) > 1 else os.path.splitext(input_file)[0] + ".bin"
+    if not os.path.exists(input_file):
+        print(f"Error: File '{input_file}' not found")
+        return 1
+
+    try:
+        response = request_server({'path': os.path.abspath(input_file),
+                                   'output': os.path.abspath(output_file)})
+    except OSError:
+        # Локальная сборка тем же кодом, что и main.py
+        sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+        import main as cli
+        verbosity = cli.QUIET if quiet else cli.NORMAL
+        return 0 if cli.compile_file(input_file, output_file, verbosity) else 1
+
+    if 'error' in response:
+        print(f"Error: {response['error']}")
+        return 1
+
+    for line_num, kind, message in response['diagnostics']:
+        if kind != 'WARNING' or not quiet:
+            print(f"Line {line_num}: {kind}: {message}")
+
+    if not response['ok']:
+        if not quiet:
+            print(f"{input_file}: compilation failed")
+        return 1
+
+    if not quiet:
+        instructions = response['instructions']
+        print(f"{input_file}: {instructions} instructions "
+              f"({instructions * 4} bytes) -> {output_file}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
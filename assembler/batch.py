@@ -0,0 +1,227 @@
+"""
+Пакетное ассемблирование множества файлов в пуле процессов
+"""
+
+import copy
+import glob
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from .instructions import INSTRUCTIONS
+from .engine import Assembler
+from .output import write_bin, remove_output
+from .source import read_source
+
+# Движок, кэш сборки и предел ошибок процесса-воркера: задаются один раз в _init_worker
+_assembler = None
+_cache = None
+_max_errors = None
+
+# Опции пакетной сборки, входящие в ключ кэша (предел ошибок добавляется при сборке)
+CACHE_OPTIONS = (('format', 'bin'), ('stop_on_error', False))
+
+
+class FileResult:
+    """Результат ассемблирования одного файла (передаётся из воркера)"""
+    def __init__(self, input_file, output_file):
+        self.input_file = input_file
+        self.output_file = output_file
+        self.ok = False
+        self.instructions = 0
+        self.diagnostics = []  # Строки "Line N: ВИД: сообщение"
+        self.elapsed = 0.0     # Время работы воркера над файлом
+        self.cached = False    # Результат взят из кэша сборки
+
+
+class BatchSummary:
+    """Итоги пакетного запуска"""
+    def __init__(self, results, workers, wall_time):
+        self.files = len(results)
+        self.failed = sum(1 for result in results if not result.ok)
+        self.instructions = sum(result.instructions for result in results)
+        self.workers = workers
+        self.wall_time = wall_time
+        self.busy_time = sum(result.elapsed for result in results)
+
+    def format(self):
+        """Сводка пропускной способности (в том числе на одно ядро)"""
+        wall = max(self.wall_time, 1e-9)
+        per_core = self.instructions / wall / self.workers
+        return (f"{self.files} files ({self.failed} failed), "
+                f"{self.instructions} instructions in {self.wall_time:.2f}s "
+                f"on {self.workers} worker(s): "
+                f"{self.files / wall:.1f} files/s, "
+                f"{self.instructions / wall:,.0f} instructions/s, "
+                f"{per_core:,.0f} instructions/s per core, "
+                f"utilization {self.busy_time / wall / self.workers:.0%}")
+
+
+def expand_inputs(patterns):
+    """
+    Список входных файлов в детерминированном порядке.
+
+    Каждый элемент - путь, glob-шаблон (раскрывается с сортировкой)
+    или @manifest: файл со списком путей/шаблонов по одному на строку.
+    """
+    files = []
+    for pattern in patterns:
+        if pattern.startswith('@'):
+            with open(pattern[1:], 'r') as f:
+                entries = [line.strip() for line in f]
+            files.extend(expand_inputs(entry for entry in entries
+                                       if entry and not entry.startswith('#')))
+        elif glob.has_magic(pattern):
+            files.extend(sorted(glob.glob(pattern, recursive=True)))
+        else:
+            files.append(pattern)
+    return files
+
+
+def output_path(input_file, out_dir=None):
+    """Имя выходного .bin файла для входного"""
+    base_name = os.path.splitext(input_file)[0]
+    if out_dir:
+        base_name = os.path.join(out_dir, os.path.basename(base_name))
+    return base_name + ".bin"
+
+
+def _output_clashes(work):
+    """
+    Задания, чьи выходные файлы совпадают с выходом другого входного
+    файла (с --out-dir остаётся только имя файла): номер задания ->
+    остальные входы с тем же выходом
+    """
+    by_output = {}
+    for index, (input_file, output_file) in enumerate(work):
+        key = os.path.normcase(os.path.abspath(output_file))
+        by_output.setdefault(key, []).append(index)
+
+    clashes = {}
+    for indices in by_output.values():
+        inputs = {os.path.normcase(os.path.abspath(work[index][0])) for index in indices}
+        if len(inputs) > 1:
+            for index in indices:
+                clashes[index] = [work[other][0] for other in indices if other != index]
+    return clashes
+
+
+def _init_worker(cache=None, max_errors=None):
+    """Инициализация процесса: один Parser/Compiler на воркер"""
+    global _assembler, _cache, _max_errors
+    _assembler = Assembler(INSTRUCTIONS)
+    _cache = cache
+    _max_errors = max_errors
+
+
+def _format_diagnostic(diagnostic):
+    line_num, kind, message = diagnostic
+    return f"Line {line_num}: {kind}: {message}"
+
+
+def _assemble_job(job):
+    """Ассемблирование одного файла в воркере"""
+    input_file, output_file = job
+    result = FileResult(input_file, output_file)
+    start = time.perf_counter()
+
+    try:
+        code = read_source(input_file)
+
+        if _cache is not None:
+            options = CACHE_OPTIONS + (('max_errors', _max_errors),)
+            key = _cache.key(code, options)
+            entry = _cache.lookup(key)
+            if entry is not None:
+                # Неизменённый файл: образ и диагностика из кэша
+                result.cached = True
+                result.diagnostics = [_format_diagnostic(d) for d in entry.diagnostics]
+                if entry.ok:
+                    _cache.restore(entry, output_file)
+                    result.instructions = entry.instructions
+                    result.ok = True
+                result.elapsed = time.perf_counter() - start
+                return result
+
+        assembled = _assembler.assemble(code.split('\n'), max_errors=_max_errors)
+        diagnostics = assembled.diagnostics()
+        result.diagnostics = [_format_diagnostic(d) for d in diagnostics]
+
+        ok = not assembled.has_errors
+        if _cache is not None:
+            _cache.store(key, ok, assembled.machine_code, diagnostics)
+
+        if ok:
+            # Старый файл мог быть жёсткой ссылкой на запись кэша
+            remove_output(output_file)
+            with open(output_file, 'wb') as f:
+                write_bin(f, assembled.machine_code)
+            result.instructions = len(assembled.machine_code)
+            result.ok = True
+    except (OSError, ValueError) as e:
+        # В том числе UnicodeDecodeError: файл не в UTF-8 - ошибка этого файла, а не всего пакета
+        result.diagnostics.append(f"Error: {e}")
+    except Exception as e:
+        result.diagnostics.append(f"Unexpected error: {e}")
+
+    result.elapsed = time.perf_counter() - start
+    return result
+
+
+def run_batch(input_files, jobs=None, out_dir=None, cache=None, max_errors=None):
+    """
+    Ассемблирование файлов в пуле процессов.
+
+    cache (BuildCache или None) передаётся воркерам: неизменённые
+    файлы берутся из кэша без разбора. Воркеры только пишут записи, а
+    лишние записи удаляются один раз, после всех файлов. max_errors -
+    предел ошибок на файл (None - все ошибки).
+
+    Результаты возвращаются в порядке input_files, независимо от того,
+    в каком порядке их закончили воркеры. Файлы, у которых выходной файл
+    совпал с выходом другого входа, не собираются: это ошибка каждого из
+    них, а не молчаливая перезапись.
+
+    Returns:
+        (список FileResult, BatchSummary)
+    """
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+
+    worker_cache = None
+    if cache is not None:
+        worker_cache = copy.copy(cache)
+        worker_cache.auto_evict = False
+
+    all_work = [(input_file, output_path(input_file, out_dir)) for input_file in input_files]
+    clashes = _output_clashes(all_work)
+    work = [job for index, job in enumerate(all_work) if index not in clashes]
+    workers = max(1, min(jobs or os.cpu_count() or 1, len(work) or 1))
+    start = time.perf_counter()
+
+    if workers == 1:
+        # Без пула: тот же код, но без накладных расходов на процессы
+        _init_worker(worker_cache, max_errors)
+        results = [_assemble_job(job) for job in work]
+    else:
+        # Мелкие файлы отдаются пачками, чтобы не платить за IPC на каждый
+        chunksize = max(1, len(work) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(worker_cache, max_errors)) as executor:
+            results = list(executor.map(_assemble_job, work, chunksize=chunksize))
+
+    if clashes:
+        done = iter(results)
+        results = []
+        for index, (input_file, output_file) in enumerate(all_work):
+            if index not in clashes:
+                results.append(next(done))
+                continue
+            result = FileResult(input_file, output_file)
+            result.diagnostics.append(f"Error: output file '{output_file}' is also the output of "
+                                      + ", ".join(f"'{other}'" for other in clashes[index]))
+            results.append(result)
+
+    if cache is not None and any(not result.cached for result in results):
+        cache.evict()
+
+    return results, BatchSummary(results, workers, time.perf_counter() - start)
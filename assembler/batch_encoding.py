@@ -0,0 +1,167 @@
+"""
+Пакетное кодирование инструкций из массивов NumPy
+
+Для сгенерированных потоков инструкций: поля задаются массивами
+(номер мнемоники, rd, rs1, rs2, imm), результат - массив uint32 тех же
+слов, что дал бы Compiler.compile_instruction. Упаковка по форматам и
+проверки диапазонов выполняются векторно; при ошибке исключение
+содержит номера всех неверных элементов.
+"""
+
+from .instructions import INSTRUCTIONS
+from .errors import BatchEncodingError
+
+try:
+    import numpy as np
+except ImportError:  # NumPy необязателен
+    np = None
+
+# Поля-операнды каждого формата (остальные поля игнорируются)
+FORMAT_FIELDS = {
+    'R': ('rd', 'rs1', 'rs2'),
+    'I': ('rd', 'rs1', 'imm'),
+    'S': ('rs1', 'rs2', 'imm'),
+    'B': ('rs1', 'rs2', 'imm'),
+    'U': ('rd', 'imm'),
+    'J': ('rd', 'imm'),
+}
+
+# Векторные упаковщики: те же формулы, что у pack_* из encoding
+
+def vpack_r(rd, rs1, rs2, imm):
+    return (rs2 & 0x1F) << 20 | (rs1 & 0x1F) << 15 | (rd & 0x1F) << 7
+
+def vpack_i(rd, rs1, rs2, imm):
+    return (imm & 0xFFF) << 20 | (rs1 & 0x1F) << 15 | (rd & 0x1F) << 7
+
+def vpack_s(rd, rs1, rs2, imm):
+    return (((imm >> 5) & 0x7F) << 25 | (rs2 & 0x1F) << 20
+            | (rs1 & 0x1F) << 15 | (imm & 0x1F) << 7)
+
+def vpack_b(rd, rs1, rs2, imm):
+    return (((imm >> 12) & 0x1) << 31 | ((imm >> 5) & 0x3F) << 25
+            | (rs2 & 0x1F) << 20 | (rs1 & 0x1F) << 15
+            | ((imm >> 1) & 0xF) << 8 | ((imm >> 11) & 0x1) << 7)
+
+def vpack_u(rd, rs1, rs2, imm):
+    return (imm & 0xFFFFF000) | (rd & 0x1F) << 7
+
+def vpack_j(rd, rs1, rs2, imm):
+    return (((imm >> 20) & 0x1) << 31 | ((imm >> 1) & 0x3FF) << 21
+            | ((imm >> 11) & 0x1) << 20 | ((imm >> 12) & 0xFF) << 12
+            | (rd & 0x1F) << 7)
+
+VECTOR_PACKERS = {
+    'R': vpack_r,
+    'I': vpack_i,
+    'S': vpack_s,
+    'B': vpack_b,
+    'U': vpack_u,
+    'J': vpack_j,
+}
+
+# Проверки непосредственных значений, как в pack_*: (сообщение, условие ошибки)
+IMMEDIATE_CHECKS = {
+    'I': [("out of range for I-format", lambda imm: (imm < -2048) | (imm > 2047))],
+    'S': [("out of range for S-format", lambda imm: (imm < -2048) | (imm > 2047))],
+    'B': [("B-format immediate must be 2-byte aligned", lambda imm: imm % 2 != 0),
+          ("out of range for B-format", lambda imm: (imm < -4096) | (imm > 4094))],
+    'J': [("J-format immediate must be 2-byte aligned", lambda imm: imm % 2 != 0)],
+}
+
+
+class BatchEncoder:
+    """Векторное кодирование по таблице инструкций"""
+
+    def __init__(self, instructions_def=INSTRUCTIONS):
+        if np is None:
+            raise RuntimeError("NumPy is required for batch encoding")
+
+        # Номер мнемоники - позиция в таблице
+        self.defs = [instr_def for instr_def in instructions_def.values()
+                     if instr_def.format_type in VECTOR_PACKERS]
+        self.ids = {instr_def.name: number for number, instr_def in enumerate(self.defs)}
+
+    def mnemonic_ids(self, names):
+        """Массив номеров мнемоник по списку имён"""
+        try:
+            return np.array([self.ids[name] for name in names], dtype=np.int64)
+        except KeyError as e:
+            raise BatchEncodingError(f"Unknown instruction: {e.args[0]}", [])
+
+    def encode(self, mnemonic, rd=None, rs1=None, rs2=None, imm=None):
+        """
+        Кодирование массива инструкций.
+
+        Args:
+            mnemonic: номера мнемоник (self.ids) - массив или одно число
+            rd, rs1, rs2, imm: массивы полей (или числа); поля, не
+                нужные формату инструкции, игнорируются, отсутствующие
+                считаются нулями
+
+        Returns:
+            массив uint32 машинных слов
+
+        Raises:
+            BatchEncodingError: неизвестная мнемоника, номер регистра вне
+                0..31 или непосредственное значение, которое не принял бы
+                упаковщик формата; indices - номера всех таких элементов
+        """
+        fields = {'rd': rd, 'rs1': rs1, 'rs2': rs2, 'imm': imm}
+        count = max([np.size(mnemonic)] + [np.size(value) for value in fields.values()
+                                            if value is not None])
+        mnemonic = self._column(mnemonic, count, 'mnemonic')
+        fields = {name: self._column(value, count, name) for name, value in fields.items()}
+
+        self._check("Unknown instruction id", (mnemonic < 0) | (mnemonic >= len(self.defs)))
+
+        words = np.zeros(count, dtype=np.int64)
+        for number, instr_def in enumerate(self.defs):
+            selected = mnemonic == number
+            if not selected.any():
+                continue
+            format_type = instr_def.format_type
+            values = {name: column[selected] for name, column in fields.items()}
+
+            for name in FORMAT_FIELDS[format_type]:
+                if name != 'imm':
+                    bad = (values[name] < 0) | (values[name] > 31)
+                    self._check(f"{instr_def.name}: register {name} out of range [0, 31]", bad, selected)
+            for message, condition in IMMEDIATE_CHECKS.get(format_type, ()):
+                self._check(f"{instr_def.name}: immediate value {message}",
+                            condition(values['imm']), selected)
+
+            words[selected] = instr_def.base_word | VECTOR_PACKERS[format_type](**values)
+
+        return words.astype(np.uint32)
+
+    @staticmethod
+    def _column(value, count, name):
+        """Поле как массив int64 длины count (число размножается)"""
+        if value is None:
+            return np.zeros(count, dtype=np.int64)
+        column = np.asarray(value)
+        if column.dtype.kind not in 'iub':
+            raise BatchEncodingError(f"Field {name} must be an integer array, got {column.dtype}", [])
+        column = column.astype(np.int64)
+        if column.ndim == 0:
+            return np.full(count, column, dtype=np.int64)
+        if column.shape != (count,):
+            raise BatchEncodingError(f"Field {name} has shape {column.shape}, expected ({count},)", [])
+        return column
+
+    @staticmethod
+    def _check(message, bad, selected=None):
+        """
+        Ошибка, если условие bad истинно хоть для одного элемента.
+
+        Args:
+            selected: маска элементов всего массива, для которых вычислено
+                bad (None - bad вычислено для всех элементов)
+        """
+        if not bad.any():
+            return
+        indices = np.flatnonzero(bad)
+        if selected is not None:
+            indices = np.flatnonzero(selected)[indices]
+        raise BatchEncodingError(message, indices)
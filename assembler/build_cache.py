@@ -0,0 +1,232 @@
+"""
+Кэш сборки на диске с адресацией по содержимому
+
+Ключ - SHA-256 от исходника, отпечатка ассемблера (исходные тексты
+пакета assembler, включая таблицу инструкций) и опций сборки. Запись
+хранит готовый .bin и диагностику, поэтому попадание в кэш не требует
+разбора. Размер кэша ограничен; при превышении удаляются записи, к
+которым дольше всего не обращались (LRU по времени изменения).
+
+Суммарный размер считается обходом каталога один раз на объект кэша и
+дальше ведётся при каждой записи: каталог обходится снова, только когда
+предел превышен и нужно выбрать записи для удаления. Пакетная сборка
+отключает удаление в воркерах (auto_evict) и вызывает evict один раз, в
+конце.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+from .output import write_bin, remove_output
+
+# Версия формата записей: смена делает старые записи недостижимыми
+CACHE_FORMAT = 1
+
+# Ограничение размера кэша по умолчанию
+DEFAULT_MAX_SIZE = 64 * 1024 * 1024
+
+# Переменная окружения с каталогом кэша
+CACHE_DIR_ENV = 'RISCV_ASM_CACHE_DIR'
+
+_fingerprint = None
+
+
+def _file_size(path):
+    """Размер файла или 0, если его нет"""
+    try:
+        return os.stat(path).st_size
+    except OSError:
+        return 0
+
+
+def default_cache_dir():
+    """Каталог кэша: $RISCV_ASM_CACHE_DIR или ~/.cache/riscv_asm"""
+    directory = os.environ.get(CACHE_DIR_ENV)
+    if directory:
+        return directory
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'riscv_asm')
+
+
+def assembler_fingerprint():
+    """
+    Отпечаток ассемблера: хэш исходных текстов модулей пакета.
+
+    Меняется при любой правке таблицы инструкций, проверок, парсера
+    или кодировщика, поэтому старые записи кэша не переиспользуются.
+    """
+    global _fingerprint
+    if _fingerprint is None:
+        package_dir = os.path.dirname(os.path.abspath(__file__))
+        digest = hashlib.sha256()
+        for name in sorted(os.listdir(package_dir)):
+            if name.endswith('.py'):
+                digest.update(name.encode())
+                with open(os.path.join(package_dir, name), 'rb') as f:
+                    digest.update(f.read())
+        _fingerprint = digest.hexdigest()
+    return _fingerprint
+
+
+class CacheEntry:
+    """Запись кэша: итог сборки и путь к сохранённому образу"""
+    def __init__(self, ok, instructions, diagnostics, bin_path):
+        self.ok = ok
+        self.instructions = instructions
+        self.diagnostics = diagnostics  # Тройки (номер строки, вид, сообщение)
+        self.bin_path = bin_path
+
+
+class BuildCache:
+    """Кэш собранных образов в каталоге directory"""
+
+    def __init__(self, directory=None, max_size=DEFAULT_MAX_SIZE, link=False):
+        """
+        Args:
+            directory: каталог кэша (по умолчанию default_cache_dir())
+            max_size: ограничение суммарного размера файлов кэша в байтах
+            link: восстанавливать образ жёсткой ссылкой вместо копии;
+                такой выходной файл нельзя менять на месте - правка
+                испортит запись кэша
+        """
+        self.directory = directory or default_cache_dir()
+        self.max_size = max_size
+        self.link = link
+        self.auto_evict = True  # store следит за пределом размера
+        self._size = None  # Суммарный размер файлов кэша (None - ещё не подсчитан)
+
+    def key(self, source, options=()):
+        """
+        Ключ записи.
+
+        Args:
+            source: текст исходника
+            options: опции, влияющие на результат, - пары (имя, значение)
+        """
+        digest = hashlib.sha256()
+        digest.update(f"{CACHE_FORMAT}\0{assembler_fingerprint()}\0".encode())
+        digest.update(json.dumps(sorted(options)).encode())
+        digest.update(b'\0')
+        digest.update(source.encode('utf-8', 'surrogatepass'))
+        return digest.hexdigest()
+
+    def lookup(self, key):
+        """Запись по ключу или None; попадание обновляет время доступа"""
+        meta_path, bin_path = self._paths(key)
+        try:
+            with open(meta_path, 'r') as f:
+                meta = json.load(f)
+            if meta['ok'] and not os.path.exists(bin_path):
+                return None
+            os.utime(meta_path)
+            if meta['ok']:
+                os.utime(bin_path)
+        except (OSError, ValueError, KeyError):
+            return None
+
+        diagnostics = [tuple(diagnostic) for diagnostic in meta['diagnostics']]
+        return CacheEntry(meta['ok'], meta['instructions'], diagnostics, bin_path)
+
+    def restore(self, entry, output_file):
+        """Образ из записи в output_file: жёсткая ссылка или копия"""
+        # Старый файл удаляется, а не перезаписывается: он может быть
+        # ссылкой на другую запись кэша
+        remove_output(output_file)
+        if self.link:
+            try:
+                os.link(entry.bin_path, output_file)
+                return
+            except OSError:
+                pass  # Другая файловая система или ссылки не поддерживаются
+        shutil.copyfile(entry.bin_path, output_file)
+
+    def store(self, key, ok, machine_code, diagnostics):
+        """
+        Сохранение результата сборки.
+
+        Args:
+            ok: сборка успешна (образ сохраняется только в этом случае)
+            machine_code: машинный код
+            diagnostics: тройки (номер строки, вид, сообщение)
+        """
+        meta_path, bin_path = self._paths(key)
+        meta = {
+            'ok': ok,
+            'instructions': len(machine_code) if ok else 0,
+            'diagnostics': [list(diagnostic) for diagnostic in diagnostics],
+        }
+
+        if self.auto_evict and self._size is None:
+            self._size = self._scan()[1]
+        # Запись по тому же ключу заменяет прежние файлы
+        replaced = _file_size(meta_path) + _file_size(bin_path) if self.auto_evict else 0
+
+        try:
+            os.makedirs(os.path.dirname(meta_path), exist_ok=True)
+            # Образ пишется раньше метаданных: запись без образа не видна
+            if ok:
+                self._write_atomic(bin_path, 'wb', lambda f: write_bin(f, machine_code))
+            self._write_atomic(meta_path, 'w', lambda f: json.dump(meta, f))
+        except OSError:
+            self._size = None  # Неизвестно, что успело записаться
+            return  # Кэш - только ускорение: ошибки записи не мешают сборке
+
+        if not self.auto_evict:
+            return
+        self._size += _file_size(meta_path) + _file_size(bin_path) - replaced
+        if self._size > self.max_size:
+            self.evict()
+
+    def evict(self):
+        """
+        Удаление давно не использованных записей сверх max_size (обход
+        всего каталога; store вызывает его, только когда предел превышен)
+        """
+        files, total = self._scan()
+        files.sort()
+        for _, size, path in files:
+            if total <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+        self._size = total
+
+    def _scan(self):
+        """Файлы кэша - тройки (время изменения, размер, путь) - и их суммарный размер"""
+        files = []
+        total = 0
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+        return files, total
+
+    def _paths(self, key):
+        """Пути метаданных и образа записи (подкаталог по первым цифрам ключа)"""
+        base = os.path.join(self.directory, key[:2], key)
+        return base + '.json', base + '.bin'
+
+    def _write_atomic(self, path, mode, write):
+        """Запись во временный файл и атомарная замена"""
+        # tempfile нужен только при промахе: попадание в кэш его не грузит
+        import tempfile
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, mode) as f:
+                write(f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
@@ -2,139 +2,125 @@
 Генератор машинного кода
 """
 
+from .encoding import REG, IMM
+from .registers import REGISTER_NUMBERS
+
+
+def compile_error_message(instr_def, args, error):
+    """Текст ошибки кодирования инструкции с её текстовыми аргументами"""
+    return f"Failed to compile {instr_def.name} {args}: {error}"
+
+
+# Основание числа по префиксу, как в Parser.read_immediate
+_PREFIX_BASES = {'0x': 16, '0X': 16, '0b': 2, '0B': 2}
+
+# Форматы, где метка в непосредственном операнде не принимается (Parser.parse_operands)
+_PC_RELATIVE_FORMATS = ('B', 'J')
+
+_NO_LABELS = {}
+
+
+def _int_immediate(text, labels):
+    """
+    Десятичное, шестнадцатеричное или двоичное число либо адрес известной
+    метки; None - нужен полный разбор (Parser.read_immediate)
+    """
+    base = _PREFIX_BASES.get(text[:2])
+    if base is not None:
+        return int(text, base)
+    if text.isdecimal() or (text[:1] == '-' and text[1:].isdecimal()):
+        return int(text)
+    # Метки ищутся по имени в нижнем регистре, как в Parser.read_immediate
+    if text.islower():
+        return labels.get(text)
+    return None
+
+
+def _fast_encoder(instr_def):
+    """
+    Кодирование инструкции без разбора в кортеж: регистры - только из
+    REGISTER_NUMBERS, число или известная метка. Возвращает функцию от
+    аргументов и таблицы меток парсера: слово, None или исключение
+    KeyError/ValueError - нужен полный разбор (значение вне диапазона
+    формата отвергает упаковщик)
+    """
+    pack = instr_def.pack
+    base = instr_def.base_word
+    kinds = instr_def.operand_kinds
+    registers = REGISTER_NUMBERS
+    accepts_labels = instr_def.format_type not in _PC_RELATIVE_FORMATS
+
+    if kinds == (REG, REG, REG):
+        def fast(args, labels):
+            rd, rs1, rs2 = args
+            return pack(base, registers[rd], registers[rs1], registers[rs2])
+    elif kinds == (REG, REG, IMM):
+        def fast(args, labels):
+            first, second, imm = args
+            imm = _int_immediate(imm, labels if accepts_labels else _NO_LABELS)
+            if imm is None:
+                return None
+            return pack(base, registers[first], registers[second], imm)
+    elif kinds == (REG, IMM):
+        def fast(args, labels):
+            rd, imm = args
+            imm = _int_immediate(imm, labels if accepts_labels else _NO_LABELS)
+            if imm is None:
+                return None
+            return pack(base, registers[rd], imm)
+    else:
+        def fast(args, labels):
+            return None
+    return fast
+
+
 class Compiler:
     def __init__(self, parser):
         self.parser = parser
-    
-    def compile_instruction(self, instr_def, args):
-        """Компиляция одной инструкции в машинный код"""
+        self._fast = {}  # InstructionDef -> _fast_encoder
+
+    def encode(self, instr_def, operands):
+        """
+        Упаковка разобранных операндов (Parser.parse_operands, целые числа)
+        в машинное слово без исключений: (слово, None) или (None,
+        сообщение), если формат не принимает непосредственное значение
+        """
+        check = instr_def.immediate_error
+        if check is not None:
+            error = check(operands[-1])
+            if error is not None:
+                return None, error
+        return instr_def.pack(instr_def.base_word, *operands), None
+
+    def encode_args(self, instr_def, args):
+        """
+        Быстрое кодирование инструкции с текстовыми аргументами в обычном
+        случае - регистры из таблицы, число или уже известная метка - без
+        кортежа операндов. None - нужен полный разбор (parse_operands и
+        encode): другие написания, ещё не определённая метка, ошибка
+        """
+        fast = self._fast.get(instr_def)
+        if fast is None:
+            fast = self._fast[instr_def] = _fast_encoder(instr_def)
         try:
-            if instr_def.format_type == 'R':
-                return self._compile_r_format(instr_def, args)
-            elif instr_def.format_type == 'I':
-                return self._compile_i_format(instr_def, args)
-            elif instr_def.format_type == 'S':
-                return self._compile_s_format(instr_def, args)
-            elif instr_def.format_type == 'B':
-                return self._compile_b_format(instr_def, args)
-            elif instr_def.format_type == 'U':
-                return self._compile_u_format(instr_def, args)
-            elif instr_def.format_type == 'J':
-                return self._compile_j_format(instr_def, args)
-            else:
-                raise ValueError(f"Unknown format type: {instr_def.format_type}")
-        except Exception as e:
-            raise ValueError(f"Failed to compile {instr_def.name} {args}: {str(e)}")
-    # ПРОВЕРЕНО ✅✅✅
-    def _compile_r_format(self, instr_def, args):
-        """R-формат: opcode rd rs1 rs2 funct3 funct7"""
-        rd = self.parser.parse_register(args[0])
-        rs1 = self.parser.parse_register(args[1])
-        rs2 = self.parser.parse_register(args[2])
-        
-        instruction = 0
-        instruction |= (instr_def.funct7 & 0x7F) << 25
-        instruction |= (rs2 & 0x1F) << 20
-        instruction |= (rs1 & 0x1F) << 15
-        instruction |= (instr_def.funct3 & 0x7) << 12
-        instruction |= (rd & 0x1F) << 7
-        instruction |= (instr_def.opcode & 0x7F)
-        
-        return instruction
-    
-    # ПРОВЕРЕНО ✅✅✅
-    def _compile_i_format(self, instr_def, args):
-        """I-формат: opcode rd rs1 imm[11:0]"""
-        rd = self.parser.parse_register(args[0])
-        rs1 = self.parser.parse_register(args[1])
-        imm = self.parser.parse_immediate(args[2])
-        
-        # Проверка диапазона
-        if not (-2048 <= imm <= 2047):
-            raise ValueError(f"Immediate value {imm} out of range for I-format")
-        
-        instruction = 0
-        instruction |= (imm & 0xFFF) << 20
-        instruction |= (rs1 & 0x1F) << 15
-        instruction |= (instr_def.funct3 & 0x7) << 12
-        instruction |= (rd & 0x1F) << 7
-        instruction |= (instr_def.opcode & 0x7F)
-        
-        return instruction
-    # НЕ ПРОВЕРЕНО! (От DeepSeek)
-    def _compile_s_format(self, instr_def, args):
-        """S-формат: opcode imm[11:5] rs2 rs1 funct3 imm[4:0]"""
-        rs1 = self.parser.parse_register(args[0])
-        rs2 = self.parser.parse_register(args[1])
-        imm = self.parser.parse_immediate(args[2])
-        
-        # Проверка диапазона
-        if not (-2048 <= imm <= 2047):
-            raise ValueError(f"Immediate value {imm} out of range for S-format")
-        
-        instruction = 0
-        instruction |= ((imm >> 5) & 0x7F) << 25
-        instruction |= (rs2 & 0x1F) << 20
-        instruction |= (rs1 & 0x1F) << 15
-        instruction |= (instr_def.funct3 & 0x7) << 12
-        instruction |= (imm & 0x1F) << 7
-        instruction |= (instr_def.opcode & 0x7F)
-        
-        return instruction
-    # НЕ ПРОВЕРЕНО!!! (От DeepSeek)
-    def _compile_b_format(self, instr_def, args):
-        """B-формат: opcode imm[12|10:5] rs2 rs1 funct3 imm[4:1|11]"""
-        rs1 = self.parser.parse_register(args[0])
-        rs2 = self.parser.parse_register(args[1])
-        imm = self.parser.parse_immediate(args[2])
-        
-        # Проверка выравнивания
-        if imm % 2 != 0:
-            raise ValueError(f"B-format immediate must be 2-byte aligned")
-        
-        # Проверка диапазона
-        if not (-4096 <= imm <= 4094):
-            raise ValueError(f"Immediate value {imm} out of range for B-format")
-        
-        instruction = 0
-        instruction |= ((imm >> 12) & 0x1) << 31
-        instruction |= ((imm >> 5) & 0x3F) << 25
-        instruction |= (rs2 & 0x1F) << 20
-        instruction |= (rs1 & 0x1F) << 15
-        instruction |= (instr_def.funct3 & 0x7) << 12
-        instruction |= ((imm >> 1) & 0xF) << 8
-        instruction |= ((imm >> 11) & 0x1) << 7
-        instruction |= (instr_def.opcode & 0x7F)
-        
-        return instruction
-    # НЕ ПРОВЕРЕНО!!! (От DeepSeek)
-    def _compile_u_format(self, instr_def, args):
-        """U-формат: opcode rd imm[31:12]"""
-        rd = self.parser.parse_register(args[0])
-        imm = self.parser.parse_immediate(args[1])
-        
-        instruction = 0
-        instruction |= (imm & 0xFFFFF000)  # imm[31:12]
-        instruction |= (rd & 0x1F) << 7
-        instruction |= (instr_def.opcode & 0x7F)
-        
-        return instruction
-    # НЕ ПРОВЕРЕНО!!! (От DeepSeek)
-    def _compile_j_format(self, instr_def, args):
-        """J-формат: opcode rd imm[20|10:1|11|19:12]"""
-        rd = self.parser.parse_register(args[0])
-        imm = self.parser.parse_immediate(args[1])
-        
-        # Проверка выравнивания
-        if imm % 2 != 0:
-            raise ValueError(f"J-format immediate must be 2-byte aligned")
-        
-        instruction = 0
-        instruction |= ((imm >> 20) & 0x1) << 31
-        instruction |= ((imm >> 1) & 0x3FF) << 21
-        instruction |= ((imm >> 11) & 0x1) << 20
-        instruction |= ((imm >> 12) & 0xFF) << 12
-        instruction |= (rd & 0x1F) << 7
-        instruction |= (instr_def.opcode & 0x7F)
-        
-        return instruction
\ No newline at end of file
+            return fast(args, self.parser.labels)
+        except (KeyError, ValueError, TypeError):
+            return None
+
+    def compile_instruction(self, instr_def, args):
+        """Компиляция одной инструкции с текстовыми аргументами в машинный код; ValueError при ошибке"""
+        word = self.encode_args(instr_def, args)
+        if word is not None:
+            return word
+
+        operands, symbol, error = self.parser.parse_operands(instr_def, args)
+        message = error[2] if error is not None else None
+        if message is None and symbol is not None:
+            # Метка ищется среди уже известных парсеру
+            address, message = self.parser.read_immediate(args[-1])
+            operands += (address,)
+        if message is None:
+            word, message = self.encode(instr_def, operands)
+        if message is not None:
+            raise ValueError(compile_error_message(instr_def, args, message))
+        return word
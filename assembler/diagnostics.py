@@ -0,0 +1,101 @@
+"""
+Структурированная диагностика сборки
+
+Парсер и кодировщик не бросают исключений на ошибках в исходнике: они
+возвращают описание ошибки (код, номер слова в строке, сообщение), а
+движок складывает его в DiagnosticSink. На входах, где ошибок много
+(проверка недописанного кода в редакторе), создание исключений с
+трассировкой стека стоило дороже самого разбора.
+"""
+
+from collections import namedtuple
+from .lexer import word_column
+
+# Коды диагностик
+UNKNOWN_INSTRUCTION = 'unknown-instruction'
+OPERAND_COUNT = 'operand-count'
+CHECK_ERROR = 'check-error'          # Проверка инструкции вернула ошибку
+CHECK_FAILED = 'check-failed'        # Проверка инструкции упала с исключением
+INVALID_OPERAND = 'invalid-operand'  # Неверный регистр или число
+INVALID_IMMEDIATE = 'invalid-immediate'  # Значение, которое не принимает формат
+UNDEFINED_LABEL = 'undefined-label'
+DUPLICATE_LABEL = 'duplicate-label'  # Метка уже определена выше
+CHECK_WARNING = 'check-warning'
+
+# Код -> вид в текстовом выводе ("Line N: ВИД: сообщение")
+KINDS = {
+    UNKNOWN_INSTRUCTION: 'PARSE ERROR',
+    OPERAND_COUNT: 'ERROR',
+    CHECK_ERROR: 'ERROR',
+    CHECK_FAILED: 'ERROR',
+    INVALID_OPERAND: 'COMPILATION ERROR',
+    INVALID_IMMEDIATE: 'COMPILATION ERROR',
+    UNDEFINED_LABEL: 'COMPILATION ERROR',
+    DUPLICATE_LABEL: 'ERROR',
+    CHECK_WARNING: 'WARNING',
+}
+
+
+class Diagnostic(namedtuple('Diagnostic', ['line', 'column', 'code', 'message'])):
+    """Одна диагностика; column - позиция слова в строке, считая с 1 (0 - вся строка)"""
+    __slots__ = ()
+
+    @property
+    def kind(self):
+        return KINDS[self.code]
+
+    @property
+    def is_error(self):
+        return self.code != CHECK_WARNING
+
+    def __str__(self):
+        return f"Line {self.line}:{self.column}: {self.kind} [{self.code}]: {self.message}"
+
+
+class DiagnosticSink:
+    """
+    Сборщик диагностик без исключений.
+
+    Столбец считается сразу в report: текст строки не хранится, так что
+    память на диагностику не зависит от длины строки, а потоковая сборка
+    не держит строки с предупреждениями до конца файла.
+
+    max_errors - сколько ошибок собрать до остановки сборки (None - без
+    предела); full становится истинным, когда предел достигнут.
+    """
+
+    def __init__(self, max_errors=None):
+        self.max_errors = max_errors
+        self._entries = []      # Diagnostic в порядке поступления
+        self.error_count = 0
+        self.warning_count = 0
+
+    def report(self, line, code, message, source='', word=None):
+        """Диагностика строки line; word - номер слова в source (None - вся строка)"""
+        self._entries.append(Diagnostic(line, word_column(source, word) if word is not None else 0,
+                                        code, message))
+        if code == CHECK_WARNING:
+            self.warning_count += 1
+        else:
+            self.error_count += 1
+
+    @property
+    def full(self):
+        return self.max_errors is not None and self.error_count >= self.max_errors
+
+    @property
+    def diagnostics(self):
+        """Список Diagnostic в порядке поступления"""
+        return list(self._entries)
+
+    def errors(self):
+        return [diagnostic for diagnostic in self.diagnostics if diagnostic.is_error]
+
+    def warnings(self):
+        return [diagnostic for diagnostic in self.diagnostics if not diagnostic.is_error]
+
+    def __iter__(self):
+        return iter(self._entries)
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,358 @@
+"""
+Дизассемблер RISC-V по тем же таблицам инструкций, что и ассемблер
+
+Мнемоника находится по (opcode, funct3, funct7) в таблице, построенной
+из InstructionDef; операнды выдаются в порядке записи в ассемблере, так
+что строку листинга можно ассемблировать обратно в то же слово.
+
+Для больших образов есть пакетный путь на NumPy: .bin отображается в
+память, поля всех слов выделяются векторными операциями. Без NumPy
+работает тот же интерфейс, но слово за словом.
+"""
+
+import mmap
+import os
+import sys
+from collections import namedtuple
+from .instructions import INSTRUCTIONS
+from .encoding import IMM
+from .output import code_buffer
+
+try:
+    import numpy as np
+except ImportError:  # NumPy необязателен
+    np = None
+
+# Слов в одном блоке листинга
+CHUNK_WORDS = 4096
+
+# Пропуск между словами .hex/.mem длиннее этого числа слов не заполняется
+# нулями: образ делится на отрезки
+MAX_GAP_WORDS = 4096
+
+MAX_ADDRESS = 0xFFFFFFFF
+
+# Результат декодирования одного слова; instr_def = None - неизвестное слово
+Decoded = namedtuple('Decoded', ['address', 'word', 'instr_def', 'operands'])
+
+
+def _signed(value, bits):
+    """Знаковое значение bits-битного поля"""
+    return value - (1 << bits) if value & (1 << (bits - 1)) else value
+
+
+# Выделение операндов: в том же порядке, в котором их принимает pack_* из encoding
+
+def unpack_r(word):
+    return (word >> 7) & 0x1F, (word >> 15) & 0x1F, (word >> 20) & 0x1F
+
+def unpack_i(word):
+    return (word >> 7) & 0x1F, (word >> 15) & 0x1F, _signed(word >> 20, 12)
+
+def unpack_s(word):
+    imm = ((word >> 25) << 5) | ((word >> 7) & 0x1F)
+    return (word >> 15) & 0x1F, (word >> 20) & 0x1F, _signed(imm, 12)
+
+def unpack_b(word):
+    imm = (((word >> 31) & 0x1) << 12 | ((word >> 7) & 0x1) << 11
+           | ((word >> 25) & 0x3F) << 5 | ((word >> 8) & 0xF) << 1)
+    return (word >> 15) & 0x1F, (word >> 20) & 0x1F, _signed(imm, 13)
+
+def unpack_u(word):
+    return (word >> 7) & 0x1F, word & 0xFFFFF000
+
+def unpack_j(word):
+    imm = (((word >> 31) & 0x1) << 20 | ((word >> 12) & 0xFF) << 12
+           | ((word >> 20) & 0x1) << 11 | ((word >> 21) & 0x3FF) << 1)
+    return (word >> 7) & 0x1F, _signed(imm, 21)
+
+UNPACKERS = {
+    'R': unpack_r,
+    'I': unpack_i,
+    'S': unpack_s,
+    'B': unpack_b,
+    'U': unpack_u,
+    'J': unpack_j,
+}
+
+# Поля, по которым формат отличает инструкции с одним opcode
+_MATCH_FIELDS = {'R': 3, 'I': 2, 'S': 2, 'B': 2, 'U': 1, 'J': 1}
+
+
+def _match_key(opcode, funct3=None, funct7=None, fields=3):
+    """Ключ поиска: лишние для формата поля заменяются None"""
+    return (opcode, funct3 if fields >= 2 else None, funct7 if fields >= 3 else None)
+
+
+class Disassembler:
+    """Декодирование машинных слов по таблице инструкций"""
+
+    def __init__(self, instructions_def=INSTRUCTIONS):
+        self.defs = []      # Определения с известным форматом (индекс - номер в пакетном пути)
+        self._table = {}    # ключ совпадения -> (номер, InstructionDef)
+        self._templates = []
+
+        for instr_def in instructions_def.values():
+            fields = _MATCH_FIELDS.get(instr_def.format_type)
+            if fields is None:
+                continue
+            key = _match_key(instr_def.opcode & 0x7F, instr_def.funct3, instr_def.funct7, fields)
+            self._table[key] = (len(self.defs), instr_def)
+            self.defs.append(instr_def)
+            self._templates.append(self._template(instr_def))
+
+    @staticmethod
+    def _template(instr_def):
+        """Шаблон %-форматирования операндов инструкции"""
+        operands = []
+        for kind in instr_def.operand_kinds:
+            if kind != IMM:
+                operands.append('x%d')
+            elif instr_def.format_type == 'U':
+                operands.append('0x%x')
+            else:
+                operands.append('%d')
+        return f"{instr_def.name} " + ', '.join(operands)
+
+    def lookup(self, word):
+        """(номер, InstructionDef) для слова или None"""
+        opcode = word & 0x7F
+        funct3 = (word >> 12) & 0x7
+        table = self._table
+        return (table.get((opcode, funct3, (word >> 25) & 0x7F))
+                or table.get((opcode, funct3, None))
+                or table.get((opcode, None, None)))
+
+    def decode(self, word, address=0):
+        """Декодирование одного слова"""
+        found = self.lookup(word)
+        if found is None:
+            return Decoded(address, word, None, ())
+        instr_def = found[1]
+        return Decoded(address, word, instr_def, UNPACKERS[instr_def.format_type](word))
+
+    def format(self, decoded):
+        """Текст инструкции: 'add x1, x2, x3' или '.word 0x...' для неизвестного слова"""
+        if decoded.instr_def is None:
+            return f".word 0x{decoded.word:08x}"
+        found = self.lookup(decoded.word)
+        return self._templates[found[0]] % decoded.operands
+
+    def iter_listing(self, words, base_address=0):
+        """
+        Листинг 'адрес: слово  инструкция' блоками строк.
+
+        Args:
+            words: array/list слов или массив NumPy (тогда поля всех
+                слов блока выделяются векторно)
+        """
+        vectorized = np is not None and isinstance(words, np.ndarray)
+        for start in range(0, len(words), CHUNK_WORDS):
+            chunk = words[start:start + CHUNK_WORDS]
+            address = base_address + start * 4
+            if vectorized:
+                index, operands = self.decode_batch(chunk)
+                rows = zip(range(address, address + len(chunk) * 4, 4), chunk.tolist(),
+                           index.tolist(), *(column.tolist() for column in operands.T))
+                yield ''.join(self._listing_line(row) for row in rows)
+            else:
+                lines = []
+                for offset, word in enumerate(chunk):
+                    decoded = self.decode(word, address + offset * 4)
+                    lines.append(f"0x{decoded.address:08x}: 0x{word:08x}  {self.format(decoded)}\n")
+                yield ''.join(lines)
+
+    def _listing_line(self, row):
+        address, word, index = row[:3]
+        if index < 0:
+            text = f".word 0x{word:08x}"
+        else:
+            template = self._templates[index]
+            text = template % row[3:3 + len(self.defs[index].operand_kinds)]
+        return f"0x{address:08x}: 0x{word:08x}  {text}\n"
+
+    def decode_batch(self, words):
+        """
+        Векторное декодирование массива слов (нужен NumPy).
+
+        Returns:
+            (номера определений в self.defs, -1 для неизвестных слов;
+             матрица операндов N x 3 в порядке записи в ассемблере)
+        """
+        if np is None:
+            raise RuntimeError("NumPy is required for batch decoding")
+
+        fields = decode_fields(words)
+        opcode, funct3, funct7 = fields['opcode'], fields['funct3'], fields['funct7']
+
+        index = np.full(len(words), -1, dtype=np.int64)
+        # Сначала более общие ключи: точные (с funct7) перекрывают их
+        for key, (number, instr_def) in sorted(self._table.items(),
+                                               key=lambda item: sum(f is not None for f in item[0])):
+            mask = opcode == key[0]
+            if key[1] is not None:
+                mask &= funct3 == key[1]
+            if key[2] is not None:
+                mask &= funct7 == key[2]
+            index[mask] = number
+
+        operands = np.zeros((len(words), 3), dtype=np.int64)
+        for number, instr_def in enumerate(self.defs):
+            mask = index == number
+            if not mask.any():
+                continue
+            for column, name in enumerate(_BATCH_OPERANDS[instr_def.format_type]):
+                operands[mask, column] = fields[name][mask]
+        return index, operands
+
+
+# Имена полей decode_fields для операндов каждого формата
+_BATCH_OPERANDS = {
+    'R': ('rd', 'rs1', 'rs2'),
+    'I': ('rd', 'rs1', 'imm_i'),
+    'S': ('rs1', 'rs2', 'imm_s'),
+    'B': ('rs1', 'rs2', 'imm_b'),
+    'U': ('rd', 'imm_u'),
+    'J': ('rd', 'imm_j'),
+}
+
+
+def decode_fields(words):
+    """
+    Все поля всех слов массива векторными операциями NumPy.
+
+    Returns:
+        словарь массивов int64: opcode, rd, funct3, rs1, rs2, funct7 и
+        знаковые imm_i, imm_s, imm_b, imm_j; imm_u - без знака, как его
+        принимает pack_u
+    """
+    w = np.asarray(words, dtype=np.uint32).astype(np.int64)
+    # Сдвиг знакового 32-битного слова вправо размножает старший бит
+    ws = np.asarray(words, dtype=np.uint32).view(np.int32).astype(np.int64)
+
+    return {
+        'opcode': w & 0x7F,
+        'rd': (w >> 7) & 0x1F,
+        'funct3': (w >> 12) & 0x7,
+        'rs1': (w >> 15) & 0x1F,
+        'rs2': (w >> 20) & 0x1F,
+        'funct7': (w >> 25) & 0x7F,
+        'imm_i': ws >> 20,
+        'imm_s': ((ws >> 25) << 5) | ((w >> 7) & 0x1F),
+        'imm_b': (((ws >> 31) << 12) | (((w >> 7) & 0x1) << 11)
+                  | (((w >> 25) & 0x3F) << 5) | (((w >> 8) & 0xF) << 1)),
+        'imm_u': w & 0xFFFFF000,
+        'imm_j': (((ws >> 31) << 20) | (((w >> 12) & 0xFF) << 12)
+                  | (((w >> 20) & 0x1) << 11) | (((w >> 21) & 0x3FF) << 1)),
+    }
+
+
+# Чтение образов
+
+def read_bin(path):
+    """
+    Слова двоичного образа (little-endian).
+
+    С NumPy файл отображается в память (np.memmap) без чтения целиком;
+    без NumPy возвращается array слов.
+    """
+    size = os.path.getsize(path)
+    if size % 4:
+        raise ValueError(f"Binary image size {size} is not a multiple of 4 bytes")
+    if size == 0:
+        return code_buffer()
+
+    if np is not None:
+        return np.memmap(path, dtype='<u4', mode='r')
+
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        code = code_buffer()
+        code.frombytes(data)
+    if sys.byteorder != 'little':
+        code.byteswap()
+    return code
+
+
+def read_hex(path):
+    """Слова из .hex, записанного GUI: строки '0xADDRESS: 0xWORD', '#' - комментарии"""
+    words = {}
+    with open(path, 'r') as f:
+        for line_num, line in enumerate(f, 1):
+            line = line.split('#', 1)[0].strip()
+            if not line:
+                continue
+            try:
+                address, word = line.split(':')
+                address, word = int(address, 16), int(word, 16)
+            except ValueError:
+                raise ValueError(f"{path}:{line_num}: expected '0xADDRESS: 0xWORD', got '{line}'")
+            _check_word(path, line_num, address, word, line)
+            words[address // 4] = word
+    return _place_words(words)
+
+
+def read_mem(path):
+    """Слова из .mem ($readmemh): по слову в строке, '@адрес' в словах меняет позицию"""
+    words = {}
+    position = 0
+    with open(path, 'r') as f:
+        for line_num, line in enumerate(f, 1):
+            for token in line.split('//', 1)[0].split('#', 1)[0].split():
+                try:
+                    if token.startswith('@'):
+                        position = int(token[1:], 16)
+                        continue
+                    word = int(token, 16)
+                except ValueError:
+                    raise ValueError(f"{path}:{line_num}: invalid hex word '{token}'")
+                _check_word(path, line_num, position * 4, word, token)
+                words[position] = word
+                position += 1
+    return _place_words(words)
+
+
+def _check_word(path, line_num, address, word, text):
+    """Адрес и слово должны помещаться в 32 бита, как в образе .bin"""
+    if not 0 <= address <= MAX_ADDRESS:
+        raise ValueError(f"{path}:{line_num}: address out of 32-bit range in '{text}'")
+    if not 0 <= word <= 0xFFFFFFFF:
+        raise ValueError(f"{path}:{line_num}: word does not fit in 32 bits in '{text}'")
+
+
+def _place_words(words):
+    """
+    Отрезки образа по словарю позиция -> слово: список пар (адрес, array
+    слов) по возрастанию адреса. Пропуск короче MAX_GAP_WORDS заполняется
+    нулями, на длинном пропуске начинается новый отрезок - память уходит
+    только на сами слова, а не на всё адресное пространство до них.
+    """
+    segments = []
+    code = None
+    end = None
+    for position in sorted(words):
+        if code is None or position - end > MAX_GAP_WORDS:
+            code = code_buffer()
+            segments.append((position * 4, code))
+        else:
+            code.extend(code_buffer([0]) * (position - end))
+        code.append(words[position])
+        end = position + 1
+    return segments
+
+
+def read_image(path):
+    """
+    Отрезки образа: список пар (адрес, слова) по возрастанию адреса;
+    формат по расширению (.hex, .mem, иначе .bin - один отрезок с адреса 0)
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.hex':
+        segments = read_hex(path)
+    elif extension == '.mem':
+        segments = read_mem(path)
+    else:
+        return [(0, read_bin(path))]
+
+    if np is not None:
+        return [(address, np.frombuffer(words, dtype=np.uint32)) for address, words in segments]
+    return segments
@@ -0,0 +1,119 @@
+"""
+Упаковка полей инструкций RISC-V в машинное слово
+"""
+
+# Поля, входящие в постоянную часть слова для каждого формата
+_BASE_FIELDS = {
+    'R': ('funct3', 'funct7'),
+    'I': ('funct3',),
+    'S': ('funct3',),
+    'B': ('funct3',),
+    'U': (),
+    'J': (),
+}
+
+
+def make_base_word(format_type, opcode, funct3=None, funct7=None):
+    """Постоянная часть слова: opcode, funct3 и funct7 уже на своих местах"""
+    fields = _BASE_FIELDS.get(format_type, ())
+
+    word = opcode & 0x7F
+    if 'funct3' in fields and funct3 is not None:
+        word |= (funct3 & 0x7) << 12
+    if 'funct7' in fields and funct7 is not None:
+        word |= (funct7 & 0x7F) << 25
+    return word
+
+# Проверки непосредственного значения: сообщение, с которым упаковщик
+# формата отверг бы значение, или None. Кодировщик вызывает их до
+# упаковки, чтобы ошибки в исходнике не шли через исключения
+
+def immediate_error_i(imm):
+    if not (-2048 <= imm <= 2047):
+        return f"Immediate value {imm} out of range for I-format"
+
+def immediate_error_s(imm):
+    if not (-2048 <= imm <= 2047):
+        return f"Immediate value {imm} out of range for S-format"
+
+def immediate_error_b(imm):
+    if imm % 2 != 0:
+        return f"B-format immediate must be 2-byte aligned"
+    if not (-4096 <= imm <= 4094):
+        return f"Immediate value {imm} out of range for B-format"
+
+def immediate_error_j(imm):
+    if imm % 2 != 0:
+        return f"J-format immediate must be 2-byte aligned"
+
+IMMEDIATE_ERRORS = {
+    'I': immediate_error_i,
+    'S': immediate_error_s,
+    'B': immediate_error_b,
+    'J': immediate_error_j,
+}
+
+# ПРОВЕРЕНО ✅✅✅
+def pack_r(base, rd, rs1, rs2):
+    """R-формат: funct7 rs2 rs1 funct3 rd opcode"""
+    return base | (rs2 & 0x1F) << 20 | (rs1 & 0x1F) << 15 | (rd & 0x1F) << 7
+
+# ПРОВЕРЕНО ✅✅✅
+def pack_i(base, rd, rs1, imm):
+    """I-формат: imm[11:0] rs1 funct3 rd opcode"""
+    error = immediate_error_i(imm)
+    if error:
+        raise ValueError(error)
+
+    return base | (imm & 0xFFF) << 20 | (rs1 & 0x1F) << 15 | (rd & 0x1F) << 7
+
+# НЕ ПРОВЕРЕНО! (От DeepSeek)
+def pack_s(base, rs1, rs2, imm):
+    """S-формат: imm[11:5] rs2 rs1 funct3 imm[4:0] opcode"""
+    error = immediate_error_s(imm)
+    if error:
+        raise ValueError(error)
+
+    return (base | ((imm >> 5) & 0x7F) << 25 | (rs2 & 0x1F) << 20
+            | (rs1 & 0x1F) << 15 | (imm & 0x1F) << 7)
+
+# НЕ ПРОВЕРЕНО!!! (От DeepSeek)
+def pack_b(base, rs1, rs2, imm):
+    """B-формат: imm[12|10:5] rs2 rs1 funct3 imm[4:1|11] opcode"""
+    error = immediate_error_b(imm)
+    if error:
+        raise ValueError(error)
+
+    return (base | ((imm >> 12) & 0x1) << 31 | ((imm >> 5) & 0x3F) << 25
+            | (rs2 & 0x1F) << 20 | (rs1 & 0x1F) << 15
+            | ((imm >> 1) & 0xF) << 8 | ((imm >> 11) & 0x1) << 7)
+
+# НЕ ПРОВЕРЕНО!!! (От DeepSeek)
+def pack_u(base, rd, imm):
+    """U-формат: imm[31:12] rd opcode"""
+    return base | (imm & 0xFFFFF000) | (rd & 0x1F) << 7
+
+# НЕ ПРОВЕРЕНО!!! (От DeepSeek)
+def pack_j(base, rd, imm):
+    """J-формат: imm[20|10:1|11|19:12] rd opcode"""
+    error = immediate_error_j(imm)
+    if error:
+        raise ValueError(error)
+
+    return (base | ((imm >> 20) & 0x1) << 31 | ((imm >> 1) & 0x3FF) << 21
+            | ((imm >> 11) & 0x1) << 20 | ((imm >> 12) & 0xFF) << 12
+            | (rd & 0x1F) << 7)
+
+
+REG = 'reg'
+IMM = 'imm'
+
+# Формат -> (упаковщик, виды операндов в порядке записи в ассемблере)
+FORMATS = {
+    'R': (pack_r, (REG, REG, REG)),  # rd, rs1, rs2
+    'I': (pack_i, (REG, REG, IMM)),  # rd, rs1, imm
+    'S': (pack_s, (REG, REG, IMM)),  # rs1, rs2, imm
+    'B': (pack_b, (REG, REG, IMM)),  # rs1, rs2, imm
+    'U': (pack_u, (REG, IMM)),       # rd, imm
+    'J': (pack_j, (REG, IMM)),       # rd, imm
+}
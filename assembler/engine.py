@@ -0,0 +1,342 @@
+"""
+Однопроходный движок ассемблера с таблицей исправлений (fixup)
+"""
+
+from array import array
+from collections import deque
+from .parser import Parser
+from .compiler import Compiler, compile_error_message
+from .diagnostics import (DiagnosticSink, KINDS, UNKNOWN_INSTRUCTION, INVALID_IMMEDIATE,
+                          UNDEFINED_LABEL, DUPLICATE_LABEL, CHECK_WARNING)
+from .lexer import split_line
+from .output import code_buffer
+
+
+def diagnostic_text(code, line_num, instr_def, args, message):
+    """
+    Текст диагностики для текстового вывода в прежнем формате: с номером
+    строки у ошибок разбора, с аргументами у ошибок кодирования
+    """
+    if code == UNKNOWN_INSTRUCTION:
+        return f"Line {line_num}: {message}"
+    if KINDS[code] == 'COMPILATION ERROR':
+        return compile_error_message(instr_def, args, message)
+    return message
+
+
+def add_diagnostic(record, sink, code, word, message, text=None):
+    """
+    Диагностика строки: в sink - код, номер слова word (None - вся строка)
+    и сообщение; в запись - вид и текст text для текстового вывода (по
+    умолчанию - diagnostic_text)
+    """
+    sink.report(record.line_num, code, message, record.source, word)
+
+    if code == CHECK_WARNING:
+        record.add_warnings((text or message,))
+        return
+    if text is None:
+        text = diagnostic_text(code, record.line_num, record.instr_def, record.args, message)
+    record.add_error(KINDS[code], text)
+
+
+class LineResult:
+    """Результат ассемблирования одной строки"""
+    __slots__ = ('line_num', 'source', 'instr_def', 'args', 'index', 'word',
+                 'pending', 'errors', 'warnings')
+
+    def __init__(self, line_num, source):
+        self.line_num = line_num
+        self.source = source
+        self.instr_def = None
+        self.args = ()
+        self.index = None      # Индекс слова в машинном коде
+        self.word = None       # Машинное слово (None, пока метка не определена)
+        self.pending = False   # Ждёт определения метки
+        # Списки создаются только при первой записи: у большинства строк
+        # диагностики нет
+        self.errors = ()       # Пары (вид ошибки, сообщение)
+        self.warnings = ()
+
+    def add_error(self, kind, message):
+        if not self.errors:
+            self.errors = []
+        self.errors.append((kind, message))
+
+    def add_warnings(self, warnings):
+        if not self.warnings:
+            self.warnings = []
+        self.warnings.extend(warnings)
+
+
+class AssemblyResult:
+    """
+    Результат ассемблирования всего исходника в компактном виде.
+
+    На каждое слово машинного кода хранятся только номер строки и номер
+    определения инструкции - в параллельных array; записи LineResult
+    остаются лишь для строк с диагностикой или неразрешённым словом
+    (notes). Полный список строк (lines) восстанавливается по требованию
+    из этих столбцов и текста исходника, на который результат ссылается.
+
+    Та же диагностика в структурированном виде (строка, столбец, код,
+    сообщение) - в sink.
+    """
+    def __init__(self, source=()):
+        self.machine_code = code_buffer()  # array 32-битных слов
+        self.word_lines = array('I')       # Номер строки каждого слова
+        self.word_defs = array('H')        # Номер определения каждого слова в defs
+        self.defs = []                     # Определения инструкций по номерам
+        self.notes = {}                    # Номер строки -> LineResult с диагностикой и т.п.
+        self.labels = {}
+        self.source = source               # Строки исходника
+        self.last_line = 0                 # Последняя обработанная строка
+        self.sink = DiagnosticSink()       # Структурированная диагностика
+        self._def_ids = {}
+
+    def add(self, record):
+        """Добавление результата строки (строки - по порядку)"""
+        if record.index is not None:
+            def_id = self._def_ids.get(record.instr_def)
+            if def_id is None:
+                def_id = self._def_ids[record.instr_def] = len(self.defs)
+                self.defs.append(record.instr_def)
+            self.machine_code.append(record.word if record.word is not None else 0)
+            self.word_lines.append(record.line_num)
+            self.word_defs.append(def_id)
+        # Слово, оставшееся без значения (метка так и не определена), тоже
+        # сохраняется записью: в столбцах его не отличить от нулевого
+        if record.errors or record.warnings or (record.index is not None and record.word is None):
+            self.notes[record.line_num] = record
+        self.last_line = record.line_num
+
+    @property
+    def has_errors(self):
+        return any(record.errors for record in self.notes.values())
+
+    @property
+    def lines(self):
+        """Записи LineResult всех непустых строк (собираются заново при каждом обращении)"""
+        return list(self.iter_lines())
+
+    def iter_lines(self):
+        """LineResult для каждой непустой строки до последней обработанной"""
+        notes = self.notes
+        word_lines = self.word_lines
+        count = len(word_lines)
+        k = 0
+
+        for i, line in enumerate(self.source, 1):
+            if i > self.last_line:
+                break
+            text = line.rstrip()
+            if not text or text.lstrip().startswith('#'):
+                continue
+
+            has_word = k < count and word_lines[k] == i
+            record = notes.get(i)
+            if record is None:
+                record = LineResult(i, text)
+                if has_word:
+                    record.instr_def = self.defs[self.word_defs[k]]
+                    record.args = split_line(text)[1][1:]
+                    record.index = k
+                    record.word = self.machine_code[k]
+            if has_word:
+                k += 1
+            yield record
+
+    def diagnostics(self, first_error_only=False, max_errors=None):
+        """
+        Диагностика по строкам: тройки (номер строки, вид, сообщение),
+        предупреждения - с видом 'WARNING'.
+
+        Args:
+            first_error_only: оборвать список на первой строке с ошибкой
+                (как вывод CLI при stop_on_error)
+            max_errors: оборвать список на строке, где набралось столько
+                ошибок (first_error_only - то же, что max_errors=1)
+        """
+        if first_error_only:
+            max_errors = 1
+        diagnostics = []
+        error_count = 0
+        for record in self.notes.values():
+            for kind, err in record.errors:
+                diagnostics.append((record.line_num, kind, err))
+            error_count += len(record.errors)
+            if max_errors is not None and error_count >= max_errors:
+                break
+            for warn in record.warnings:
+                diagnostics.append((record.line_num, 'WARNING', warn))
+        return diagnostics
+
+
+class Assembler:
+    """
+    Ассемблирует исходник за один проход.
+
+    Каждая строка разбирается ровно один раз. Инструкция, ссылающаяся на
+    ещё не определённую метку, получает в машинном коде слово-заглушку и
+    попадает в таблицу исправлений; слово дописывается, как только метка
+    будет определена. Повторное определение метки - ошибка
+    (duplicate-label), адрес остаётся от первого.
+    """
+
+    def __init__(self, instructions_def):
+        self.parser = Parser(instructions_def)
+        self.compiler = Compiler(self.parser)
+
+    def assemble(self, lines, stop_on_error=False, max_errors=None):
+        """Ассемблирование списка строк (результат ссылается на lines)"""
+        if not isinstance(lines, (list, tuple)):
+            lines = list(lines)
+        result = AssemblyResult(lines)
+        add = result.add
+
+        for record in self.iter_assemble(lines, stop_on_error, max_errors=max_errors):
+            add(record)
+
+        result.labels = dict(self.parser.labels)
+        result.sink = self.sink
+        return result
+
+    def iter_assemble(self, lines, stop_on_error=False, ordered=True, max_errors=None):
+        """
+        Потоковое ассемблирование: строки читаются по одной.
+
+        Args:
+            lines: любой итерируемый источник строк (список, файл, stdin)
+            stop_on_error: остановиться после первой ошибки
+            ordered: выдавать записи строго по порядку исходника. Запись,
+                ждущая метку, задерживает все следующие за ней, поэтому
+                в памяти остаются только строки начиная с первой
+                неразрешённой ссылки. При ordered=False записи выдаются
+                сразу (ждущая метку - с word=None), а после определения
+                метки выдаются повторно с готовым словом - так можно
+                дописывать результат в файл с произвольным доступом.
+            max_errors: остановиться на строке, где набралось столько
+                ошибок (None - без предела)
+
+        Диагностика, кроме записей, собирается в self.sink (DiagnosticSink).
+
+        Yields:
+            LineResult для каждой непустой строки
+        """
+        parser = self.parser
+        parser.labels.clear()
+        parser.duplicate = None
+        parser.current_address = 0
+
+        self.sink = sink = DiagnosticSink(max_errors)
+        self._word_count = 0
+        fixups = {}       # метка -> (запись, операнды без адреса метки), ожидающие её
+        window = deque()  # записи, ещё не выданные по порядку
+        failed = False
+
+        for i, line in enumerate(lines, 1):
+            line_clean = line.rstrip()
+            if not line_clean or line_clean.lstrip().startswith('#'):
+                continue
+
+            record = LineResult(i, line_clean)
+            labels_count = len(parser.labels)
+
+            # Ошибки в тексте приходят значениями, без исключений
+            instr_def, args, errors, warnings = parser.parse_line(line_clean, i)
+            record.instr_def = instr_def
+            record.args = args
+            if parser.duplicate is not None:
+                # Повторное определение - ошибка: какое из определений имелось
+                # в виду в ссылке вперёд, однопроходному движку не узнать
+                add_diagnostic(record, sink, DUPLICATE_LABEL, None,
+                               f"Label '{parser.duplicate}' is already defined")
+                parser.duplicate = None
+            if errors:
+                for code, word, message in errors:
+                    add_diagnostic(record, sink, code, word, message)
+            elif instr_def:
+                self._add_instruction(record, fixups)
+            for code, word, message in warnings:
+                add_diagnostic(record, sink, code, word, message)
+
+            # Новая метка: дописываем инструкции, которые её ждали
+            resolved = ()
+            if len(parser.labels) != labels_count:
+                label = next(reversed(parser.labels))
+                waiting_list = fixups.pop(label, ())
+                address = parser.labels[label]
+                resolved = [waiting for waiting, _ in waiting_list]
+                for waiting, operands in waiting_list:
+                    failed |= not self._encode(waiting, operands + (address,))
+
+            failed |= bool(record.errors)
+
+            if ordered:
+                window.append(record)
+                while window and not window[0].pending:
+                    yield window.popleft()
+            else:
+                yield record
+                yield from resolved
+
+            if (failed and stop_on_error) or sink.full:
+                break
+        else:
+            # Оставшиеся ссылки указывают на неопределённые метки
+            for symbol, waiting_list in fixups.items():
+                for waiting, _ in waiting_list:
+                    self._report_unresolved(waiting, symbol)
+                    if not ordered:
+                        yield waiting
+
+        yield from window
+
+    def _add_instruction(self, record, fixups):
+        """Разбор операндов и резервирование слова под инструкцию"""
+        record.index = self._word_count
+        self._word_count += 1
+
+        # Обычная строка кодируется сразу, остальные - через разбор операндов
+        word = self.compiler.encode_args(record.instr_def, record.args)
+        if word is not None:
+            record.word = word
+            return
+
+        operands, symbol, error = self.parser.parse_operands(record.instr_def, record.args)
+        if error is not None:
+            # Слово остаётся зарезервированным: адреса следующих меток не сдвигаются
+            add_diagnostic(record, self.sink, *error)
+            return
+
+        if symbol is not None:
+            address = self._symbol_address(symbol)
+            if address is None:
+                record.pending = True
+                fixups.setdefault(symbol, []).append((record, operands))
+                return
+            operands += (address,)
+        self._encode(record, operands)
+
+    def _symbol_address(self, symbol):
+        """Адрес уже определённой метки (или None)"""
+        return self.parser.labels.get(symbol)
+
+    def _encode(self, record, operands):
+        """Кодирование инструкции с готовыми операндами в зарезервированное слово"""
+        record.pending = False
+        word, error = self.compiler.encode(record.instr_def, operands)
+        if error is not None:
+            add_diagnostic(record, self.sink, INVALID_IMMEDIATE, len(record.args), error)
+            return False
+        record.word = word
+        return True
+
+    def _report_unresolved(self, record, symbol):
+        """Ошибка для ссылки на метку, которая так и не была определена"""
+        record.pending = False
+        # Текст для вывода - тот, что даёт разбор аргумента как числа
+        _, error = self.parser.read_immediate(record.args[-1])
+        add_diagnostic(record, self.sink, UNDEFINED_LABEL, len(record.args),
+                       f"Undefined label '{symbol}'",
+                       compile_error_message(record.instr_def, record.args, error))
@@ -16,4 +16,25 @@ class AssemblyWarning:
         self.line_num = line_num
     
     def __str__(self):
-        return f"Line {self.line_num}: {self.message}"
\ No newline at end of file
+        return f"Line {self.line_num}: {self.message}"
+
+class AssemblyCancelled(Exception):
+    """Сборка прервана (например, текст изменился во время проверки)"""
+
+class SimulationError(Exception):
+    """Ошибка выполнения программы в симуляторе"""
+    def __init__(self, message, pc=0):
+        self.message = message
+        self.pc = pc
+        super().__init__(f"PC 0x{pc:08x}: {message}")
+
+class BatchEncodingError(ValueError):
+    """Ошибка пакетного кодирования: indices - номера неверных элементов"""
+    def __init__(self, message, indices):
+        self.message = message
+        self.indices = indices
+        shown = ', '.join(str(int(index)) for index in indices[:10])
+        if len(indices) > 10:
+            shown += f", ... ({len(indices)} in total)"
+        super().__init__(f"{message} at indices [{shown}]" if len(indices) else message)
+
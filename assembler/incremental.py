@@ -0,0 +1,244 @@
+"""
+Инкрементальное ассемблирование для редактора
+"""
+
+from .lexer import split_line
+from .parser import Parser
+from .compiler import Compiler, compile_error_message
+from .diagnostics import KINDS, INVALID_IMMEDIATE, UNDEFINED_LABEL, DUPLICATE_LABEL
+from .symbols import SymbolTable
+from .engine import LineResult, AssemblyResult, add_diagnostic, diagnostic_text
+
+
+class _ParsedLine:
+    """Разбор строки, не зависящий от её номера и адреса"""
+    __slots__ = ('label', 'instr_def', 'args', 'errors', 'warnings',
+                 'has_word', 'operands', 'symbol')
+
+    def __init__(self):
+        self.label = None
+        self.instr_def = None
+        self.args = ()
+        self.errors = ()         # Ошибки разбора и проверки: (код, номер слова, сообщение)
+        self.warnings = ()
+        self.has_word = False    # Под строку резервируется машинное слово
+        self.operands = None     # Разобранные операнды (None - ошибка разбора)
+        self.symbol = None       # Метка, адрес которой дописывается к операндам
+
+
+class IncrementalAssembler:
+    """
+    Ассемблер для повторных сборок понемногу меняющегося текста.
+
+    Разбор строки кэшируется по её содержимому, поэтому вставка и
+    удаление строк не сбрасывают кэш остальных. Закодированное слово
+    тоже кэшируется по содержимому; для строк со ссылкой на метку ведётся
+    обратный индекс метка -> строки, и при смене адреса метки
+    перекодируются только её пользователи.
+    """
+
+    # Как часто (в строках) вызывается обратный вызов progress
+    PROGRESS_INTERVAL = 4096
+
+    def __init__(self, instructions_def):
+        self.parser = Parser(instructions_def)
+        self.compiler = Compiler(self.parser)
+
+        self._parsed = {}   # текст строки -> _ParsedLine
+        self._encoded = {}  # текст строки -> (слово или None, ошибка для add_diagnostic или None)
+        self._users = {}    # метка -> тексты строк, которые на неё ссылаются
+        self._labels = {}   # метки предыдущей сборки
+
+        # Статистика последней сборки
+        self.reparsed = 0
+        self.reencoded = 0
+
+    def assemble(self, lines, progress=None):
+        """
+        Ассемблирование текста; результат как у Assembler.assemble.
+
+        Args:
+            lines: список строк
+            progress: необязательный вызов progress(сделано, всего); может
+                бросить AssemblyCancelled, чтобы прервать сборку - кэши
+                при этом остаются согласованными
+        """
+        self.reparsed = 0
+        self.reencoded = 0
+        total = 2 * len(lines)  # разбор и кодирование
+
+        entries, symbols = self._parse_lines(lines, progress, total)
+        labels = symbols.addresses
+        self._invalidate_moved_labels(labels)
+
+        # Метки уже известны полностью: ссылки вперёд разрешаются сразу
+        self.parser.labels = labels
+        result = AssemblyResult(lines)
+        machine_code = result.machine_code
+        sink = result.sink
+
+        encoded_cache = self._encoded
+        encoded = {}
+        users = {}
+        duplicates = symbols.duplicates
+
+        interval = self.PROGRESS_INTERVAL
+        for done, (i, text, entry) in enumerate(entries, 1):
+            if progress is not None and done % interval == 0:
+                progress(len(lines) + done, total)
+
+            record = LineResult(i, text)
+            record.instr_def = entry.instr_def
+            record.args = entry.args
+
+            if duplicates and i in duplicates:
+                # Как у Assembler: повторное определение - ошибка, адрес - от первого
+                add_diagnostic(record, sink, DUPLICATE_LABEL, None,
+                               f"Label '{entry.label}' is already defined")
+            for code, word, message in entry.errors:
+                add_diagnostic(record, sink, code, word, message)
+            for code, word, message in entry.warnings:
+                add_diagnostic(record, sink, code, word, message)
+
+            if entry.has_word:
+                cached = encoded.get(text) or encoded_cache.get(text)
+                if cached is None:
+                    cached = self._encode(entry, symbols, i)
+                    self.reencoded += 1
+                encoded[text] = cached
+                if entry.symbol is not None:
+                    users.setdefault(entry.symbol, set()).add(text)
+
+                word, error = cached
+                record.index = len(machine_code)
+                record.word = word
+                if error is not None:
+                    add_diagnostic(record, sink, *error)
+
+            result.add(record)
+
+        # В кэшах остаются только строки текущего текста
+        self._encoded = encoded
+        self._users = users
+
+        if progress is not None:
+            progress(total, total)
+
+        result.labels = dict(labels)
+        return result
+
+    def check_lines(self, lines, first_line=1):
+        """
+        Быстрая проверка части текста (например, видимой в редакторе) без
+        полной сборки: только ошибки, видные по самой строке, - ссылки на
+        метки здесь не разрешаются.
+
+        Returns:
+            список (номер строки, ошибки, предупреждения) для строк с
+            диагностикой; ошибки - пары (вид, сообщение), как в LineResult
+        """
+        diagnostics = []
+        for i, line in enumerate(lines, first_line):
+            text = line.rstrip()
+            if not text or text.lstrip().startswith('#'):
+                continue
+
+            entry = self._parsed.get(text)
+            if entry is None:
+                entry = self._parse(text)
+                self._parsed[text] = entry
+
+            if entry.errors or entry.warnings:
+                errors = [(KINDS[code], diagnostic_text(code, i, entry.instr_def, entry.args, message))
+                          for code, word, message in entry.errors]
+                warnings = [message for code, word, message in entry.warnings]
+                diagnostics.append((i, errors, warnings))
+        return diagnostics
+
+    def _parse_lines(self, lines, progress=None, total=0):
+        """Разборы строк из кэша с номерами строк и таблица меток (SymbolTable)"""
+        parsed_cache = self._parsed
+        parsed = {}
+        entries = []
+        symbols = SymbolTable()
+        address = 0
+        interval = self.PROGRESS_INTERVAL
+
+        for i, line in enumerate(lines, 1):
+            if progress is not None and i % interval == 0:
+                progress(i, total)
+
+            text = line.rstrip()
+            if not text or text.lstrip().startswith('#'):
+                continue
+
+            entry = parsed.get(text) or parsed_cache.get(text)
+            if entry is None:
+                entry = self._parse(text)
+                self.reparsed += 1
+            parsed[text] = entry
+
+            if entry.label is not None:
+                symbols.define(entry.label, i, address)
+            if entry.instr_def is not None:
+                address += 4
+
+            entries.append((i, text, entry))
+
+        self._parsed = parsed
+        return entries, symbols
+
+    def _invalidate_moved_labels(self, labels):
+        """Сброс закодированных слов у пользователей меток, сменивших адрес"""
+        moved = {label for label, _ in self._labels.items() ^ labels.items()}
+        for label in moved:
+            for text in self._users.get(label, ()):
+                self._encoded.pop(text, None)
+        self._labels = labels
+
+    def _parse(self, text):
+        """Разбор строки без побочных эффектов в парсере"""
+        entry = _ParsedLine()
+        entry.label, parts = split_line(text)
+        if not parts:
+            return entry
+
+        instr_def, args, errors, warnings = self.parser.parse_instruction(parts)
+        entry.instr_def = instr_def
+        entry.args = args
+        entry.warnings = warnings
+        if errors:
+            entry.errors = errors
+            return entry
+
+        # Слово резервируется и при ошибке в операндах: адреса меток не сдвигаются
+        entry.has_word = True
+        entry.operands, entry.symbol, error = self.parser.parse_operands(instr_def, args)
+        if error is not None:
+            entry.errors = (error,)
+        return entry
+
+    def _encode(self, entry, symbols, line_num):
+        """
+        Кодирование строки номер line_num: (слово, None) или (None,
+        ошибка) - аргументы add_diagnostic после записи и sink. Ссылка на
+        метку разрешается по правилу Assembler (SymbolTable.resolve)
+        """
+        operands = entry.operands
+        if operands is None:
+            return None, None  # Ошибка разбора операндов уже в entry.errors
+
+        args = entry.args
+        if entry.symbol is not None:
+            address, _ = symbols.resolve(entry.symbol, line_num)
+            if address is None:
+                # Текст для вывода - тот, что даёт разбор аргумента как числа
+                _, error = self.parser.read_immediate(args[-1])
+                return None, (UNDEFINED_LABEL, len(args), f"Undefined label '{entry.symbol}'",
+                              compile_error_message(entry.instr_def, args, error))
+            operands += (address,)
+
+        word, error = self.compiler.encode(entry.instr_def, operands)
+        if error is not None:
+            return None, (INVALID_IMMEDIATE, len(args), error)
+        return word, None
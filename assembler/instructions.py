@@ -3,8 +3,12 @@
 Каждая инструкция содержит шаблон и правила проверки
 """
 
+from .encoding import FORMATS, IMMEDIATE_ERRORS, make_base_word
+
 class InstructionDef:
     """Определение одной инструкции"""
+    __slots__ = ('name', 'format_type', 'opcode', 'funct3', 'funct7', 'imm_type', 'checks',
+                 'documentation', 'base_word', 'pack', 'operand_kinds', 'immediate_error')
     
     def __init__(self, name, format_type, opcode, funct3=None, funct7=None, 
                  imm_type=None, checks=None, documentation=None):
@@ -26,7 +30,12 @@ class InstructionDef:
         self.imm_type = imm_type
         self.checks = checks or []
         self.documentation = documentation
-    
+
+        # Кодировщик выбирается один раз при построении таблицы
+        self.base_word = make_base_word(format_type, opcode, funct3, funct7)
+        self.pack, self.operand_kinds = FORMATS.get(format_type, (None, ()))
+        self.immediate_error = IMMEDIATE_ERRORS.get(format_type)
+
     def validate(self, args):
         """Проверка аргументов инструкции"""
         errors = []
@@ -44,6 +53,8 @@ class InstructionDef:
 
 class InstructionDoc:
     """Документация для инструкции"""
+    __slots__ = ('name', 'description', 'syntax', 'examples', 'notes')
+
     def __init__(self, name, description, syntax, examples=None, notes=None):
         self.name = name
         self.description = description
@@ -0,0 +1,50 @@
+"""
+Лексер строки ассемблера
+
+Строка просматривается один раз: комментарий отсекается поиском '#',
+метка в начале строки и слова инструкции выделяются заранее
+скомпилированными регулярными выражениями.
+"""
+
+import re
+
+# Метка: идентификатор в начале строки, за которым следует ':'
+_LABEL_RE = re.compile(r'\s*([a-zA-Z_][a-zA-Z0-9_]*)\s*:')
+# Слово инструкции: всё, кроме запятых и пробелов
+_WORD_RE = re.compile(r'[^,\s]+')
+
+
+def _code_span(line):
+    """Границы кода в строке: (имя метки или None, начало инструкции, конец)"""
+    end = line.find('#')
+    if end < 0:
+        end = len(line)
+
+    # Регулярное выражение метки нужно только строкам с ':'
+    if line.find(':', 0, end) >= 0:
+        match = _LABEL_RE.match(line, 0, end)
+        if match:
+            return match, match.end(), end
+    return None, 0, end
+
+
+def split_line(line):
+    """
+    Быстрый разбор строки для парсера.
+
+    Returns:
+        (метка или None, список слов инструкции: мнемоника и аргументы)
+    """
+    match, start, end = _code_span(line)
+    label = match.group(1) if match else None
+    return label, _WORD_RE.findall(line, start, end)
+
+
+def word_column(line, index):
+    """Столбец (с 1) слова инструкции номер index (0 - мнемоника) или 0, если слова нет"""
+    match, start, end = _code_span(line)
+    for number, word in enumerate(_WORD_RE.finditer(line, start, end)):
+        if number == index:
+            return word.start() + 1
+    return 0
+
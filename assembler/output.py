@@ -0,0 +1,93 @@
+"""
+Буфер машинного кода и запись образа в форматы .bin, .hex и .mem
+
+Машинный код хранится в array 32-битных слов без знака: двоичный файл
+пишется одним write() по memoryview буфера, а текстовые форматы
+собираются блоками по CHUNK_WORDS слов одной операцией форматирования.
+"""
+
+import os
+import sys
+from array import array
+
+# Код типа array с 32-битными элементами ('I' почти везде, 'L' на экзотике)
+WORD_TYPECODE = 'I' if array('I').itemsize == 4 else 'L'
+
+# Слов в одном блоке текстового вывода
+CHUNK_WORDS = 4096
+
+
+def code_buffer(words=()):
+    """Буфер машинного кода: array 32-битных слов"""
+    return array(WORD_TYPECODE, words)
+
+
+def _as_buffer(code):
+    """Машинный код как array слов (список переводится один раз)"""
+    if isinstance(code, array) and code.typecode == WORD_TYPECODE:
+        return code
+    return code_buffer(code)
+
+
+def little_endian_view(code):
+    """
+    Байты образа (little-endian) без копирования на little-endian машине.
+
+    Returns:
+        memoryview, пригодный для file.write()
+    """
+    code = _as_buffer(code)
+    if sys.byteorder != 'little':
+        code = array(code.typecode, code)
+        code.byteswap()
+    return memoryview(code).cast('B')
+
+
+def write_bin(f, code):
+    """Запись двоичного образа одним write(); возвращает число байт"""
+    view = little_endian_view(code)
+    f.write(view)
+    return len(view)
+
+
+def iter_hex_chunks(code, prefix='', base_address=0):
+    """Строки 'prefix0xADDRESS: 0xWORD' блоками по CHUNK_WORDS слов"""
+    for start in range(0, len(code), CHUNK_WORDS):
+        chunk = code[start:start + CHUNK_WORDS]
+        count = len(chunk)
+        # Адреса и слова чередуются для одного %-форматирования на блок
+        values = [0] * (2 * count)
+        address = base_address + start * 4
+        values[0::2] = range(address, address + count * 4, 4)
+        values[1::2] = chunk
+        yield (prefix + "0x%08x: 0x%08x\n") * count % tuple(values)
+
+
+def iter_mem_chunks(code):
+    """Строки 'WORD' (8 hex-цифр) блоками по CHUNK_WORDS слов"""
+    for start in range(0, len(code), CHUNK_WORDS):
+        chunk = code[start:start + CHUNK_WORDS]
+        yield "%08x\n" * len(chunk) % tuple(chunk)
+
+
+def write_hex(f, code, prefix=''):
+    """Запись строк 'адрес: слово' в текстовый файл"""
+    for text in iter_hex_chunks(code, prefix):
+        f.write(text)
+
+
+def write_mem(f, code):
+    """Запись слов по одному на строку (формат .mem для $readmemh)"""
+    for text in iter_mem_chunks(code):
+        f.write(text)
+
+
+def remove_output(path):
+    """
+    Удаление выходного файла перед записью: если это жёсткая ссылка на
+    запись кэша сборки, перезапись на месте испортила бы запись
+    """
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,358 @@
+"""
+Параллельная сборка одного большого файла в пуле процессов
+
+Кодирование строки зависит от остальных строк только через адреса меток,
+а адрес - только от числа инструкций перед ним. Поэтому файл режется на
+части по концам строк, и каждая строка проходит лексер и разбор ровно
+один раз, в воркере:
+
+1. Воркер разбирает и кодирует свою часть. Номер первой строки и адрес
+   начала части ему ещё не известны, поэтому метки, ссылки на них и
+   диагностика записываются от начала части. Слово со ссылкой на метку
+   упаковывается с нулевым непосредственным значением, а сама ссылка
+   возвращается вместе с массивом слов - числами в array (номер слова,
+   строка, номер имени метки, номер определения инструкции): ссылок в
+   большом файле миллионы, и кортежи с текстом аргументов держали бы
+   в этом процессе сотни мегабайт.
+2. Префиксные суммы дают номер первой строки и адрес начала каждой
+   части, из меток частей складывается таблица меток всего файла.
+   Ссылки дописываются в этом процессе - это только поиск метки и
+   упаковка её адреса поверх слова (упаковщики лишь складывают поля), -
+   и массивы слов пишутся в выходной файл по порядку. Текст аргументов
+   нужен только для сообщений об ошибках в ссылках: такие строки
+   перечитываются из исходника.
+
+Результат тот же, что у Assembler: метка получает адрес первого
+определения, повторное определение - ошибка duplicate-label, а
+диагностика и остановка на max_errors-й ошибке повторяют однопроходный
+движок.
+"""
+
+import os
+import time
+from array import array
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
+from .instructions import INSTRUCTIONS
+from .parser import Parser
+from .compiler import Compiler, compile_error_message
+from .diagnostics import KINDS, INVALID_IMMEDIATE, DUPLICATE_LABEL
+from .engine import diagnostic_text
+from .lexer import split_line
+from .output import code_buffer, write_bin
+from .source import MappedSource
+from .symbols import SymbolTable
+
+# Частей на воркер: части с разной плотностью инструкций распределяются ровнее
+CHUNKS_PER_WORKER = 4
+
+# Меньшие части не выделяются: запуск задачи в воркере стоит дороже
+MIN_CHUNK_SIZE = 256 * 1024
+
+# "Строка", на которой однопроходный движок сообщает о неопределённых
+# метках: после всех строк исходника
+AT_END = float('inf')
+
+# Определения инструкций по номерам: номер передаётся со ссылкой вместо имени
+_DEFS = tuple(INSTRUCTIONS.values())
+_DEF_IDS = {instr_def: k for k, instr_def in enumerate(_DEFS)}
+# Нули на месте регистров: упаковка одного адреса метки поверх слова
+_ZEROS = tuple((0,) * (len(instr_def.operand_kinds) - 1) for instr_def in _DEFS)
+
+# Исходник и Parser/Compiler процесса-воркера: задаются один раз в _init_worker
+_source = None
+_parser = None
+_compiler = None
+
+
+class ParallelResult:
+    """Итог параллельной сборки файла"""
+    def __init__(self):
+        self.ok = False
+        self.instructions = 0
+        self.diagnostics = []  # Тройки (номер строки, вид, сообщение), как у AssemblyResult
+        self.labels = 0        # Число меток
+        self.chunks = 0
+        self.workers = 0
+        self.elapsed = 0.0
+
+
+def _init_worker(path):
+    """Инициализация процесса: отображение исходника и один Parser/Compiler на воркер"""
+    global _source, _parser, _compiler
+    _source = MappedSource(path)
+    _parser = Parser(INSTRUCTIONS)
+    _compiler = Compiler(_parser)
+
+
+def _release_worker():
+    global _source
+    if _source is not None:
+        _source.close()
+    _source = None
+
+
+def _assemble_chunk(bounds):
+    """
+    Разбор и кодирование части файла без таблицы меток; строки считаются
+    от начала части, с 1.
+
+    Returns:
+        (число строк, массив слов, метки, их строки и адреса от начала
+        части, ссылки, записи диагностики). Строки и адреса меток - в
+        array, чтобы передача из воркера стоила немного. Ссылки -
+        array номеров слов, строк, номеров меток в списке имён и номеров
+        определений в _DEFS, затем список имён; их слова в массиве
+        упакованы с нулевым непосредственным значением. Записи -
+        (строка, мнемоника, аргументы, ошибки, предупреждения); ошибки -
+        пары (код, сообщение): текст для вывода содержит номер строки в
+        файле и строится в _resolve_chunk
+    """
+    parse_instruction = _parser.parse_instruction
+    parse_operands = _parser.parse_operands
+    encode = _compiler.encode
+    words = code_buffer()
+    append = words.append
+    labels = []
+    label_lines = array('I')
+    label_addresses = array('I')
+    ref_words = array('I')
+    ref_lines = array('I')
+    ref_symbols = array('I')
+    ref_defs = array('H')
+    symbol_ids = {}
+    notes = []
+
+    count = 0
+    for count, text in enumerate(_source.iter_chunk(*bounds), 1):
+        if not text:
+            continue
+        label, parts = split_line(text)
+        if label is not None:
+            labels.append(label)
+            label_lines.append(count)
+            label_addresses.append(len(words) * 4)
+        if not parts:
+            continue
+
+        instr_def, args, errors, warnings = parse_instruction(parts, count)
+        if instr_def is None:
+            notes.append((count, None, args, [(code, message) for code, _, message in errors], []))
+            continue
+        # Слово резервируется и при ошибке: адреса следующих меток не сдвигаются
+        append(0)
+        if errors:
+            notes.append((count, instr_def.name, args,
+                          [(code, message) for code, _, message in errors], []))
+            continue
+
+        error = None
+        operands, symbol, operand_error = parse_operands(instr_def, args)
+        if operand_error is not None:
+            code, _, message = operand_error
+            error = (code, message)
+        elif symbol is not None:
+            # Метка в операнде бывает только в форматах, где ноль - допустимое значение
+            words[-1] = instr_def.pack(instr_def.base_word, *operands, 0)
+            ref_words.append(len(words) - 1)
+            ref_lines.append(count)
+            ref_symbols.append(symbol_ids.setdefault(symbol, len(symbol_ids)))
+            ref_defs.append(_DEF_IDS[instr_def])
+        else:
+            word, message = encode(instr_def, operands)
+            if message is None:
+                words[-1] = word
+            else:
+                error = (INVALID_IMMEDIATE, message)
+
+        if error is not None or warnings:
+            notes.append((count, instr_def.name, args, [error] if error is not None else [],
+                          [message for _, _, message in warnings]))
+    refs = (ref_words, ref_lines, ref_symbols, ref_defs, list(symbol_ids))
+    return count, words, labels, label_lines, label_addresses, refs, notes
+
+
+def _resolve_chunk(words, first_line, refs, chunk_notes, duplicates, symbols, parser, chunk_lines):
+    """
+    Ссылки части по таблице меток всего файла: слова дописываются в words;
+    duplicates - пары (номер строки в файле, метка) повторных определений
+    меток в этой части; chunk_lines() заново выдаёт строки кода части -
+    из них берётся текст аргументов для ошибок в ссылках.
+
+    Returns:
+        записи диагностики части по порядку строк: (номер строки в файле,
+        ошибки, предупреждения); ошибки - тройки (вид, текст, строка, на
+        которой ошибку нашёл бы однопроходный движок)
+    """
+    offset = first_line - 1
+    notes = {}
+    for line, name, args, errors, warnings in chunk_notes:
+        line_num = offset + line
+        instr_def = INSTRUCTIONS.get(name) if name is not None else None
+        notes[line_num] = ([(KINDS[code], diagnostic_text(code, line_num, instr_def, args, message), line_num)
+                            for code, message in errors], warnings)
+
+    # Повторное определение метки однопроходный движок сообщает первым в строке
+    for line_num, label in duplicates:
+        notes.setdefault(line_num, ([], []))[0].insert(
+            0, (KINDS[DUPLICATE_LABEL], f"Label '{label}' is already defined", line_num))
+
+    ref_words, ref_lines, ref_symbols, ref_defs, names = refs
+    resolve = symbols.resolve
+    failed = []  # (строка в части, определение, сообщение кодировщика, строка обнаружения)
+    for index, line, symbol_id, def_id in zip(ref_words, ref_lines, ref_symbols, ref_defs):
+        instr_def = _DEFS[def_id]
+        address, found = resolve(names[symbol_id], offset + line)
+        if address is None:
+            failed.append((line, instr_def, None, AT_END))
+            continue
+        check = instr_def.immediate_error
+        message = check(address) if check is not None else None
+        if message is None:
+            words[index] = instr_def.pack(words[index], *_ZEROS[def_id], address)
+        else:
+            failed.append((line, instr_def, message, found))
+
+    if failed:
+        # Ошибки в ссылках редки: строки части перечитываются ради них один раз
+        wanted = {line for line, _, _, _ in failed}
+        arguments = {line: split_line(text)[1][1:]
+                     for line, text in enumerate(chunk_lines(), 1) if line in wanted}
+        for line, instr_def, message, found in failed:
+            line_num = offset + line
+            args = arguments[line]
+            if found == AT_END:
+                # Текст для вывода - тот, что даёт разбор аргумента как числа
+                _, message = parser.read_immediate(args[-1])
+                error = ('COMPILATION ERROR', compile_error_message(instr_def, args, message), AT_END)
+            else:
+                error = (KINDS[INVALID_IMMEDIATE],
+                         diagnostic_text(INVALID_IMMEDIATE, line_num, instr_def, args, message), found)
+            notes.setdefault(line_num, ([], []))[0].append(error)
+
+    return [(line_num, errors, warnings) for line_num, (errors, warnings) in sorted(notes.items())]
+
+
+def _read_chunk(path, bounds):
+    """Строки кода части файла списком (файл открывается заново)"""
+    with MappedSource(path) as source:
+        return list(source.iter_chunk(*bounds))
+
+
+def _stop_line(notes, max_errors):
+    """
+    Строка, после которой однопроходный движок остановился бы на
+    max_errors-й ошибке, или None
+    """
+    if max_errors is None:
+        return None
+    found = sorted(event for _, errors, _ in notes for _, _, event in errors)
+    if len(found) < max_errors:
+        return None
+    return found[max_errors - 1]
+
+
+def merge_diagnostics(notes, max_errors=None):
+    """
+    Диагностика в том виде, что дали бы Assembler.assemble(max_errors=...)
+    и AssemblyResult.diagnostics(max_errors=...): тройки (номер строки,
+    вид, сообщение). notes - записи _resolve_chunk всех частей по порядку.
+    """
+    stop = _stop_line(notes, max_errors)
+    # Неопределённые метки сообщаются после всех строк, без остановки
+    if stop is None or stop == AT_END:
+        stop = AT_END
+
+    diagnostics = []
+    error_count = 0
+    for line_num, errors, warnings in notes:
+        if line_num > stop:
+            break
+        for kind, text, event in errors:
+            if event <= stop:
+                diagnostics.append((line_num, kind, text))
+                error_count += 1
+        if max_errors is not None and error_count >= max_errors:
+            break
+        for warn in warnings:
+            diagnostics.append((line_num, 'WARNING', warn))
+    return diagnostics
+
+
+def assemble_file(path, out, jobs=None, max_errors=None):
+    """
+    Параллельная сборка файла path; образ пишется в out (файл, открытый
+    'wb') по частям, пока в сборке нет ошибок.
+
+    Args:
+        jobs: число процессов (None - по числу ядер)
+        max_errors: остановиться на строке, где набралось столько ошибок
+            (None - собрать все ошибки)
+
+    Returns:
+        ParallelResult; при ошибке в out может остаться часть образа
+    """
+    result = ParallelResult()
+    start_time = time.perf_counter()
+
+    with MappedSource(path) as source:
+        workers = max(1, jobs or os.cpu_count() or 1)
+        count = max(1, min(workers * CHUNKS_PER_WORKER, source.size // MIN_CHUNK_SIZE))
+        bounds = source.chunk_bounds(count)
+    workers = max(1, min(workers, len(bounds)))
+    result.chunks = len(bounds)
+    result.workers = workers
+
+    # Разбор и кодирование частей; ссылкам на метки нужны все части
+    if workers == 1:
+        # Без пула: тот же код, но без накладных расходов на процессы
+        _init_worker(path)
+        try:
+            chunks = list(map(_assemble_chunk, bounds))
+        finally:
+            _release_worker()
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(path,)) as executor:
+            chunks = list(executor.map(_assemble_chunk, bounds))
+
+    # Номер первой строки и адрес начала каждой части, таблица меток
+    chunk_labels = []
+    first_lines = []
+    first_line = 1
+    address = 0
+    for lines, words, labels, label_lines, label_addresses, _, _ in chunks:
+        chunk_labels.append((labels, array('I', [first_line - 1 + line for line in label_lines]),
+                             array('I', [address + offset for offset in label_addresses])))
+        first_lines.append(first_line)
+        first_line += lines
+        address += len(words) * 4
+    symbols = SymbolTable.from_chunks(chunk_labels)
+    del chunk_labels
+    result.labels = len(symbols)
+    duplicates = sorted(symbols.duplicates.items())
+    first_lines.append(first_line)  # Граница после последней части
+
+    # Ссылки на метки; слова пишутся по порядку, пока нет ошибок, и
+    # записанная часть сразу отпускается
+    parser = Parser(INSTRUCTIONS)
+    notes = []
+    failed = False
+    for k, (_, words, _, _, _, refs, chunk_notes) in enumerate(chunks):
+        chunks[k] = None
+        first_line, next_line = first_lines[k], first_lines[k + 1]
+        chunk_duplicates = [(line_num, label) for line_num, label in duplicates
+                            if first_line <= line_num < next_line]
+        resolved = _resolve_chunk(words, first_line, refs, chunk_notes, chunk_duplicates,
+                                  symbols, parser, partial(_read_chunk, path, bounds[k]))
+        notes.extend(resolved)
+        failed = failed or any(errors for _, errors, _ in resolved)
+        if not failed:
+            write_bin(out, words)
+            result.instructions += len(words)
+        del words, refs, chunk_notes
+
+    result.ok = not failed
+    result.diagnostics = merge_diagnostics(notes, max_errors)
+    result.elapsed = time.perf_counter() - start_time
+    return result
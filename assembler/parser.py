@@ -3,74 +3,113 @@
 """
 
 import re
-from .errors import AssemblyError
+from .diagnostics import (UNKNOWN_INSTRUCTION, OPERAND_COUNT, CHECK_ERROR, CHECK_FAILED,
+                          CHECK_WARNING, INVALID_OPERAND)
+from .encoding import IMM
+from .lexer import split_line
+from .registers import REGISTER_NUMBERS
+
+# Общий пустой список сообщений: строки без диагностики не выделяют списков
+_NO_MESSAGES = ()
+
+# Непосредственный операнд-имя метки (после strip().lower(), как в parse_immediate)
+_SYMBOL_RE = re.compile(r'^[a-zA-Z_][a-zA-Z0-9_]*$')
+
+# Форматы, где непосредственный операнд - смещение от адреса инструкции
+# (beq, jal). Метка в операнде разрешается в абсолютный адрес, поэтому
+# в этих форматах она не принимается: смещение пишется числом
+_PC_RELATIVE_FORMATS = ('B', 'J')
+
+# Записи, среди которых только и могут быть числа, принимаемые int()
+# с этим основанием (с запасом): строка вне них - заведомо не число, и
+# её не нужно передавать в int() ради исключения
+_INT_SYNTAX = {
+    10: re.compile(r'\s*[+-]?\d[\d_]*\s*'),
+    16: re.compile(r'\s*[+-]?(?:0[xX])?[\d_a-fA-F]+\s*'),
+    2: re.compile(r'\s*[+-]?(?:0[bB])?[\d_]+\s*'),
+}
+
+
+def read_int(text, base=10):
+    """
+    int(text, base) без исключения на неверной записи.
+
+    Returns:
+        (число, None) или (None, сообщение как у ValueError из int())
+    """
+    if _INT_SYNTAX[base].fullmatch(text):
+        try:
+            return int(text, base), None
+        except ValueError as e:  # Редкие записи вроде '1__0'
+            return None, str(e)
+    return None, f"invalid literal for int() with base {base}: {text!r:.200}"
 
 class Parser:
     def __init__(self, instructions_def):
         self.instructions = instructions_def
         self.labels = {}
+        self.duplicate = None     # Повторно определённая метка, ещё не сообщённая движком
         self.current_address = 0  # Текущий адрес для меток
+        self.split_line = split_line  # Лексер (профилировщик подменяет его обёрткой)
         
     def parse_line(self, line, line_num):
-        """Парсинг одной строки ассемблера"""
-        # Сохраняем оригинал для сообщений об ошибках
-        original_line = line
-        
-        # Удаляем комментарии (всё после #)
-        if '#' in line:
-            line = line.split('#')[0]
-        
-        line = line.strip()
-        
-        # Пропускаем пустые строки
-        if not line:
-            return None, [], [], []
-        
-        # Проверка на метку (метка в начале строки)
-        label = None
-        if ':' in line:
-            parts = line.split(':', 1)
-            possible_label = parts[0].strip()
-            
-            # Проверяем, что это валидная метка (только буквы/цифры/_)
-            if possible_label and re.match(r'^[a-zA-Z_][a-zA-Z0-9_]*$', possible_label):
-                label = possible_label
+        """Парсинг одной строки ассемблера (см. parse_instruction)"""
+        # Лексер за один просмотр отделяет комментарий, метку и слова
+        label, parts = self.split_line(line)
+
+        if label is not None:
+            if label in self.labels:
+                # Остаётся первое определение: ссылки вперёд уже могли
+                # получить его адрес
+                self.duplicate = label
+            else:
                 # Сохраняем метку с текущим адресом
                 self.labels[label] = self.current_address
-                
-                # Если после метки ничего нет
-                if len(parts) == 1 or not parts[1].strip():
-                    return None, [], [], []
-                
-                # Продолжаем парсинг после метки
-                line = parts[1].strip()
-        
-        # Разбираем оставшуюся часть строки (инструкцию)
-        # Разделяем по запятым и пробелам
-        parts = re.split(r'[,\s]+', line)
-        
-        # Убираем пустые элементы
-        parts = [p.strip() for p in parts if p.strip()]
-        
+
+        # Пустая строка, комментарий или только метка
         if not parts:
-            return None, [], [], []
-        
+            return None, _NO_MESSAGES, _NO_MESSAGES, _NO_MESSAGES
+
+        instr_def, args, errors, warnings = self.parse_instruction(parts, line_num)
+
+        # Увеличиваем адрес для следующей инструкции (4 байта на инструкцию RISC-V);
+        # неизвестная инструкция места не занимает
+        if instr_def is not None:
+            self.current_address += 4
+
+        return instr_def, args, errors, warnings
+
+    def parse_instruction(self, parts, line_num=0):
+        """
+        Разбор слов инструкции (мнемоника и аргументы) без побочных эффектов:
+        метки и текущий адрес не меняются.
+
+        Проверки из определения инструкции выполняются здесь, один раз:
+        результат с 'ERROR' - ошибка, остальные - предупреждения
+        (предупреждения возвращаются только для строк без ошибок).
+
+        Returns:
+            (определение или None для неизвестной инструкции, аргументы,
+            ошибки, предупреждения); ошибки и предупреждения - тройки
+            (код из diagnostics, номер слова или None, сообщение), слово 0 -
+            мнемоника. Исключений на ошибках в тексте нет.
+        """
         mnemonic = parts[0].lower()
         
-        if mnemonic not in self.instructions:
-            raise AssemblyError(f"Unknown instruction '{mnemonic}'", line_num)
+        instr_def = self.instructions.get(mnemonic)
+        if instr_def is None:
+            return None, _NO_MESSAGES, [(UNKNOWN_INSTRUCTION, 0, f"Unknown instruction '{mnemonic}'")], _NO_MESSAGES
         
-        instr_def = self.instructions[mnemonic]
         args = parts[1:]
         
-        # Проверка аргументов
-        errors = []
-        warnings = []
+        # Проверка аргументов; списки создаются только при первом сообщении
+        errors = None
+        warnings = None
         
         # Проверка количества аргументов
         expected_args = self._get_expected_args_count(instr_def.format_type)
         if expected_args != len(args):
-            errors.append(f"Expected {expected_args} arguments, got {len(args)}: {args}")
+            errors = [(OPERAND_COUNT, 0, f"Expected {expected_args} arguments, got {len(args)}: {args}")]
         
         # Вызываем проверки из определения инструкции
         if instr_def.checks:
@@ -79,14 +118,68 @@ class Parser:
                     result = check(args)
                     if result:
                         if "ERROR" in result.upper():
-                            errors.append(result)
+                            errors = errors or []
+                            errors.append((CHECK_ERROR, None, result))
+                        else:
+                            warnings = warnings or []
+                            warnings.append((CHECK_WARNING, None, result))
                 except Exception as e:
-                    errors.append(f"Check failed: {str(e)}")
-        
-        # Увеличиваем адрес для следующей инструкции (4 байта на инструкцию RISC-V)
-        self.current_address += 4
+                    # Упавшая проверка - ошибка в самой проверке, а не в тексте
+                    errors = errors or []
+                    errors.append((CHECK_FAILED, None, f"Check failed: {str(e)}"))
         
-        return instr_def, args, errors, warnings
+        if errors:
+            return instr_def, args, errors, _NO_MESSAGES
+        return instr_def, args, _NO_MESSAGES, warnings or _NO_MESSAGES
+
+    def parse_operands(self, instr_def, args):
+        """
+        Операнды проверенной инструкции как целые числа.
+
+        Регистры и числа разбираются один раз, здесь; кодировщику остаётся
+        только упаковка. Имя метки в непосредственном операнде не
+        разрешается: оно возвращается как символ, а адрес метки
+        дописывается последним операндом, когда метка известна
+        (непосредственный операнд во всех форматах - последний).
+
+        Returns:
+            (операнды, символ, ошибка): кортеж чисел или кортеж без
+            непосредственного операнда при символе - имени метки; ошибка -
+            None или тройка как у parse_instruction (тогда операнды None).
+            Метка в смещении beq/jal (форматы B и J) - ошибка: адрес метки
+            абсолютный, а смещение отсчитывается от инструкции
+        """
+        kinds = instr_def.operand_kinds
+        if not kinds:
+            return None, None, (INVALID_OPERAND, 0, f"Unknown format type: {instr_def.format_type}")
+
+        has_immediate = kinds[-1] == IMM
+        registers = args[:-1] if has_immediate else args
+
+        # Обычные написания - прямо из таблицы, остальные - медленным путём
+        operands = [REGISTER_NUMBERS.get(arg) for arg in registers]
+        if None in operands:
+            for index, arg in enumerate(registers):
+                if operands[index] is None:
+                    operands[index], error = self.read_register(arg)
+                    if error is not None:
+                        return None, None, (INVALID_OPERAND, index + 1, error)
+        operands = tuple(operands)
+        if not has_immediate:
+            return operands, None, None
+
+        immediate = args[-1]
+        symbol = immediate.strip().lower()
+        if _SYMBOL_RE.match(symbol):
+            if instr_def.format_type in _PC_RELATIVE_FORMATS:
+                return None, None, (INVALID_OPERAND, len(args),
+                                    f"Label '{symbol}' cannot be a {instr_def.format_type}-format offset: "
+                                    f"write the byte offset from this instruction")
+            return operands, symbol, None
+        value, error = self.read_immediate(immediate)
+        if error is not None:
+            return None, None, (INVALID_OPERAND, len(args), error)
+        return operands + (value,), None, None
     
     def _get_expected_args_count(self, format_type):
         """Количество ожидаемых аргументов для формата"""
@@ -101,68 +194,78 @@ class Parser:
         return counts.get(format_type, 0)
     
     def parse_register(self, reg_str):
-        """Парсинг регистра (x0-x31)"""
+        """Парсинг регистра (x0-x31, r0-r31, ABI имена); ValueError при ошибке"""
+        try:
+            return REGISTER_NUMBERS[reg_str]
+        except (KeyError, TypeError):
+            number, error = self.read_register(reg_str)
+            if error is not None:
+                raise ValueError(error)
+            return number
+
+    def read_register(self, reg_str):
+        """
+        Разбор регистра без исключений, в том числе написаний, которых нет
+        в таблице: (номер, None) или (None, сообщение об ошибке)
+        """
         if not isinstance(reg_str, str):
-            raise ValueError(f"Invalid register: {reg_str}")
-        
+            return None, f"Invalid register: {reg_str}"
+
+        number = REGISTER_NUMBERS.get(reg_str)
+        if number is not None:
+            return number, None
+
         reg_str = reg_str.strip().lower()
-        
-        # Поддержка регистров по именам
-        reg_aliases = {
-            'zero': 'x0', 'ra': 'x1', 'sp': 'x2', 'gp': 'x3',
-            'tp': 'x4', 't0': 'x5', 't1': 'x6', 't2': 'x7',
-            's0': 'x8', 'fp': 'x8', 's1': 'x9',
-            'a0': 'x10', 'a1': 'x11', 'a2': 'x12', 'a3': 'x13',
-            'a4': 'x14', 'a5': 'x15', 'a6': 'x16', 'a7': 'x17',
-            's2': 'x18', 's3': 'x19', 's4': 'x20', 's5': 'x21',
-            's6': 'x22', 's7': 'x23', 's8': 'x24', 's9': 'x25',
-            's10': 'x26', 's11': 'x27',
-            't3': 'x28', 't4': 'x29', 't5': 'x30', 't6': 'x31'
-        }
 
+        if reg_str in REGISTER_NUMBERS:
+            return REGISTER_NUMBERS[reg_str], None
 
-        
-        # Если это алиас, конвертируем
-        if reg_str in reg_aliases:
-            reg_str = reg_aliases[reg_str]
-        
         # Проверяем формат xN or rN
         if reg_str.startswith('r'):
             reg_str = 'x'+reg_str[1:]
-        
+
         # Проверяем формат регистра
         if not reg_str.startswith('x'):
-            raise ValueError(f"Invalid register format: '{reg_str}'. Expected x0-x31 or r0-r31")
-        
-        try:
-            reg_num = int(reg_str[1:])
-            if not (0 <= reg_num <= 31):
-                raise ValueError(f"Register number out of range: {reg_num}. Must be 0-31")
-            return reg_num
-        except ValueError:
-            raise ValueError(f"Invalid register number: '{reg_str[1:]}'")
-    
+            return None, f"Invalid register format: '{reg_str}'. Expected x0-x31 or r0-r31"
+
+        # Написания вроде x05 по-прежнему принимаются
+        reg_num, error = read_int(reg_str[1:])
+        if error is not None or not (0 <= reg_num <= 31):
+            return None, f"Invalid register number: '{reg_str[1:]}'"
+        return reg_num, None
+
     def parse_immediate(self, imm_str, line_num=0):
-        """Парсинг непосредственного значения"""
+        """Парсинг непосредственного значения; ValueError при ошибке"""
+        value, error = self.read_immediate(imm_str)
+        if error is not None:
+            raise ValueError(error)
+        return value
+
+    def read_immediate(self, imm_str):
+        """
+        Разбор непосредственного значения (число или известная метка) без
+        исключений: (значение, None) или (None, сообщение об ошибке)
+        """
         if not isinstance(imm_str, str):
-            raise ValueError(f"Invalid immediate: {imm_str}")
+            return None, f"Invalid immediate: {imm_str}"
         
         imm_str = imm_str.strip().lower()
         
-        try:
-            # Шестнадцатеричное (0x...)
-            if imm_str.startswith('0x'):
-                return int(imm_str, 16)
-            # Двоичное (0b...)
-            elif imm_str.startswith('0b'):
-                return int(imm_str, 2)
-            # Десятичное (может быть отрицательным)
-            else:
-                # Проверяем на метку
-                if imm_str in self.labels:
-                    return self.labels[imm_str]
-                
-                # Пробуем парсить как число
-                return int(imm_str)
-        except ValueError as e:
-            raise ValueError(f"Invalid immediate value '{imm_str}': {str(e)}")
\ No newline at end of file
+        # Шестнадцатеричное (0x...)
+        if imm_str.startswith('0x'):
+            value, error = read_int(imm_str, 16)
+        # Двоичное (0b...)
+        elif imm_str.startswith('0b'):
+            value, error = read_int(imm_str, 2)
+        # Десятичное (может быть отрицательным)
+        else:
+            # Проверяем на метку
+            if imm_str in self.labels:
+                return self.labels[imm_str], None
+            
+            # Пробуем парсить как число
+            value, error = read_int(imm_str)
+
+        if error is not None:
+            return None, f"Invalid immediate value '{imm_str}': {error}"
+        return value, None
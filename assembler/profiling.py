@@ -0,0 +1,156 @@
+"""
+Профилирование сборки: время по этапам и счётчики
+
+ProfilingAssembler - тот же Assembler, у которого лексер, parse_line и
+разбор операндов, проверки инструкций, поиск меток и кодирование
+обёрнуты таймерами. Обычная сборка не платит за профилирование ничего: обёртки
+ставятся только на экземпляры профилирующего ассемблера.
+
+Время этапов исключающее: время лексера не входит в parse, время
+проверок, вызванных из parse_line, не входит ни в parse, ни в lex.
+"""
+
+import copy
+import json
+import time
+from collections import Counter
+from contextlib import contextmanager
+from .engine import Assembler
+
+# Этапы в порядке вывода
+PHASES = ('lex', 'parse', 'checks', 'resolve', 'compile', 'output')
+
+PHASE_TITLES = {
+    'lex': 'lexing (split_line)',
+    'parse': 'parse (line, operands)',
+    'checks': 'instruction checks',
+    'resolve': 'label resolution',
+    'compile': 'encoding',
+    'output': 'output writing',
+    'other': 'other',
+}
+
+
+class AssemblyStats:
+    """Время по этапам, счётчики инструкций и диагностики"""
+
+    def __init__(self):
+        self.times = dict.fromkeys(PHASES, 0.0)
+        self.total = 0.0            # Время сборки (assemble) и вывода целиком
+        self.lines = 0
+        self.instructions = 0
+        self.mnemonics = Counter()
+        self.formats = Counter()
+        self.diagnostics = Counter()  # вид -> количество
+        self._nested = 0.0          # Время вложенных таймеров текущего вызова
+
+    def timed(self, phase, func):
+        """Обёртка func, добавляющая её исключающее время к этапу phase"""
+        times = self.times
+        perf_counter = time.perf_counter
+
+        def wrapper(*args):
+            outer = self._nested
+            self._nested = 0.0
+            start = perf_counter()
+            try:
+                return func(*args)
+            finally:
+                elapsed = perf_counter() - start
+                times[phase] += elapsed - self._nested
+                self._nested = outer + elapsed
+        return wrapper
+
+    @contextmanager
+    def phase(self, phase):
+        """Замер этапа вне ассемблера (например, записи образа)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.times[phase] += elapsed
+            self.total += elapsed
+
+    def count_result(self, result):
+        """Счётчики по результату сборки (AssemblyResult)"""
+        self.lines += sum(1 for _ in result.iter_lines())
+        self.instructions += len(result.machine_code)
+        for def_id, count in Counter(result.word_defs).items():
+            instr_def = result.defs[def_id]
+            self.mnemonics[instr_def.name] += count
+            self.formats[instr_def.format_type] += count
+        for record in result.notes.values():
+            for kind, _ in record.errors:
+                self.diagnostics[kind] += 1
+            if record.warnings:
+                self.diagnostics['WARNING'] += len(record.warnings)
+
+    def as_dict(self):
+        """Отчёт в виде словаря (для JSON)"""
+        phases = dict(self.times)
+        phases['other'] = max(0.0, self.total - sum(self.times.values()))
+        return {
+            'total_seconds': self.total,
+            'phases_seconds': phases,
+            'lines': self.lines,
+            'instructions': self.instructions,
+            'instructions_per_second': self.instructions / self.total if self.total else 0.0,
+            'mnemonics': dict(self.mnemonics.most_common()),
+            'formats': dict(sorted(self.formats.items())),
+            'diagnostics': dict(sorted(self.diagnostics.items())),
+        }
+
+    def to_json(self):
+        return json.dumps(self.as_dict(), indent=2)
+
+    def format_table(self):
+        """Отчёт в виде текстовой таблицы"""
+        report = self.as_dict()
+        total = report['total_seconds']
+        lines = [f"{'phase':<22} {'ms':>10} {'%':>6}"]
+        for phase, seconds in report['phases_seconds'].items():
+            share = 100 * seconds / total if total else 0.0
+            lines.append(f"{PHASE_TITLES[phase]:<22} {seconds * 1000:>10.3f} {share:>6.1f}")
+        lines.append(f"{'total':<22} {total * 1000:>10.3f}")
+        lines.append(f"\n{report['lines']} lines, {report['instructions']} instructions "
+                     f"({report['instructions_per_second']:,.0f} instructions/s)")
+
+        for title, counts in (('mnemonic', report['mnemonics']),
+                              ('format', report['formats']),
+                              ('diagnostic', report['diagnostics'])):
+            if counts:
+                lines.append(f"\n{title:<22} {'count':>10}")
+                lines.extend(f"{name:<22} {count:>10}" for name, count in counts.items())
+        return '\n'.join(lines)
+
+
+class ProfilingAssembler(Assembler):
+    """Assembler, собирающий AssemblyStats"""
+
+    def __init__(self, instructions_def, stats=None):
+        self.stats = stats if stats is not None else AssemblyStats()
+        timed = self.stats.timed
+
+        # Проверки обёрнуты в копиях определений: общие таблицы не меняются
+        profiled_defs = {}
+        for name, instr_def in instructions_def.items():
+            instr_def = copy.copy(instr_def)
+            instr_def.checks = [timed('checks', check) for check in instr_def.checks]
+            profiled_defs[name] = instr_def
+
+        super().__init__(profiled_defs)
+
+        parser = self.parser
+        parser.split_line = timed('lex', parser.split_line)
+        parser.parse_line = timed('parse', parser.parse_line)
+        parser.parse_operands = timed('parse', parser.parse_operands)
+        self.compiler.encode = timed('compile', self.compiler.encode)
+        self._symbol_address = timed('resolve', self._symbol_address)
+
+    def assemble(self, lines, stop_on_error=False, max_errors=None):
+        start = time.perf_counter()
+        result = super().assemble(lines, stop_on_error, max_errors)
+        self.stats.total += time.perf_counter() - start
+        self.stats.count_result(result)
+        return result
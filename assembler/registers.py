@@ -0,0 +1,36 @@
+"""
+Таблица регистров RISC-V
+"""
+
+from types import MappingProxyType
+
+# Имена регистров по соглашению ABI
+_ABI_NAMES = {
+    'zero': 0, 'ra': 1, 'sp': 2, 'gp': 3,
+    'tp': 4, 't0': 5, 't1': 6, 't2': 7,
+    's0': 8, 'fp': 8, 's1': 9,
+    'a0': 10, 'a1': 11, 'a2': 12, 'a3': 13,
+    'a4': 14, 'a5': 15, 'a6': 16, 'a7': 17,
+    's2': 18, 's3': 19, 's4': 20, 's5': 21,
+    's6': 22, 's7': 23, 's8': 24, 's9': 25,
+    's10': 26, 's11': 27,
+    't3': 28, 't4': 29, 't5': 30, 't6': 31
+}
+
+def _build_register_numbers():
+    """Все допустимые написания регистров (xN, rN, ABI) -> номер регистра"""
+    numbers = {}
+    for num in range(32):
+        numbers[f'x{num}'] = num
+        numbers[f'r{num}'] = num
+    numbers.update(_ABI_NAMES)
+
+    # Верхний регистр тоже находится одним обращением к словарю,
+    # смешанный ("Sp") - после приведения к нижнему
+    for name, num in list(numbers.items()):
+        numbers[name.upper()] = num
+
+    return MappingProxyType(numbers)
+
+# Неизменяемая таблица: написание регистра -> номер
+REGISTER_NUMBERS = _build_register_numbers()
@@ -0,0 +1,256 @@
+"""
+Сервер ассемблера на локальном Unix-сокете
+
+Система сборки держит один процесс с загруженными таблицами вместо
+запуска интерпретатора на каждый файл. Протокол - JSON по строкам:
+клиент пишет запрос в одну строку, сервер отвечает одной строкой;
+в одном соединении можно отправить сколько угодно запросов.
+
+Запрос:
+    {"id": ..., "source": "текст"}  или  {"id": ..., "path": "/abs/file.s"}
+    необязательно: "output": "/abs/file.bin" - записать образ в файл,
+                   "stop_on_error": true (по умолчанию, как у CLI)
+
+Ответ:
+    {"id": ..., "ok": true/false, "instructions": N,
+     "diagnostics": [[строка, вид, сообщение], ...],
+     "code": "hex образа (little-endian)"  - если не задан "output",
+     "output": путь                        - если образ записан}
+    при неверном запросе: {"id": ..., "ok": false, "error": "сообщение"}
+
+Соединения обслуживаются потоками, а сама сборка (работа для процессора)
+идёт в пуле процессов: в потоках она выполнялась бы по одной из-за GIL.
+"""
+
+import json
+import multiprocessing
+import os
+import socket
+import socketserver
+import stat
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from .instructions import INSTRUCTIONS
+from .engine import Assembler
+from .output import little_endian_view, write_bin, remove_output
+from .source import read_source
+
+# Переменная окружения с путём сокета
+SOCKET_ENV = 'RISCV_ASM_SOCKET'
+
+# Имя сокета в каталоге по умолчанию
+SOCKET_NAME = 'riscv_asm.sock'
+
+
+def _private_dir(path, create=False):
+    """
+    Каталог path, доступный только текущему пользователю; create -
+    создать с правами 0700, если его нет. Иначе (чужой каталог, ссылка,
+    доступ для других) - OSError: в общем временном каталоге такой путь
+    мог заранее занять кто угодно.
+    """
+    if create:
+        try:
+            os.mkdir(path, 0o700)
+        except FileExistsError:
+            pass
+    info = os.lstat(path)
+    if (not stat.S_ISDIR(info.st_mode) or info.st_mode & 0o077
+            or (hasattr(os, 'getuid') and info.st_uid != os.getuid())):
+        raise OSError(f"unsafe socket directory {path}: "
+                      f"it must be a directory owned by the current user with mode 0700")
+    return path
+
+
+def default_socket_path(create=False):
+    """
+    Путь сокета: $RISCV_ASM_SOCKET, иначе riscv_asm.sock в
+    $XDG_RUNTIME_DIR, иначе - в личном каталоге riscv_asm-<uid> во
+    временном каталоге (create - создать его; см. _private_dir)
+    """
+    path = os.environ.get(SOCKET_ENV)
+    if path:
+        return path
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR')
+    if runtime_dir:
+        return os.path.join(runtime_dir, SOCKET_NAME)
+    uid = os.getuid() if hasattr(os, 'getuid') else os.getpid()
+    directory = os.path.join(tempfile.gettempdir(), f"riscv_asm-{uid}")
+    return os.path.join(_private_dir(directory, create), SOCKET_NAME)
+
+
+class AssemblyService:
+    """Обработка запросов одним Assembler (в процессе-воркере сервера)"""
+
+    def __init__(self, instructions_def=INSTRUCTIONS):
+        self.assembler = Assembler(instructions_def)
+
+    def handle(self, request):
+        """Ответ (словарь) на запрос (словарь)"""
+        response = {'id': request.get('id')}
+
+        try:
+            for name in ('source', 'path', 'output'):
+                if request.get(name) is not None and not isinstance(request[name], str):
+                    raise ValueError(f"'{name}' must be a string")
+
+            if 'source' in request:
+                code = request['source']
+            elif 'path' in request:
+                try:
+                    code = read_source(request['path'])
+                except FileNotFoundError:
+                    # Те же слова, что у main.py
+                    raise OSError(f"File '{request['path']}' not found") from None
+            else:
+                raise ValueError("request needs 'source' or 'path'")
+            if not isinstance(code, str):
+                raise ValueError("'source' must be a string")
+
+            stop_on_error = bool(request.get('stop_on_error', True))
+            result = self.assembler.assemble(code.split('\n'), stop_on_error=stop_on_error)
+            ok = not result.has_errors
+
+            response['ok'] = ok
+            response['instructions'] = len(result.machine_code) if ok else 0
+            response['diagnostics'] = result.diagnostics(first_error_only=stop_on_error)
+
+            if ok:
+                output_file = request.get('output')
+                if output_file:
+                    remove_output(output_file)
+                    with open(output_file, 'wb') as f:
+                        write_bin(f, result.machine_code)
+                    response['output'] = output_file
+                else:
+                    response['code'] = little_endian_view(result.machine_code).hex()
+        except (OSError, ValueError, TypeError) as e:
+            response['ok'] = False
+            response['error'] = str(e)
+
+        return response
+
+
+# Обработчик запросов процесса-воркера: создаётся один раз в _init_worker
+_service = None
+
+
+def _init_worker():
+    global _service
+    _service = AssemblyService()
+
+
+def _handle_in_worker(request):
+    return _service.handle(request)
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Соединение: запросы и ответы по одному в строке"""
+
+    def handle(self):
+        server = self.server
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise ValueError("request must be a JSON object")
+            except ValueError as e:
+                response = {'id': None, 'ok': False, 'error': f"Invalid request: {e}"}
+            else:
+                try:
+                    response = server.assemble(request)
+                except Exception as e:
+                    # Упавший воркер не должен оставить клиента без ответа
+                    response = {'id': request.get('id'), 'ok': False,
+                                'error': f"Internal error: {type(e).__name__}: {e}"}
+
+            self.wfile.write(json.dumps(response).encode() + b'\n')
+            self.wfile.flush()
+
+
+class AssemblyServer(socketserver.UnixStreamServer):
+    """
+    Сервер на Unix-сокете: соединения обслуживаются пулом потоков, а
+    запросы ассемблируются в пуле из workers процессов (по умолчанию - по
+    числу ядер), так что одновременные запросы собираются параллельно.
+    """
+
+    def __init__(self, socket_path=None, workers=None):
+        self.socket_path = socket_path or default_socket_path(create=True)
+        workers = workers or os.cpu_count() or 1
+
+        # Сокет от прошлого запуска мешает bind, но сокет работающего
+        # сервера отбирать нельзя
+        if os.path.exists(self.socket_path):
+            if _is_listening(self.socket_path):
+                raise OSError(f"another server is already listening on {self.socket_path}")
+            os.remove(self.socket_path)
+
+        # Воркеры запускаются через forkserver: fork процесса, где уже
+        # работают потоки соединений, может унаследовать занятые блокировки
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else None)
+        self.workers = ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                           initializer=_init_worker)
+        self.pool = ThreadPoolExecutor(max_workers=min(32, workers + 4))
+        try:
+            super().__init__(self.socket_path, _RequestHandler)
+        except BaseException:
+            self.workers.shutdown(wait=False)
+            self.pool.shutdown(wait=False)
+            raise
+        # Подключаться может только владелец
+        os.chmod(self.socket_path, 0o600)
+
+    def assemble(self, request):
+        """Ответ на запрос; сборка - в пуле процессов"""
+        return self.workers.submit(_handle_in_worker, request).result()
+
+    def process_request(self, request, client_address):
+        self.pool.submit(self._process_in_pool, request, client_address)
+
+    def _process_in_pool(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self.pool.shutdown(wait=False)
+        self.workers.shutdown(wait=False, cancel_futures=True)
+        try:
+            os.remove(self.socket_path)
+        except OSError:
+            pass
+
+
+def _is_listening(socket_path):
+    """Принимает ли кто-то соединения на сокете socket_path"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(socket_path)
+        except OSError:
+            return False
+    return True
+
+
+def serve(socket_path=None, workers=None, verbose=True):
+    """Запуск сервера до Ctrl+C"""
+    try:
+        server = AssemblyServer(socket_path, workers)
+    except OSError as e:
+        print(f"Error: {e}")
+        return False
+    with server:
+        if verbose:
+            print(f"Assembler server listening on {server.socket_path} (Ctrl+C to stop)")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+    return True
@@ -0,0 +1,286 @@
+"""
+Симулятор RV32 для образов, собранных ассемблером
+
+Память - один bytearray, код загружается с адреса 0. Каждое слово
+декодируется один раз, при первом выполнении: получается замыкание-
+обработчик с уже извлечёнными операндами (и готовым адресом перехода
+для beq/jal), так что цикл интерпретатора только вызывает обработчики.
+Запись sw в область кода сбрасывает обработчик изменённого слова.
+
+Семантика - по спецификации RV32I для инструкций из таблиц ассемблера
+(add, addi, lw, sw, beq, jal, lui); смещения beq/jal отсчитываются от
+адреса инструкции. Ассемблер подставляет вместо метки её абсолютный
+адрес, поэтому метку в смещении beq/jal он не принимает - смещение
+пишется числом. Программа завершается, когда pc выходит за пределы
+загруженного кода.
+
+По умолчанию слова декодируются по той же таблице INSTRUCTIONS, по
+которой собирают CLI и GUI; образы по таблице INSTRUCTIONS_past (с
+lw/sw/beq/jal/lui) запускаются с Simulator(INSTRUCTIONS_past).
+"""
+
+import struct
+import time
+from .instructions import INSTRUCTIONS
+from .errors import SimulationError
+from .disassembler import Disassembler, UNPACKERS
+from .output import code_buffer, little_endian_view
+
+# Размер памяти по умолчанию
+DEFAULT_MEMORY_SIZE = 1 << 20
+
+# Ограничение числа шагов по умолчанию (защита от бесконечного цикла)
+DEFAULT_MAX_STEPS = 100_000_000
+
+MASK = 0xFFFFFFFF
+
+_WORD = struct.Struct('<I')
+
+
+# Фабрики обработчиков: по операндам и адресу инструкции возвращают
+# замыкание без аргументов, которое выполняет инструкцию и возвращает
+# адрес следующей
+
+def _make_add(sim, pc, rd, rs1, rs2):
+    regs = sim.regs
+    next_pc = pc + 4
+    if rd == 0:
+        return lambda: next_pc
+
+    def add():
+        regs[rd] = (regs[rs1] + regs[rs2]) & MASK
+        return next_pc
+    return add
+
+
+def _make_addi(sim, pc, rd, rs1, imm):
+    regs = sim.regs
+    next_pc = pc + 4
+    if rd == 0:
+        return lambda: next_pc
+
+    def addi():
+        regs[rd] = (regs[rs1] + imm) & MASK
+        return next_pc
+    return addi
+
+
+def _make_lw(sim, pc, rd, rs1, imm):
+    regs = sim.regs
+    unpack_from = _WORD.unpack_from
+    memory = sim.memory
+    next_pc = pc + 4
+
+    def lw():
+        value, = unpack_from(memory, (regs[rs1] + imm) & MASK)
+        if rd:
+            regs[rd] = value
+        return next_pc
+    return lw
+
+
+def _make_sw(sim, pc, rs1, rs2, imm):
+    regs = sim.regs
+    pack_into = _WORD.pack_into
+    memory = sim.memory
+    code_end = sim.code_end
+    invalidate = sim.invalidate
+    next_pc = pc + 4
+
+    def sw():
+        address = (regs[rs1] + imm) & MASK
+        pack_into(memory, address, regs[rs2])
+        if address < code_end:
+            invalidate(address)
+        return next_pc
+    return sw
+
+
+def _make_beq(sim, pc, rs1, rs2, imm):
+    regs = sim.regs
+    target = (pc + imm) & MASK
+    next_pc = pc + 4
+    if target % 4:
+        def beq():
+            if regs[rs1] == regs[rs2]:
+                _misaligned(pc, target)
+            return next_pc
+        return beq
+
+    def beq():
+        return target if regs[rs1] == regs[rs2] else next_pc
+    return beq
+
+
+def _make_jal(sim, pc, rd, imm):
+    regs = sim.regs
+    target = (pc + imm) & MASK
+    link = pc + 4
+
+    def jal():
+        if rd:
+            regs[rd] = link
+        if target % 4:
+            _misaligned(pc, target)
+        return target
+    return jal
+
+
+def _make_lui(sim, pc, rd, imm):
+    regs = sim.regs
+    value = imm & MASK
+    next_pc = pc + 4
+    if rd == 0:
+        return lambda: next_pc
+
+    def lui():
+        regs[rd] = value
+        return next_pc
+    return lui
+
+
+def _misaligned(pc, target):
+    raise SimulationError(f"Misaligned jump target 0x{target:08x}", pc)
+
+
+SEMANTICS = {
+    'add': _make_add,
+    'addi': _make_addi,
+    'lw': _make_lw,
+    'sw': _make_sw,
+    'beq': _make_beq,
+    'jal': _make_jal,
+    'lui': _make_lui,
+}
+
+
+class SimulationResult:
+    """Итог запуска: число шагов, время и причина остановки"""
+    def __init__(self, steps, elapsed, pc, finished):
+        self.steps = steps
+        self.elapsed = elapsed
+        self.pc = pc
+        self.finished = finished  # False - остановлен по max_steps
+
+    @property
+    def instructions_per_second(self):
+        return self.steps / self.elapsed if self.elapsed > 0 else 0.0
+
+
+class Simulator:
+    """Интерпретатор RV32 с кэшем декодированных инструкций"""
+
+    def __init__(self, instructions_def=INSTRUCTIONS, memory_size=DEFAULT_MEMORY_SIZE):
+        self.disassembler = Disassembler(instructions_def)
+        self.memory = bytearray(memory_size)
+        self.regs = [0] * 32
+        self.pc = 0
+        self.code_end = 0
+        self._handlers = []
+
+    def load(self, code):
+        """
+        Загрузка машинного кода с адреса 0 и сброс состояния.
+
+        Args:
+            code: слова (array, список или массив NumPy)
+        """
+        code = code_buffer(code.tolist() if hasattr(code, 'tolist') else code)
+        data = little_endian_view(code)
+        if len(data) > len(self.memory):
+            raise ValueError(f"Program of {len(data)} bytes does not fit in "
+                             f"{len(self.memory)} bytes of memory")
+
+        self.memory[:] = bytes(len(self.memory))
+        self.memory[:len(data)] = data
+        self.regs[:] = [0] * 32
+        self.pc = 0
+        self.code_end = len(data)
+        # Обработчики создаются заново: старые замкнуты на прежний code_end
+        self._handlers = [self._trampoline(index) for index in range(len(code))]
+
+    def load_file(self, path):
+        """Загрузка образа .bin/.hex/.mem (как их пишут CLI и GUI)"""
+        from .disassembler import read_image
+        segments = read_image(path)
+        if not segments:
+            self.load(())
+            return
+        # Отрезки .hex/.mem раскладываются с адреса 0; размер проверяется
+        # до того, как под образ выделяется память
+        last_address, last_words = segments[-1]
+        end = last_address + len(last_words) * 4
+        if end > len(self.memory):
+            raise ValueError(f"Program of {end} bytes does not fit in "
+                             f"{len(self.memory)} bytes of memory")
+        if len(segments) == 1 and last_address == 0:
+            self.load(last_words)
+            return
+        code = code_buffer([0]) * (end // 4)
+        for address, words in segments:
+            code[address // 4:address // 4 + len(words)] = code_buffer(
+                words.tolist() if hasattr(words, 'tolist') else words)
+        self.load(code)
+
+    def write_words(self, address, words):
+        """Запись слов в память (данные программы)"""
+        data = little_endian_view(code_buffer(words))
+        self.memory[address:address + len(data)] = data
+        if address < self.code_end:
+            for offset in range(0, len(data), 4):
+                self.invalidate(address + offset)
+
+    def read_words(self, address, count):
+        """Чтение count слов из памяти"""
+        return [value for value, in _WORD.iter_unpack(self.memory[address:address + count * 4])]
+
+    def invalidate(self, address):
+        """Сброс декодированных слов, задетых записью по address"""
+        handlers = self._handlers
+        for index in {address >> 2, (address + 3) >> 2}:
+            if index < len(handlers):
+                handlers[index] = self._trampoline(index)
+
+    def _trampoline(self, index):
+        """Обработчик-заглушка: декодирует слово при первом выполнении"""
+        def decode_and_run():
+            handler = self._decode(index)
+            self._handlers[index] = handler
+            return handler()
+        return decode_and_run
+
+    def _decode(self, index):
+        """Обработчик для слова кода с номером index"""
+        pc = index * 4
+        word, = _WORD.unpack_from(self.memory, pc)
+        found = self.disassembler.lookup(word)
+        factory = SEMANTICS.get(found[1].name) if found else None
+        if factory is None:
+            raise SimulationError(f"Illegal instruction 0x{word:08x}", pc)
+        return factory(self, pc, *UNPACKERS[found[1].format_type](word))
+
+    def run(self, max_steps=DEFAULT_MAX_STEPS):
+        """
+        Выполнение с текущего pc до выхода за пределы кода.
+
+        Raises:
+            SimulationError: неизвестная инструкция, невыровненный переход
+                или обращение за пределы памяти
+        """
+        handlers = self._handlers
+        code_end = self.code_end
+        pc = self.pc
+        steps = 0
+
+        start = time.perf_counter()
+        try:
+            while pc < code_end and steps < max_steps:
+                pc = handlers[pc >> 2]()
+                steps += 1
+        except struct.error:
+            raise SimulationError("Memory access out of range", pc)
+        finally:
+            self.pc = pc
+        elapsed = time.perf_counter() - start
+
+        return SimulationResult(steps, elapsed, pc, pc >= code_end)
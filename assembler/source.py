@@ -0,0 +1,132 @@
+"""
+Чтение исходника через mmap
+
+Файл не читается в память целиком и не делится на список строк: строки
+берутся из отображения по одной как bytes, комментарий и пробелы
+отсекаются на уровне байтов, и в str декодируется только часть строки
+с кодом. Строки без кода (пустые, комментарии) выдаются как '', чтобы
+номера строк не сдвигались. Память на строку - порядка её длины, а не
+размера файла; уже прочитанные страницы отображения освобождаются
+(madvise), чтобы и резидентная память процесса не росла с файлом.
+
+Для параллельной сборки файл режется на части по концам строк
+(chunk_bounds), и каждая часть читается отдельно (iter_chunk).
+
+Декодирование у всех путей чтения исходника одно (SOURCE_ENCODING,
+SOURCE_ERRORS; целиком файл читает read_source): неверные байты
+заменяются на U+FFFD. В комментарии они ни на что не влияют, а в коде
+дают обычную диагностику разбора строки, а не исключение.
+"""
+
+import io
+import mmap
+import os
+
+# Прочитанные страницы отображения отдаются системе порциями такого размера
+RELEASE_CHUNK = 16 * 1024 * 1024
+
+# Декодирование исходника
+SOURCE_ENCODING = 'utf-8'
+SOURCE_ERRORS = 'replace'
+
+
+def read_source(path):
+    """Текст исходника целиком, с тем же декодированием, что у MappedSource"""
+    with open(path, 'r', encoding=SOURCE_ENCODING, errors=SOURCE_ERRORS) as f:
+        return f.read()
+
+
+def iter_code_lines(data):
+    """
+    Код строк из объекта с readline() (mmap, BytesIO): str без
+    комментария; '' для строк без кода
+    """
+    for line in iter(data.readline, b''):
+        comment = line.find(b'#')
+        if comment >= 0:
+            line = line[:comment]
+        line = line.rstrip()
+        if not line.strip():
+            yield ''
+        else:
+            yield line.decode(SOURCE_ENCODING, SOURCE_ERRORS)
+
+
+class MappedSource:
+    """
+    Исходник, отображённый в память; итерация - по строкам кода
+    (iter_code_lines). Используется как контекстный менеджер.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        self._map = None
+        try:
+            self.size = os.fstat(self._file.fileno()).st_size
+            # Пустой файл отобразить нельзя: он просто не даёт строк
+            if self.size:
+                self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+                if hasattr(self._map, 'madvise') and hasattr(mmap, 'MADV_SEQUENTIAL'):
+                    self._map.madvise(mmap.MADV_SEQUENTIAL)
+        except BaseException:
+            self._file.close()
+            raise
+
+    def __iter__(self):
+        if self._map is None:
+            return iter(())
+        self._map.seek(0)
+        if not hasattr(self._map, 'madvise') or not hasattr(mmap, 'MADV_DONTNEED'):
+            return iter_code_lines(self._map)
+        return self._iter_releasing()
+
+    def _iter_releasing(self):
+        """iter_code_lines с освобождением прочитанных страниц"""
+        data = self._map
+        released = 0
+        for count, text in enumerate(iter_code_lines(data)):
+            yield text
+            # Позиция проверяется не на каждой строке
+            if count & 0xFFF == 0 and data.tell() - released >= RELEASE_CHUNK:
+                end = data.tell() // mmap.PAGESIZE * mmap.PAGESIZE
+                data.madvise(mmap.MADV_DONTNEED, released, end - released)
+                released = end
+
+    def chunk_bounds(self, count):
+        """
+        Границы (начало, конец) не более count частей примерно равного
+        размера; каждая часть, кроме последней, кончается на '\\n'
+        """
+        bounds = []
+        start = 0
+        for k in range(1, count):
+            if self._map is None:
+                break
+            newline = self._map.find(b'\n', max(start, self.size * k // count))
+            if newline < 0:
+                break
+            bounds.append((start, newline + 1))
+            start = newline + 1
+        if start < self.size:
+            bounds.append((start, self.size))
+        return bounds
+
+    def iter_chunk(self, start, end):
+        """Строки кода части файла [start, end) - как при итерации по всему файлу"""
+        if self._map is None:
+            return iter(())
+        return iter_code_lines(io.BytesIO(self._map[start:end]))
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
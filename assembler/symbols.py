@@ -0,0 +1,65 @@
+"""
+Таблица меток с правилом разрешения однопроходного движка
+
+Assembler оставляет за меткой её первое определение, а каждое следующее
+сообщает ошибкой duplicate-label. Ссылку на метку он разрешает, как
+только метка определена: назад - сразу, вперёд - на строке определения
+(там ссылку дописывает таблица исправлений). Сборки, которым все метки
+известны заранее (IncrementalAssembler, параллельная сборка), разрешают
+ссылки и находят повторные определения по той же таблице, чтобы
+результат не зависел от способа сборки.
+"""
+
+
+class SymbolTable:
+    """
+    Таблица меток всего файла: адрес и строка первого определения каждой
+    метки и строки повторных определений.
+    """
+
+    def __init__(self):
+        self.addresses = {}   # метка -> адрес первого определения
+        self.lines = {}       # метка -> строка первого определения
+        self.duplicates = {}  # строка повторного определения -> метка
+
+    def define(self, label, line_num, address):
+        if label in self.addresses:
+            self.duplicates[line_num] = label
+        else:
+            self.addresses[label] = address
+            self.lines[label] = line_num
+
+    @classmethod
+    def from_chunks(cls, chunks):
+        """
+        Таблица по меткам частей файла: тройкам (метки, их строки, их
+        адреса) по порядку строк - то же, что define для каждой метки
+        """
+        table = cls()
+        count = 0
+        for labels, lines, addresses in chunks:
+            table.addresses.update(zip(labels, addresses))
+            table.lines.update(zip(labels, lines))
+            count += len(labels)
+        if len(table.addresses) == count:
+            return table
+
+        # Есть повторные определения: таблица собирается заново, по одной метке
+        table = cls()
+        for labels, lines, addresses in chunks:
+            for label, line_num, address in zip(labels, lines, addresses):
+                table.define(label, line_num, address)
+        return table
+
+    def resolve(self, label, line_num):
+        """
+        Адрес метки для ссылки со строки line_num и строка, на которой
+        однопроходный движок узнаёт этот адрес; (None, None), если метки нет
+        """
+        address = self.addresses.get(label)
+        if address is None:
+            return None, None
+        return address, max(line_num, self.lines[label])
+
+    def __len__(self):
+        return len(self.addresses)
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Микробенчмарк кодировщика: инструкций в секунду для Compiler.compile_instruction
+и для одной упаковки уже разобранных операндов (InstructionDef.pack)
+
+База для сравнения - прежний Compiler (цепочка if/elif по форматам с
+маскированием всех полей, копия в legacy.py) на тех же инструкциях и
+том же парсере: печатается и его скорость, и ускорение - для полного
+compile_instruction и для одной упаковки (прежнему Compiler операнды
+отдаются уже числами через парсер-заглушку). Прогоны прежнего и
+нынешнего compile_instruction чередуются, чтобы колебания скорости
+машины сказывались на обоих одинаково.
+
+Запуск: python benchmarks/bench_encoder.py [количество_инструкций] [повторы]
+"""
+
+import sys
+import os
+import time
+
+# Добавляем путь к модулям
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from assembler.instructions import INSTRUCTIONS
+from assembler.parser import Parser
+from assembler.compiler import Compiler
+from assembler.encoding import REG
+from benchmarks.legacy import LegacyCompiler
+
+# Смесь R- и I-инструкций с разными написаниями регистров
+SAMPLE_LINES = [
+    "add  x3, x1, x2",
+    "addi x4, x3, 10",
+    "add  a0, a1, a2",
+    "addi t0, sp, -16",
+    "add  s11, t6, zero",
+    "addi r7, r0, 0x7f",
+]
+
+
+def prepare(count):
+    """Разбор образцов заранее: меряется только кодирование"""
+    parser = Parser(INSTRUCTIONS)
+    parsed = []
+    for i in range(count):
+        line = SAMPLE_LINES[i % len(SAMPLE_LINES)]
+        instr_def, args, errors, warnings = parser.parse_line(line, i + 1)
+        parsed.append((instr_def, args))
+    return parser, parsed
+
+
+def bench_encoder(count=200000, repeats=5, compiler_class=Compiler):
+    """Лучшее время из нескольких прогонов"""
+    return bench_compile(count, repeats, compiler_class)[0]
+
+
+def bench_compile(count=200000, repeats=5, *compiler_classes):
+    """
+    Лучшее время compile_instruction для каждого класса компилятора
+    (по умолчанию - LegacyCompiler и Compiler); прогоны чередуются
+    """
+    compiler_classes = compiler_classes or (LegacyCompiler, Compiler)
+    parser, parsed = prepare(count)
+    functions = [compiler_class(parser).compile_instruction for compiler_class in compiler_classes]
+
+    best = [None] * len(functions)
+    for _ in range(repeats):
+        for k, compile_instruction in enumerate(functions):
+            start = time.perf_counter()
+            for instr_def, args in parsed:
+                compile_instruction(instr_def, args)
+            elapsed = time.perf_counter() - start
+            best[k] = elapsed if best[k] is None else min(best[k], elapsed)
+
+    return [count / elapsed for elapsed in best]
+
+
+class _ResolvedParser:
+    """Парсер для LegacyCompiler, которому операнды переданы уже числами"""
+
+    @staticmethod
+    def parse_register(value):
+        return value
+
+    parse_immediate = parse_register
+
+
+def resolve_operands(count):
+    """Инструкции с операндами, уже переведёнными в числа"""
+    parser, parsed = prepare(count)
+    return [(instr_def, [parser.parse_register(arg) if kind == REG
+                         else parser.parse_immediate(arg)
+                         for kind, arg in zip(instr_def.operand_kinds, args)])
+            for instr_def, args in parsed]
+
+
+def bench_pack(count=200000, repeats=5):
+    """Только упаковка: операнды уже переведены в числа"""
+    resolved = [(instr_def.pack, instr_def.base_word, operands)
+                for instr_def, operands in resolve_operands(count)]
+
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for pack, base, operands in resolved:
+            pack(base, *operands)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    return count / best
+
+
+def bench_legacy_pack(count=200000, repeats=5):
+    """Упаковка прежним Compiler: выбор формата цепочкой if/elif и маскирование всех полей"""
+    resolved = resolve_operands(count)
+    compile_instruction = LegacyCompiler(_ResolvedParser()).compile_instruction
+
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for instr_def, operands in resolved:
+            compile_instruction(instr_def, operands)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    return count / best
+
+
+def bench_batch(count=200000, repeats=5):
+    """BatchEncoder на тех же инструкциях (None, если нет NumPy)"""
+    from assembler.batch_encoding import BatchEncoder, np
+    if np is None:
+        return None
+
+    parser, parsed = prepare(count)
+    encoder = BatchEncoder(INSTRUCTIONS)
+    columns = {'mnemonic': [], 'rd': [], 'rs1': [], 'rs2': [], 'imm': []}
+    for instr_def, args in parsed:
+        rd, rs1, last = args
+        columns['mnemonic'].append(encoder.ids[instr_def.name])
+        columns['rd'].append(parser.parse_register(rd))
+        columns['rs1'].append(parser.parse_register(rs1))
+        is_imm = instr_def.operand_kinds[2] != REG
+        columns['rs2'].append(0 if is_imm else parser.parse_register(last))
+        columns['imm'].append(parser.parse_immediate(last) if is_imm else 0)
+    arrays = {name: np.array(values) for name, values in columns.items()}
+
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        encoder.encode(**arrays)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    return count / best
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    # Публичный Compiler.compile_instruction против прежнего Compiler
+    legacy_rate, rate = bench_compile(count, repeats)
+    print(f"legacy compile:      {legacy_rate:,.0f} instructions/s "
+          f"({count} instructions, best of {repeats})")
+    print(f"compile_instruction: {rate:,.0f} instructions/s "
+          f"({rate / legacy_rate:.2f}x legacy)")
+
+    legacy_rate = bench_legacy_pack(count, repeats)
+    print(f"legacy pack only:    {legacy_rate:,.0f} instructions/s")
+
+    rate = bench_pack(count, repeats)
+    print(f"pack only:           {rate:,.0f} instructions/s ({rate / legacy_rate:.2f}x legacy)")
+
+    rate = bench_batch(count, repeats)
+    if rate is not None:
+        print(f"BatchEncoder:        {rate:,.0f} instructions/s")
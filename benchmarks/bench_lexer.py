@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк лексера: строк в секунду для split_line и полного
+Parser.parse_line на одном и том же наборе строк
+
+База для сравнения - прежний Parser.parse_line (split/strip/re.split,
+копия в legacy.py): печатается и его скорость, и ускорение нового.
+
+Запуск: python benchmarks/bench_lexer.py [количество_строк] [повторы]
+"""
+
+import sys
+import os
+import time
+
+# Добавляем путь к модулям
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from assembler.instructions import INSTRUCTIONS
+from assembler.parser import Parser
+from assembler.lexer import split_line
+from benchmarks.legacy import LegacyParser
+
+# Типичные строки: инструкции, метки, комментарии, пустые строки
+SAMPLE_LINES = [
+    "    add  x3, x1, x2      # x3 = x1 + x2",
+    "loop:",
+    "    addi a0, a0, -1",
+    "# комментарий на всю строку",
+    "",
+    "start: addi sp, sp, 0x10",
+    "    add s11,t6,zero",
+    "    addi x4, x3, loop    # ссылка на метку",
+]
+
+
+def make_lines(count):
+    return [SAMPLE_LINES[i % len(SAMPLE_LINES)] for i in range(count)]
+
+
+def best_time(func, lines, repeats):
+    """Лучшее время прохода func по всем строкам"""
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for line in lines:
+            func(line)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def bench_lexer(count=200000, repeats=5):
+    """Строк в секунду для каждого этапа"""
+    lines = make_lines(count)
+
+    parser = Parser(INSTRUCTIONS)
+    legacy_parser = LegacyParser(INSTRUCTIONS)
+
+    def parse_line(line):
+        parser.parse_line(line, 0)
+
+    def legacy_parse_line(line):
+        legacy_parser.parse_line(line, 0)
+
+    results = {}
+    for name, func in [("legacy parse_line", legacy_parse_line),
+                       ("split_line", split_line),
+                       ("Parser.parse_line", parse_line)]:
+        results[name] = count / best_time(func, lines, repeats)
+    return results
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    print(f"{count} lines, best of {repeats}:")
+    results = bench_lexer(count, repeats)
+    legacy_rate = results["legacy parse_line"]
+    for name, rate in results.items():
+        print(f"  {name:<18} {rate:>12,.0f} lines/s  {rate / legacy_rate:>5.2f}x legacy")
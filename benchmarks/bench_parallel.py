@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Масштабирование параллельной сборки одного файла (assembler.parallel)
+
+Программа из generators.py собирается с 1, 2, 4, ... процессами (до
+--jobs); для каждого числа процессов печатаются время (лучшее из
+повторов), строк в секунду, ускорение относительно одного процесса и
+эффективность (ускорение на процесс). Образ каждого прогона сверяется с
+образом однопроцессной сборки.
+
+Запуск:
+    python benchmarks/bench_parallel.py [--lines N] [--generator NAME]
+        [--jobs N] [--repeats N]
+"""
+
+import argparse
+import io
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from assembler.parallel import assemble_file
+from benchmarks.generators import GENERATORS
+
+DEFAULT_LINES = 1000000
+
+
+def job_counts(max_jobs):
+    """1, 2, 4, ... и сам max_jobs"""
+    counts = []
+    jobs = 1
+    while jobs < max_jobs:
+        counts.append(jobs)
+        jobs *= 2
+    counts.append(max_jobs)
+    return counts
+
+
+def bench_jobs(source, jobs, repeats):
+    """Лучшее время сборки и образ"""
+    best = None
+    image = None
+    for _ in range(repeats):
+        out = io.BytesIO()
+        start = time.perf_counter()
+        result = assemble_file(source, out, jobs)
+        elapsed = time.perf_counter() - start
+        if not result.ok:
+            raise RuntimeError("benchmark program failed to assemble")
+        best = elapsed if best is None else min(best, elapsed)
+        image = out.getvalue()
+    return best, image
+
+
+def main(argv):
+    arg_parser = argparse.ArgumentParser(description="Parallel assembly scaling benchmark")
+    arg_parser.add_argument('--lines', type=int, default=DEFAULT_LINES,
+                            help=f"lines in the generated program (default: {DEFAULT_LINES})")
+    arg_parser.add_argument('--generator', choices=sorted(GENERATORS), default='straight',
+                            help="program generator (default: straight)")
+    arg_parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1,
+                            help="largest number of worker processes (default: CPU count)")
+    arg_parser.add_argument('--repeats', type=int, default=3,
+                            help="timing repeats, the best one counts (default: 3)")
+    args = arg_parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "program.s")
+        with open(source, 'w') as f:
+            f.write('\n'.join(GENERATORS[args.generator](args.lines)) + '\n')
+
+        print(f"{args.generator}, {args.lines} lines")
+        print(f"{'jobs':>4} {'seconds':>10} {'lines/s':>14} {'speedup':>8} {'efficiency':>10}")
+        base_time = base_image = None
+        for jobs in job_counts(max(1, args.jobs)):
+            elapsed, image = bench_jobs(source, jobs, args.repeats)
+            if base_time is None:
+                base_time, base_image = elapsed, image
+            elif image != base_image:
+                print(f"Error: image assembled with {jobs} jobs differs from the 1-job image")
+                return 1
+            speedup = base_time / elapsed
+            print(f"{jobs:>4} {elapsed:>10.3f} {args.lines / elapsed:>14,.0f} "
+                  f"{speedup:>8.2f} {speedup / jobs:>10.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк симулятора: инструкций в секунду на циклах, собранных этим
+ассемблером (контрольная сумма, копирование памяти, счётчик) и на
+длинном линейном коде из add/addi
+
+Циклы собираются и запускаются по таблице INSTRUCTIONS_past (lw, sw,
+beq, jal, lui); смещения переходов записаны числами, от адреса
+инструкции: метку в смещении ассемблер не принимает.
+
+Запуск: python benchmarks/bench_simulator.py [количество_слов] [повторы]
+"""
+
+import sys
+import os
+
+# Добавляем путь к модулям
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from assembler.instructions import INSTRUCTIONS, INSTRUCTIONS_past
+from assembler.engine import Assembler
+from assembler.simulator import Simulator
+
+SRC_ADDRESS = 0x10000
+DST_ADDRESS = 0x80000
+
+
+def load_const(reg, value):
+    """lui + addi для 32-битной константы"""
+    upper = (value + 0x800) & 0xFFFFF000
+    return [f"lui  {reg}, {upper:#x}", f"addi {reg}, {reg}, {value - upper}"]
+
+
+def checksum_source(count):
+    """Сумма count слов с адреса SRC_ADDRESS в x12"""
+    return (load_const("x10", SRC_ADDRESS) + load_const("x11", count) + [
+        "addi x12, x0, 0",
+        "loop:",
+        "beq  x11, x0, 24",   # -> выход
+        "lw   x13, x10, 0",
+        "add  x12, x12, x13",
+        "addi x10, x10, 4",
+        "addi x11, x11, -1",
+        "jal  x0, -20",       # -> loop
+    ])
+
+
+def memcpy_source(count):
+    """Копирование count слов с SRC_ADDRESS на DST_ADDRESS"""
+    return (load_const("x10", SRC_ADDRESS) + load_const("x14", DST_ADDRESS)
+            + load_const("x11", count) + [
+        "loop:",
+        "beq  x11, x0, 28",   # -> выход
+        "lw   x13, x10, 0",
+        "sw   x14, x13, 0",
+        "addi x10, x10, 4",
+        "addi x14, x14, 4",
+        "addi x11, x11, -1",
+        "jal  x0, -24",       # -> loop
+    ])
+
+
+def counter_source(count):
+    """Сумма 1..count в x12 только на регистрах"""
+    return load_const("x11", count) + [
+        "addi x12, x0, 0",
+        "loop:",
+        "beq  x11, x0, 16",   # -> выход
+        "add  x12, x12, x11",
+        "addi x11, x11, -1",
+        "jal  x0, -12",       # -> loop
+    ]
+
+
+def straight_source(count):
+    """Линейный код из add/addi (основная таблица инструкций)"""
+    lines = ["addi x1, x0, 1", "addi x2, x0, 3"]
+    for i in range(count):
+        lines.append("add  x3, x1, x2" if i % 2 else "addi x1, x3, 5")
+    return lines
+
+
+def assemble(lines, instructions_def):
+    result = Assembler(instructions_def).assemble(lines)
+    if result.has_errors:
+        raise RuntimeError(f"benchmark program failed to assemble: {result.diagnostics()}")
+    return result.machine_code
+
+
+def bench_program(name, code, data, repeats, check, instructions_def=INSTRUCTIONS):
+    """Лучший результат из нескольких запусков; check проверяет состояние после"""
+    simulator = Simulator(instructions_def)
+
+    best = None
+    for _ in range(repeats):
+        simulator.load(code)
+        if data:
+            simulator.write_words(SRC_ADDRESS, data)
+        result = simulator.run()
+        if not result.finished or not check(simulator, data):
+            raise RuntimeError(f"{name}: wrong result")
+        if best is None or result.instructions_per_second > best.instructions_per_second:
+            best = result
+
+    print(f"{name:<10} {best.instructions_per_second:>14,.0f} instructions/s "
+          f"({best.steps} instructions)")
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    data = [(i * 2654435761) & 0xFFFFFFFF for i in range(count)]
+
+    bench_program("checksum", assemble(checksum_source(count), INSTRUCTIONS_past), data, repeats,
+                  lambda sim, data: sim.regs[12] == sum(data) & 0xFFFFFFFF, INSTRUCTIONS_past)
+    bench_program("memcpy", assemble(memcpy_source(count), INSTRUCTIONS_past), data, repeats,
+                  lambda sim, data: sim.read_words(DST_ADDRESS, count) == data, INSTRUCTIONS_past)
+    bench_program("counter", assemble(counter_source(count), INSTRUCTIONS_past), None, repeats,
+                  lambda sim, data: sim.regs[12] == count * (count + 1) // 2 & 0xFFFFFFFF,
+                  INSTRUCTIONS_past)
+    # Каждое слово выполняется один раз: меряется в основном декодирование
+    bench_program("straight", assemble(straight_source(count), INSTRUCTIONS), None, repeats,
+                  lambda sim, data: True)
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк запуска CLI: время импортов при `python main.py <in> <out>`
+
+Запускает CLI на маленьком файле с `-X importtime` и проверяет, что
+модули PyQt5/gui не загружаются, а время импортов сверх голого
+интерпретатора укладывается в бюджет. Код возврата 1 при нарушении.
+
+Запуск: python benchmarks/bench_startup.py [бюджет_мс] [повторы]
+"""
+
+import sys
+import os
+import subprocess
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAIN = os.path.join(ROOT, "main.py")
+
+# Бюджет на импорты CLI сверх голого интерпретатора (мс)
+DEFAULT_BUDGET_MS = 50
+
+FORBIDDEN_PREFIXES = ("PyQt5", "gui")
+
+TEST_CODE = """
+start:
+    addi x1, x0, 42
+    add  x2, x1, x1
+"""
+
+
+def run_importtime(args):
+    """Запуск интерпретатора с -X importtime: (время в с, {модуль: мкс})"""
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime"] + args,
+                          cwd=ROOT, capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+
+    modules = {}
+    for line in proc.stderr.splitlines():
+        # Формат: "import time: self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = int(self_us)
+
+    return elapsed, modules, proc.returncode
+
+
+def bench_startup(budget_ms=DEFAULT_BUDGET_MS, repeats=5):
+    """Лучшее время из нескольких запусков; возвращает True, если бюджет соблюден"""
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "tiny.s")
+        output = os.path.join(tmp, "tiny.bin")
+        with open(source, "w") as f:
+            f.write(TEST_CODE)
+
+        best_wall = best_imports = None
+        loaded = {}
+        for _ in range(repeats):
+            bare_wall, bare, _ = run_importtime(["-c", "pass"])
+            wall, loaded, returncode = run_importtime([MAIN, source, output])
+            if returncode != 0:
+                print(f"CLI failed with exit code {returncode}")
+                return False
+
+            imports_ms = (sum(loaded.values()) - sum(bare.values())) / 1000
+            wall_ms = (wall - bare_wall) * 1000
+            best_imports = imports_ms if best_imports is None else min(best_imports, imports_ms)
+            best_wall = wall_ms if best_wall is None else min(best_wall, wall_ms)
+
+    print(f"CLI imports: {best_imports:.1f} ms (budget {budget_ms} ms), "
+          f"wall time over bare interpreter: {best_wall:.1f} ms")
+
+    ok = True
+    forbidden = sorted(name for name in loaded
+                       if name.split(".")[0] in FORBIDDEN_PREFIXES)
+    if forbidden:
+        print(f"FAIL: CLI imported GUI modules: {', '.join(forbidden)}")
+        ok = False
+    if best_imports > budget_ms:
+        print(f"FAIL: CLI imports exceed budget by {best_imports - budget_ms:.1f} ms")
+        ok = False
+    return ok
+
+
+if __name__ == "__main__":
+    budget = float(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_BUDGET_MS
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    sys.exit(0 if bench_startup(budget, repeats) else 1)
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Набор бенчмарков на больших синтетических программах (generators.py)
+
+Для каждого генератора меряются Parser.parse_line, Parser.parse_register,
+Compiler.compile_instruction и compile_file целиком (строк или операций
+в секунду, лучший из повторов), пиковая память сборки и размер её
+результата на инструкцию (tracemalloc);
+отдельно - запись образа write_bin/write_hex/write_mem.
+
+Результаты можно сохранить как базовые (--save-baseline) и сравнивать
+с ними (--baseline): метрика скорости, упавшая больше чем на
+--threshold, или память, выросшая больше чем на --threshold, - регрессия,
+код возврата 1. Базовые значения зависят от машины: их нужно снимать на
+той же машине, где идёт сравнение (например, на CI-раннере).
+
+Запуск:
+    python benchmarks/bench_suite.py [--lines N] [--repeats N]
+        [--save-baseline FILE | --baseline FILE [--threshold 0.2]] [--json FILE]
+"""
+
+import argparse
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from assembler.instructions import INSTRUCTIONS
+from assembler.engine import Assembler
+from assembler.parser import Parser
+from assembler.compiler import Compiler
+from assembler.encoding import REG
+from assembler.output import write_bin, write_hex, write_mem
+from benchmarks.generators import GENERATORS
+import main as cli
+
+DEFAULT_BASELINE = os.path.join(ROOT, "benchmarks", "baseline.json")
+DEFAULT_LINES = 200000
+DEFAULT_THRESHOLD = 0.2
+
+# Метрики, у которых меньшее значение лучше
+LOWER_IS_BETTER = ('peak_memory_mb', 'result_bytes_per_instruction')
+
+
+def best_time(func, repeats):
+    """Лучшее время из нескольких вызовов func()"""
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def bench_program(lines, repeats, tmp):
+    """Метрики одной программы"""
+    parser = Parser(INSTRUCTIONS)
+    parse_line = parser.parse_line
+
+    def parse_all():
+        parser.labels.clear()
+        parser.current_address = 0
+        for i, line in enumerate(lines, 1):
+            parse_line(line, i)
+
+    # Разбор до замера compile_instruction: после него все метки известны
+    parsed = []
+    parse_all()
+    parser.current_address = 0
+    for i, line in enumerate(lines, 1):
+        instr_def, args, errors, warnings = parse_line(line, i)
+        if instr_def is not None:
+            parsed.append((instr_def, args))
+
+    registers = [arg for instr_def, args in parsed
+                 for kind, arg in zip(instr_def.operand_kinds, args) if kind == REG]
+    parse_register = parser.parse_register
+
+    def parse_registers():
+        for reg in registers:
+            parse_register(reg)
+
+    compiler = Compiler(parser)
+    compile_instruction = compiler.compile_instruction
+
+    def compile_all():
+        for instr_def, args in parsed:
+            compile_instruction(instr_def, args)
+
+    source = os.path.join(tmp, "program.s")
+    output = os.path.join(tmp, "program.bin")
+    with open(source, 'w') as f:
+        f.write('\n'.join(lines) + '\n')
+
+    def compile_end_to_end():
+        if not cli.compile_file(source, output, cli.QUIET):
+            raise RuntimeError("benchmark program failed to assemble")
+
+    # Память отдельным прогоном: tracemalloc замедляет выполнение.
+    # retained - сколько занимает сам результат сборки
+    tracemalloc.start()
+    result = Assembler(INSTRUCTIONS).assemble(lines)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    words = len(result.machine_code)
+    del result
+
+    return {
+        'parse_line_lines_per_s': len(lines) / best_time(parse_all, repeats),
+        'parse_register_per_s': len(registers) / best_time(parse_registers, repeats),
+        'compile_instruction_per_s': len(parsed) / best_time(compile_all, repeats),
+        'compile_file_lines_per_s': len(lines) / best_time(compile_end_to_end, repeats),
+        'peak_memory_mb': peak / (1024 * 1024),
+        'result_bytes_per_instruction': retained / words,
+    }
+
+
+def bench_writers(lines, repeats):
+    """Скорость записи образа (слов в секунду) в память, без диска"""
+    code = Assembler(INSTRUCTIONS).assemble(lines).machine_code
+    return {
+        'write_bin_words_per_s': len(code) / best_time(lambda: write_bin(io.BytesIO(), code), repeats),
+        'write_hex_words_per_s': len(code) / best_time(lambda: write_hex(io.StringIO(), code), repeats),
+        'write_mem_words_per_s': len(code) / best_time(lambda: write_mem(io.StringIO(), code), repeats),
+    }
+
+
+def run_suite(count, repeats):
+    """Все метрики: {раздел: {метрика: значение}}"""
+    results = {'lines': count}
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, generate in GENERATORS.items():
+            results[name] = bench_program(generate(count), repeats, tmp)
+    results['writers'] = bench_writers(GENERATORS['straight'](count), repeats)
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Строки сравнения с базовыми значениями и список регрессий"""
+    rows = []
+    regressions = []
+    for section, metrics in results.items():
+        if not isinstance(metrics, dict):
+            continue
+        for metric, value in metrics.items():
+            base = baseline.get(section, {}).get(metric)
+            if not base:
+                rows.append((f"{section}.{metric}", None, value, None, "new"))
+                continue
+            change = value / base - 1
+            worse = change > threshold if metric in LOWER_IS_BETTER else change < -threshold
+            status = "REGRESSION" if worse else "ok"
+            if worse:
+                regressions.append(f"{section}.{metric}")
+            rows.append((f"{section}.{metric}", base, value, change, status))
+    return rows, regressions
+
+
+def print_results(results, rows=None):
+    if rows is None:
+        for section, metrics in results.items():
+            if isinstance(metrics, dict):
+                for metric, value in metrics.items():
+                    print(f"{section + '.' + metric:<44} {value:>16,.2f}")
+        return
+
+    print(f"{'metric':<44} {'baseline':>16} {'current':>16} {'change':>8}")
+    for name, base, value, change, status in rows:
+        base_text = f"{base:,.2f}" if base is not None else "-"
+        change_text = f"{change:+.1%}" if change is not None else "-"
+        print(f"{name:<44} {base_text:>16} {value:>16,.2f} {change_text:>8}  {status}")
+
+
+def main(argv):
+    arg_parser = argparse.ArgumentParser(description="Assembler benchmark suite")
+    arg_parser.add_argument('--lines', type=int, default=DEFAULT_LINES,
+                            help=f"lines per generated program (default: {DEFAULT_LINES})")
+    arg_parser.add_argument('--repeats', type=int, default=3,
+                            help="timing repeats, the best one counts (default: 3)")
+    arg_parser.add_argument('--baseline', nargs='?', const=DEFAULT_BASELINE, metavar='FILE',
+                            help="compare with a stored baseline (default file: benchmarks/baseline.json)")
+    arg_parser.add_argument('--save-baseline', nargs='?', const=DEFAULT_BASELINE, metavar='FILE',
+                            help="store the results as the new baseline")
+    arg_parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                            help=f"allowed relative slowdown or memory growth (default: {DEFAULT_THRESHOLD})")
+    arg_parser.add_argument('--json', metavar='FILE',
+                            help="write the results as JSON")
+    args = arg_parser.parse_args(argv)
+
+    results = run_suite(args.lines, args.repeats)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+            f.write('\n')
+
+    if not args.baseline:
+        print_results(results)
+        return 0
+
+    with open(args.baseline, 'r') as f:
+        baseline = json.load(f)
+    if baseline.get('lines') != results['lines']:
+        print(f"Warning: baseline was measured with --lines {baseline.get('lines')}, "
+              f"this run used --lines {results['lines']}")
+
+    rows, regressions = compare(results, baseline, args.threshold)
+    print_results(results, rows)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) over the {args.threshold:.0%} threshold: "
+              + ', '.join(regressions))
+        return 1
+    print(f"\nNo regressions over the {args.threshold:.0%} threshold")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Генераторы больших синтетических программ для бенчмарков
+
+Каждый генератор возвращает список строк без ошибок сборки (и без
+записи в x0, чтобы не было предупреждений); одинаковые n и seed дают
+одинаковый текст.
+
+    straight - линейный код: add/addi с регистрами xN
+    branchy  - много меток и ссылок на них вперёд и назад
+    comments - комментарии на всю строку, комментарии в конце строки,
+               пустые строки
+    aliases  - ABI-имена и rN в разном регистре, hex/bin константы
+
+В таблице инструкций есть только add и addi, поэтому «ветвления» -
+это метки в непосредственном операнде addi; адрес такой метки должен
+помещаться в 12 бит, так что ссылки ведут в первые 2 КиБ кода.
+
+Запуск: python benchmarks/generators.py <генератор> <количество_строк> <файл>
+"""
+
+import random
+import sys
+
+# Метки, на которые можно ссылаться из addi: адрес меньше 2048
+_LABEL_LIMIT = 2048 // 4
+
+_ABI = ['ra', 'sp', 'gp', 'tp', 't0', 't1', 't2', 's0', 'fp', 's1',
+        'a0', 'a1', 'a2', 'a3', 'a4', 'a5', 'a6', 'a7',
+        's2', 's3', 's4', 's5', 's6', 's7', 's8', 's9', 's10', 's11',
+        't3', 't4', 't5', 't6']
+
+
+def _rd(r):
+    return f"x{r.randrange(1, 32)}"
+
+
+def _reg(r):
+    return f"x{r.randrange(32)}"
+
+
+def straight(n, seed=1):
+    """n строк линейного кода"""
+    r = random.Random(seed)
+    lines = []
+    for _ in range(n):
+        if r.random() < 0.5:
+            lines.append(f"    add  {_rd(r)}, {_reg(r)}, {_reg(r)}")
+        else:
+            lines.append(f"    addi {_rd(r)}, {_reg(r)}, {r.randrange(-2048, 2048)}")
+    return lines
+
+
+def branchy(n, seed=1):
+    """Около n строк: метка на каждые 2-6 инструкций, треть addi ссылается на метки"""
+    r = random.Random(seed)
+    lines = []
+    address = 0
+    label_count = 0
+    low_labels = []  # Определённые метки с адресом < 2048
+
+    while len(lines) < n:
+        name = f"l{label_count}"
+        label_count += 1
+        if address // 4 < _LABEL_LIMIT:
+            low_labels.append(name)
+        # Метка на отдельной строке или перед инструкцией
+        prefix = f"{name}: " if r.random() < 0.5 else None
+        if prefix is None:
+            lines.append(f"{name}:")
+
+        for _ in range(r.randrange(2, 7)):
+            # Ссылка вперёд (метка ещё не определена) - только если метка
+            # окажется в первых 2 КиБ и не будет отрезана в конце
+            forward_ok = address // 4 < _LABEL_LIMIT - 16 and len(lines) < n - 16
+            if r.random() < 0.35 and forward_ok:
+                target = f"l{label_count + r.randrange(0, 2)}"
+            elif r.random() < 0.35 and low_labels:
+                target = r.choice(low_labels)
+            else:
+                target = None
+
+            if target is not None:
+                text = f"addi {_rd(r)}, {_reg(r)}, {target}"
+            else:
+                text = f"add  {_rd(r)}, {_reg(r)}, {_reg(r)}"
+            lines.append(f"{prefix or '    '}{text}")
+            prefix = None
+            address += 4
+    return lines[:n]
+
+
+def comments(n, seed=1):
+    """n строк, из которых инструкций около трети"""
+    r = random.Random(seed)
+    lines = []
+    for i in range(n):
+        k = r.random()
+        if k < 0.25:
+            lines.append(f"# block {i}: " + "explanatory text " * r.randrange(1, 5))
+        elif k < 0.4:
+            lines.append("")
+        elif k < 0.55:
+            lines.append("    #" + "-" * 60)
+        elif k < 0.8:
+            lines.append(f"    add  {_rd(r)}, {_reg(r)}, {_reg(r)}    # accumulate partial sum #{i}")
+        else:
+            lines.append(f"    addi {_rd(r)}, {_reg(r)}, {r.randrange(-2048, 2048)}  # adjust by constant")
+    return lines
+
+
+def aliases(n, seed=1):
+    """n строк с ABI-именами, rN и разным регистром букв"""
+    r = random.Random(seed)
+
+    def name(allow_zero=True):
+        k = r.random()
+        if k < 0.6:
+            reg = r.choice(_ABI + (['zero'] if allow_zero else []))
+        else:
+            reg = f"r{r.randrange(0 if allow_zero else 1, 32)}"
+        k = r.random()
+        if k < 0.15:
+            return reg.upper()
+        if k < 0.2:
+            return reg[0].upper() + reg[1:]  # Смешанный регистр - медленный путь
+        return reg
+
+    lines = []
+    for _ in range(n):
+        if r.random() < 0.5:
+            lines.append(f"    add  {name(False)}, {name()}, {name()}")
+        else:
+            value = r.randrange(0, 2048)
+            imm = r.choice([str(value), hex(value), bin(value), str(-value)])
+            lines.append(f"    addi {name(False)}, {name()}, {imm}")
+    return lines
+
+
+GENERATORS = {
+    'straight': straight,
+    'branchy': branchy,
+    'comments': comments,
+    'aliases': aliases,
+}
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 4 or sys.argv[1] not in GENERATORS:
+        print(f"Usage: generators.py {{{','.join(GENERATORS)}}} <lines> <output>")
+        sys.exit(2)
+
+    with open(sys.argv[3], 'w') as f:
+        f.write('\n'.join(GENERATORS[sys.argv[1]](int(sys.argv[2]))) + '\n')
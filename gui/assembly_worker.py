@@ -0,0 +1,151 @@
+"""
+Сборка в фоновом потоке: живая проверка синтаксиса и компиляция из GUI
+"""
+
+import traceback
+from PyQt5.QtCore import QObject, QThread, pyqtSignal, pyqtSlot
+from assembler.errors import AssemblyCancelled
+from assembler.incremental import IncrementalAssembler
+from gui.output_log import INFO, WARNING, ERROR
+
+
+def compile_log(result, stats):
+    """
+    Строки вывода компиляции (уровень, текст) по AssemblyResult.
+
+    Вызывается в потоке сборки: обход всех строк результата
+    (iter_lines заново разбирает текст строк) не должен занимать поток окна.
+    """
+    # Перекодируются только изменённые строки и пользователи
+    # меток, адрес которых сдвинулся
+    reparsed, reencoded = stats
+    entries = [(INFO, f"Re-parsed {reparsed} lines, re-encoded {reencoded} instructions"),
+               (INFO, f"Found labels: {list(result.labels.keys())}\n")]
+
+    for record in result.iter_lines():
+        i = record.line_num
+
+        for kind, err in record.errors:
+            entries.append((ERROR, f"Line {i}: ✗ {kind}: {err}"))
+
+        for warn in record.warnings:
+            entries.append((WARNING, f"Line {i}: ❗ WARNING: {warn}"))
+
+        if record.word is not None and not record.errors:
+            entries.append((INFO, f"Line {i}: ✓ {record.instr_def.name} {record.args} -> 0x{record.word:08x}"))
+    return entries
+
+
+class AssemblyWorker(QObject):
+    """
+    Исполнитель заданий сборки; живёт в отдельном QThread.
+
+    Задания приходят через сигнал (очередь потока) и выполняются по одному,
+    поэтому кэши IncrementalAssembler используются только из этого потока.
+    Отменённое задание прерывается на ближайшей проверке прогресса.
+    """
+
+    # Номер задания и процент выполнения
+    progress = pyqtSignal(int, int)
+    # Номер задания и диагностика видимых строк (см. IncrementalAssembler.check_lines)
+    visible_checked = pyqtSignal(int, object)
+    # Номер задания, AssemblyResult, (перечитано строк, перекодировано слов)
+    # и строки вывода компиляции (compile_log) или None для проверки синтаксиса
+    finished = pyqtSignal(int, object, object, object)
+    cancelled = pyqtSignal(int)
+    # Номер задания и текст исключения
+    failed = pyqtSignal(int, str)
+
+    def __init__(self, instructions_def):
+        super().__init__()
+        self.assembler = IncrementalAssembler(instructions_def)
+        self._cancelled = set()
+        self._cancelled_through = 0  # Отменены все задания с номером не больше
+
+    def cancel(self, job_id):
+        """Отмена задания; можно вызывать из любого потока"""
+        self._cancelled.add(job_id)
+
+    def cancel_through(self, job_id):
+        """Отмена всех заданий до job_id включительно"""
+        self._cancelled_through = max(self._cancelled_through, job_id)
+
+    @pyqtSlot(int, object, object, bool)
+    def run(self, job_id, lines, visible, log):
+        """
+        Выполнение задания.
+
+        Args:
+            job_id: номер задания
+            lines: список строк текста
+            visible: (первая, последняя) видимые строки, считая с 1, или None
+            log: собрать строки вывода компиляции (compile_log)
+        """
+        try:
+            self._check_cancelled(job_id)
+
+            if visible is not None:
+                # Сначала то, что пользователь видит на экране
+                first, last = visible
+                diagnostics = self.assembler.check_lines(lines[first - 1:last], first)
+                self.visible_checked.emit(job_id, diagnostics)
+
+            def report(done, total):
+                self._check_cancelled(job_id)
+                self.progress.emit(job_id, done * 100 // total if total else 100)
+
+            result = self.assembler.assemble(lines, progress=report)
+            stats = (self.assembler.reparsed, self.assembler.reencoded)
+            entries = compile_log(result, stats) if log else None
+            self.finished.emit(job_id, result, stats, entries)
+        except AssemblyCancelled:
+            self.cancelled.emit(job_id)
+        except Exception:
+            self.failed.emit(job_id, traceback.format_exc())
+        finally:
+            self._cancelled.discard(job_id)
+
+    def _check_cancelled(self, job_id):
+        if job_id in self._cancelled or job_id <= self._cancelled_through:
+            raise AssemblyCancelled()
+
+
+class AssemblyService(QObject):
+    """
+    Фоновая сборка для окна редактора: поток, исполнитель и нумерация заданий.
+
+    Сигналы исполнителя доставляются в поток окна, поэтому обработчики
+    могут сразу обновлять виджеты.
+    """
+
+    _job_requested = pyqtSignal(int, object, object, bool)
+
+    def __init__(self, instructions_def, parent=None):
+        super().__init__(parent)
+        self._last_job = 0
+
+        self._thread = QThread(self)
+        self.worker = AssemblyWorker(instructions_def)
+        self.worker.moveToThread(self._thread)
+        self._job_requested.connect(self.worker.run)
+        self._thread.start()
+
+    def submit(self, lines, visible=None, log=False):
+        """
+        Постановка задания в очередь; возвращает его номер. log - нужны
+        строки вывода компиляции (собираются в потоке сборки)
+        """
+        self._last_job += 1
+        self._job_requested.emit(self._last_job, lines, visible, log)
+        return self._last_job
+
+    def cancel(self, job_id):
+        """Отмена задания (номер 0 - нет задания)"""
+        if job_id:
+            self.worker.cancel(job_id)
+
+    def shutdown(self):
+        """Остановка потока (при закрытии окна)"""
+        self.worker.cancel_through(self._last_job)
+        self._thread.quit()
+        self._thread.wait()
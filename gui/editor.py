@@ -4,15 +4,18 @@
 
 from PyQt5.QtWidgets import (QMainWindow, QTextEdit, QVBoxLayout, QWidget, 
                             QMenuBar, QMenu, QAction, QFileDialog, QMessageBox,
-                            QLabel, QStatusBar, QHBoxLayout, QToolBar, QSplitter, QShortcut, QPlainTextEdit, QApplication)
-from PyQt5.QtCore import Qt, QTimer, QSize, QRect
+                            QLabel, QStatusBar, QHBoxLayout, QToolBar, QSplitter, QShortcut, QPlainTextEdit, QApplication,
+                            QProgressBar, QPushButton)
+from PyQt5.QtCore import Qt, QTimer, QSize, QRect, QPoint
 from PyQt5.QtGui import (QFont, QTextCursor, QColor, QPainter, 
                          QTextFormat, QSyntaxHighlighter, QTextCharFormat, QPalette, QColor, QIcon)
 from PyQt5.QtCore import QMimeData
 from assembler.instructions import INSTRUCTIONS
+from assembler.output import code_buffer, write_bin, write_hex, write_mem
+from gui.assembly_worker import AssemblyService
 from gui.documentation_window import DocumentationWindow
 from os.path import basename
-from gui.errors_and_warning_color import PaintError, PaintWarning
+from gui.output_log import OutputLog, INFO, WARNING, ERROR
 import sys
 
 class LineNumberArea(QWidget):
@@ -32,9 +35,10 @@ class CodeEditor(QPlainTextEdit):
         super().__init__(parent)
         self.setFont(QFont("Courier New", 10))
 
-        # Для подсветки ошибок
+        # Для подсветки ошибок (номера строк с 1)
         self.error_lines = set()
         self.warning_lines = set()
+        self._diagnostic_selections = []
 
         self.setTabStopWidth(40)  # 4 пробела
         
@@ -123,7 +127,7 @@ class CodeEditor(QPlainTextEdit):
             block_number += 1
     
     def highlight_current_line(self):
-        """Подсветка текущей строки"""
+        """Подсветка текущей строки и строк с ошибками и предупреждениями"""
         extra_selections = []
         
         if not self.isReadOnly():
@@ -135,7 +139,39 @@ class CodeEditor(QPlainTextEdit):
             selection.cursor.clearSelection()
             extra_selections.append(selection)
         
+        # Диагностика рисуется поверх текущей строки
+        extra_selections.extend(self._diagnostic_selections)
         self.setExtraSelections(extra_selections)
+
+    def set_diagnostics(self, error_lines, warning_lines):
+        """Строки с ошибками и предупреждениями (номера с 1) для подсветки"""
+        self.error_lines = set(error_lines)
+        self.warning_lines = set(warning_lines) - self.error_lines
+
+        # Выделения строятся один раз: их курсоры сами сдвигаются при правке
+        # текста, а перемещение курсора только пересобирает список
+        self._diagnostic_selections = []
+        document = self.document()
+        for lines, color in ((self.warning_lines, QColor("#4d3f1a")),
+                             (self.error_lines, QColor("#5a1d1d"))):
+            for line in sorted(lines):
+                block = document.findBlockByNumber(line - 1)
+                if not block.isValid():
+                    continue
+                selection = QTextEdit.ExtraSelection()
+                selection.format.setBackground(color)
+                selection.format.setProperty(QTextFormat.FullWidthSelection, True)
+                selection.cursor = QTextCursor(block)
+                self._diagnostic_selections.append(selection)
+
+        self.highlight_current_line()
+
+    def visible_line_range(self):
+        """Первая и последняя видимые строки (номера с 1)"""
+        first = self.firstVisibleBlock().blockNumber()
+        bottom = QPoint(0, self.viewport().height() - 1)
+        last = self.cursorForPosition(bottom).blockNumber()
+        return first + 1, max(first, last) + 1
     
     def insertFromMimeData(self, source: QMimeData):
         """Вставка только текста без форматирования"""
@@ -234,8 +270,22 @@ class AssemblerGUI(QMainWindow):
         self.current_file = None
         self.doc_window = None
         self.setWindowIcon(QIcon("gui\\icon.ico"))
+        self.last_machine_code = code_buffer()
+
+        # Проверка и компиляция идут в фоновом потоке; кэш разбора и
+        # кодирования строк сохраняется между заданиями
+        self.assembly = AssemblyService(INSTRUCTIONS, self)
+        self.assembly.worker.visible_checked.connect(self.on_visible_checked)
+        self.assembly.worker.progress.connect(self.on_assembly_progress)
+        self.assembly.worker.finished.connect(self.on_assembly_finished)
+        self.assembly.worker.cancelled.connect(self.on_assembly_cancelled)
+        self.assembly.worker.failed.connect(self.on_assembly_failed)
+        self._check_job = 0        # Текущее задание живой проверки
+        self._check_visible = None # Видимые строки на момент проверки
+        self._compile_job = 0      # Текущее задание компиляции
+        self._save_after_compile = False
+
         self.init_ui()
-        self.last_machine_code = []
         
     def init_ui(self):
         self.set_dark_theme()
@@ -257,11 +307,8 @@ class AssemblerGUI(QMainWindow):
         splitter.addWidget(self.editor)
         
         # Панель вывода ошибок
-        self.output_text = QTextEdit()
-        self.output_text.setReadOnly(True)
-        #self.output_text.setMaximumHeight(300)
-        self.output_text.setFont(QFont("Courier", 9))
-        splitter.addWidget(self.output_text)
+        self.output_log = OutputLog()
+        splitter.addWidget(self.output_log)
         
         splitter.setSizes([450, 150])
         main_layout.addWidget(splitter)
@@ -269,6 +316,18 @@ class AssemblerGUI(QMainWindow):
         # Статус бар
         self.status_bar = QStatusBar()
         self.setStatusBar(self.status_bar)
+
+        # Прогресс и отмена компиляции
+        self.compile_progress = QProgressBar()
+        self.compile_progress.setRange(0, 100)
+        self.compile_progress.setMaximumWidth(200)
+        self.compile_progress.hide()
+        self.status_bar.addPermanentWidget(self.compile_progress)
+
+        self.cancel_compile_btn = QPushButton('Cancel')
+        self.cancel_compile_btn.clicked.connect(self.cancel_compile)
+        self.cancel_compile_btn.hide()
+        self.status_bar.addPermanentWidget(self.cancel_compile_btn)
         
         # Создание меню
         self.create_menu()
@@ -276,10 +335,12 @@ class AssemblerGUI(QMainWindow):
         # Создание тулбара
         self.create_toolbar()
         
-        # Таймер для динамической проверки
+        # Таймер для динамической проверки: срабатывает после паузы в наборе
         self.check_timer = QTimer()
+        self.check_timer.setSingleShot(True)
+        self.check_timer.setInterval(300)
         self.check_timer.timeout.connect(self.check_syntax)
-        self.check_timer.start(1000)  # Проверка каждую секунду
+        self.editor.textChanged.connect(self.on_text_changed)
 
         docs_shortcut = QShortcut("F1", self)  # F1 для документации
         docs_shortcut.activated.connect(self.show_documentation)
@@ -408,120 +469,153 @@ class AssemblerGUI(QMainWindow):
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to save file: {str(e)}")
     
+    def on_text_changed(self):
+        """Текст изменился: текущая проверка устарела, ждём паузы в наборе"""
+        self.assembly.cancel(self._check_job)
+        self._check_job = 0
+        self.check_timer.start()
+
     def check_syntax(self):
-        """Динамическая проверка синтаксиса"""
-        # Здесь будет вызов парсера для проверки
-        # Пока просто очищаем вывод
-        pass
-    
+        """Динамическая проверка синтаксиса в фоновом потоке"""
+        lines = self.editor.toPlainText().split('\n')
+        self.assembly.cancel(self._check_job)
+        self._check_visible = self.editor.visible_line_range()
+        self._check_job = self.assembly.submit(lines, self._check_visible)
+
+    def on_visible_checked(self, job_id, diagnostics):
+        """Видимые строки проверены раньше остального текста"""
+        if job_id != self._check_job:
+            return
+
+        # Вне видимой области остаётся прежняя подсветка до конца проверки
+        first, last = self._check_visible
+        error_lines = {line for line in self.editor.error_lines if not first <= line <= last}
+        warning_lines = {line for line in self.editor.warning_lines if not first <= line <= last}
+        for line, errors, warnings in diagnostics:
+            if errors:
+                error_lines.add(line)
+            if warnings:
+                warning_lines.add(line)
+        self.editor.set_diagnostics(error_lines, warning_lines)
+
+    def on_assembly_progress(self, job_id, percent):
+        if job_id == self._compile_job:
+            self.compile_progress.setValue(percent)
+
+    def on_assembly_finished(self, job_id, result, stats, log):
+        """Результат фоновой сборки"""
+        is_compile = job_id == self._compile_job
+        if is_compile:
+            self._compile_job = 0
+            self._set_compiling(False)
+        elif job_id == self._check_job:
+            self._check_job = 0
+        else:
+            return  # Устаревшее задание
+
+        notes = result.notes.values()
+        self.editor.set_diagnostics(
+            [record.line_num for record in notes if record.errors],
+            [record.line_num for record in notes if record.warnings])
+
+        if is_compile:
+            self.show_compile_result(result, log)
+            if self._save_after_compile:
+                self._save_after_compile = False
+                self.save_machine_code()
+
+    def on_assembly_cancelled(self, job_id):
+        if job_id == self._compile_job:
+            self._compile_job = 0
+            self._save_after_compile = False
+            self._set_compiling(False)
+            self.output_log.append("\n⚠️ Compilation cancelled", WARNING)
+            self.status_bar.showMessage("Compilation cancelled")
+
+    def on_assembly_failed(self, job_id, error):
+        if job_id == self._check_job:
+            self._check_job = 0
+        elif job_id == self._compile_job:
+            self._compile_job = 0
+            self._save_after_compile = False
+            self._set_compiling(False)
+            self.output_log.extend([(ERROR, "❌ Fatal error during compilation"),
+                                    (ERROR, error.rstrip('\n'))])
+            self.last_machine_code = code_buffer()  # Сбрасываем при ошибке
+
+    def cancel_compile(self):
+        """Отмена идущей компиляции"""
+        self.assembly.cancel(self._compile_job)
+
+    def _set_compiling(self, active):
+        """Показ прогресса и кнопки отмены на время компиляции"""
+        self.compile_progress.setValue(0)
+        self.compile_progress.setVisible(active)
+        self.cancel_compile_btn.setVisible(active)
+
     def compile_code(self):
-        """Компиляция кода из GUI"""
+        """
+        Компиляция кода из GUI в фоновом потоке.
+
+        Returns:
+            номер задания или 0, если компилировать нечего
+        """
         code = self.editor.toPlainText()
         
         if not code.strip():
-            self.output_text.setText("No code to compile")
-            self.last_machine_code = []  # Сбрасываем
-            return
-        
-        self.output_text.clear()
-        self.output_text.append("Starting compilation...\n")
+            self.output_log.set_text("No code to compile")
+            self.last_machine_code = code_buffer()  # Сбрасываем
+            return 0
         
-        try:
-            from assembler.instructions import INSTRUCTIONS
-            from assembler.parser import Parser
-            from assembler.compiler import Compiler
-            
-            parser = Parser(INSTRUCTIONS)
-            compiler = Compiler(parser)
-            
-            lines = code.split('\n')
-            machine_code = []
-            errors_found = False
-            
-            # Сбрасываем список меток и адрес перед компиляцией
-            parser.labels.clear()
-            parser.current_address = 0
-            
-            # Первый проход: сбор меток
-            self.output_text.append("Pass 1: Collecting labels...")
-            for i, line in enumerate(lines, 1):
-                line_clean = line.strip()
-                if not line_clean or line_clean.startswith('#'):
-                    continue
-                
-                try:
-                    # Пытаемся распарсить для сбора меток
-                    parser.parse_line(line, i)
-                except:
-                    pass  # Игнорируем ошибки в первом проходе
-            
-            self.output_text.append(f"Found labels: {list(parser.labels.keys())}")
-            
-            # Второй проход: компиляция
-            self.output_text.append("\nPass 2: Compiling...")
-            parser.current_address = 0  # Сбрасываем адрес
-            
-            for i, line in enumerate(lines, 1):
-                line_clean = line.rstrip()
-                if not line_clean or line_clean.startswith('#'):
-                    continue
-                
-                try:
-                    instr_def, args, errors, warnings = parser.parse_line(line_clean, i)
-                    
-                    if errors:
-                        for err in errors:
-                            self.output_text.append(PaintError(f"Line {i}: ERROR: {err}"))
-                            errors_found = True
-                    
-                    if warnings:
-                        for warn in warnings:
-                            self.output_text.append(PaintWarning(f"Line {i}: WARNING: {warn}"))
-                    
-                    if instr_def and not errors:
-                        try:
-                            errors, warnings = instr_def.validate(args)
-                            if errors:
-                                raise Exception(errors[0])
-                            if warnings:
-                                for warn in warnings:
-                                    self.output_text.append(PaintWarning(f"Line {i}: ❗ WARNING: {warn}"))
-                            instruction = compiler.compile_instruction(instr_def, args)
-                            machine_code.append(instruction)
-                            self.output_text.append(f"Line {i}: ✓ {instr_def.name} {args} -> 0x{instruction:08x}")
-                        except Exception as e:
-                            self.output_text.append(PaintError(f"Line {i}: ✗ COMPILATION ERROR: {str(e)}"))
-                            errors_found = True
-                            
-                except Exception as e:
-                    self.output_text.append(PaintError(f"Line {i}: ✗ PARSE ERROR: {str(e)}"))
-                    errors_found = True
-            
-            # Сохраняем результат для последующего сохранения в файл
-            self.last_machine_code = machine_code
-            
-            if errors_found:
-                self.output_text.append("\n❌ Compilation failed with errors!")
-                self.status_bar.showMessage("Compilation failed")
-            else:
-                self.output_text.append(f"\n✅ Compilation successful!")
-                self.output_text.append(f"Generated {len(machine_code)} instructions ({len(machine_code) * 4} bytes)")
-                self.status_bar.showMessage(f"Compilation successful: {len(machine_code)} instructions")
-                
-        except Exception as e:
-            self.output_text.append(PaintError(f"❌ Fatal error: {str(e)}"))
-            import traceback
-            self.output_text.append(traceback.format_exc())
-            self.last_machine_code = []  # Сбрасываем при ошибке
+        self.output_log.clear()
+        self.output_log.append("Starting compilation...\n")
+
+        # Компиляция заодно обновит подсветку: отдельная проверка не нужна
+        self.assembly.cancel(self._check_job)
+        self.assembly.cancel(self._compile_job)
+        self._check_job = 0
+        self._compile_job = self.assembly.submit(code.split('\n'), log=True)
+        self._set_compiling(True)
+        self.status_bar.showMessage("Compiling...")
+        return self._compile_job
+
+    def show_compile_result(self, result, log):
+        """
+        Вывод результата компиляции. Строки вывода по инструкциям (log)
+        собраны в потоке сборки (compile_log); весь вывод уходит в
+        панель одной пачкой
+        """
+        machine_code = result.machine_code
+        entries = log
+
+        errors_found = result.has_errors
+
+        # Сохраняем результат для последующего сохранения в файл
+        self.last_machine_code = machine_code
+
+        if errors_found:
+            entries.append((ERROR, "\n❌ Compilation failed with errors!"))
+            self.output_log.extend(entries)
+            self.status_bar.showMessage("Compilation failed")
+        else:
+            entries.append((INFO, f"\n✅ Compilation successful!"))
+            entries.append((INFO, f"Generated {len(machine_code)} instructions ({len(machine_code) * 4} bytes)"))
+            self.output_log.extend(entries)
+            self.status_bar.showMessage(f"Compilation successful: {len(machine_code)} instructions")
     
     def compile_and_save(self):
         """Компиляция и сохранение машинного кода"""
-        # Сначала компилируем
-        self.compile_code()
-        
+        # Сначала компилируем; сохранение - по завершении компиляции
+        self._save_after_compile = True
+        if not self.compile_code():
+            self._save_after_compile = False
+            self.save_machine_code()
+
+    def save_machine_code(self):
+        """Сохранение результата последней компиляции"""
         # Проверяем, есть ли что сохранять
         if not self.last_machine_code:
-            self.output_text.append("\n⚠️ No machine code to save. Compilation may have failed or produced no output.")
+            self.output_log.append("\n⚠️ No machine code to save. Compilation may have failed or produced no output.", WARNING)
             return
         
         # Открываем диалог сохранения
@@ -547,16 +641,15 @@ class AssemblerGUI(QMainWindow):
     def _save_binary_file(self, file_path):
         """Сохранение в бинарном формате"""
         with open(file_path, 'wb') as f:
-            for instruction in self.last_machine_code:
-                # Записываем 4 байта little-endian
-                f.write(instruction.to_bytes(4, byteorder='little'))
+            # Весь образ (4 байта little-endian на слово) одной записью
+            write_bin(f, self.last_machine_code)
         
         # Проверяем размер файла
         import os
         file_size = os.path.getsize(file_path)
         
-        self.output_text.append(f"\n💾 Saved {len(self.last_machine_code)} instructions to: {file_path}")
-        self.output_text.append(f"File size: {file_size} bytes")
+        self.output_log.append(f"\n💾 Saved {len(self.last_machine_code)} instructions to: {file_path}")
+        self.output_log.append(f"File size: {file_size} bytes")
         self.status_bar.showMessage(f"Saved to {basename(file_path)} ({file_size} bytes)")
         
         # Показываем подтверждение
@@ -574,24 +667,26 @@ class AssemblerGUI(QMainWindow):
             f.write(f"# Generated from: {self.current_file or 'Untitled'}\n")
             f.write(f"# Instructions: {len(self.last_machine_code)}\n\n")
             
-            for idx, instruction in enumerate(self.last_machine_code):
-                # Формат: address: instruction
-                f.write(f"0x{idx*4:08x}: 0x{instruction:08x}\n")
+            # Формат: address: instruction
+            write_hex(f, self.last_machine_code)
         
-        self.output_text.append(f"\n💾 Saved hex file: {file_path}")
+        self.output_log.append(f"\n💾 Saved hex file: {file_path}")
         self.status_bar.showMessage(f"Saved hex file: {basename(file_path)}")
     
     def _save_mem_file(self, file_path):
         """Сохранение в текстовом hex формате с расширением .mem"""
         with open(file_path, 'w') as f:
-            
-            for idx, instruction in enumerate(self.last_machine_code):
-                # Формат: instruction
-                f.write(f"{instruction:08x}\n")
+            # Формат: instruction
+            write_mem(f, self.last_machine_code)
         
-        self.output_text.append(f"\n💾 Saved mem file: {file_path}")
+        self.output_log.append(f"\n💾 Saved mem file: {file_path}")
         self.status_bar.showMessage(f"Saved mem file: {basename(file_path)}")
     
+    def closeEvent(self, event):
+        """Остановка фонового потока при закрытии окна"""
+        self.assembly.shutdown()
+        super().closeEvent(event)
+
     def show_documentation(self):
         """Показ окна документации"""
         if self.doc_window is None:
@@ -763,7 +858,7 @@ class AssemblerGUI(QMainWindow):
             }
             
             /* Текстовые поля */
-            QTextEdit, QPlainTextEdit {
+            QTextEdit, QPlainTextEdit, QListView {
                 background-color: #1e1e1e;
                 color: #d4d4d4;
                 border: 1px solid #3e3e42;
@@ -0,0 +1,174 @@
+"""
+Панель вывода компилятора: список строк на модели Qt
+
+QListView рисует только видимые строки, а строки добавляются пачками,
+поэтому вывод большой компиляции не перестраивает документ на каждую
+строку, как QTextEdit.
+"""
+
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex
+from PyQt5.QtGui import QColor, QFont, QKeySequence
+from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QListView,
+                             QCheckBox, QAbstractItemView, QApplication, QAction)
+
+# Уровни строк вывода
+INFO = 0
+WARNING = 1
+ERROR = 2
+
+_LEVEL_NAMES = {INFO: "Info", WARNING: "Warnings", ERROR: "Errors"}
+
+# Фон строк, как у PaintError/PaintWarning
+_BACKGROUNDS = {
+    WARNING: QColor(144, 90, 25, 77),
+    ERROR: QColor(145, 0, 0, 77),
+}
+
+
+class OutputLogModel(QAbstractListModel):
+    """Строки вывода с уровнями и фильтром по уровню"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._texts = []
+        self._levels = []
+        self._rows = []  # Индексы строк, проходящих фильтр
+        self._shown = {INFO, WARNING, ERROR}
+        self.counts = {INFO: 0, WARNING: 0, ERROR: 0}
+
+        self._bold = QFont()
+        self._bold.setBold(True)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self._rows[index.row()]
+
+        if role == Qt.DisplayRole:
+            return self._texts[row]
+        if role == Qt.BackgroundRole:
+            return _BACKGROUNDS.get(self._levels[row])
+        if role == Qt.FontRole and self._levels[row] != INFO:
+            return self._bold
+        return None
+
+    def extend(self, entries):
+        """
+        Добавление пачки строк одной вставкой в модель.
+
+        Args:
+            entries: пары (уровень, текст); текст с переводами строк
+                разбивается на несколько строк вывода
+        """
+        start = len(self._texts)
+        for level, text in entries:
+            for part in text.split('\n'):
+                # Пустые строки-разделители не считаются диагностикой
+                part_level = level if part else INFO
+                self._texts.append(part)
+                self._levels.append(part_level)
+                self.counts[part_level] += 1
+
+        shown = self._shown
+        rows = [row for row in range(start, len(self._texts)) if self._levels[row] in shown]
+        if rows:
+            first = len(self._rows)
+            self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+            self._rows.extend(rows)
+            self.endInsertRows()
+
+    def clear(self):
+        self.beginResetModel()
+        self._texts = []
+        self._levels = []
+        self._rows = []
+        self.counts = {INFO: 0, WARNING: 0, ERROR: 0}
+        self.endResetModel()
+
+    def set_shown_levels(self, levels):
+        """Фильтр: показывать только строки этих уровней"""
+        self.beginResetModel()
+        self._shown = set(levels)
+        self._rows = [row for row, level in enumerate(self._levels) if level in self._shown]
+        self.endResetModel()
+
+    def text_at(self, view_row):
+        return self._texts[self._rows[view_row]]
+
+
+class OutputLog(QWidget):
+    """Панель вывода: фильтр по уровням и виртуализированный список строк"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.model = OutputLogModel(self)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(2)
+
+        # Фильтр по уровням
+        filters = QHBoxLayout()
+        self._filters = {}
+        for level in (ERROR, WARNING, INFO):
+            checkbox = QCheckBox()
+            checkbox.setChecked(True)
+            checkbox.toggled.connect(self._apply_filter)
+            filters.addWidget(checkbox)
+            self._filters[level] = checkbox
+        filters.addStretch()
+        layout.addLayout(filters)
+
+        self.view = QListView()
+        self.view.setModel(self.model)
+        self.view.setFont(QFont("Courier", 9))
+        # Одинаковая высота строк: QListView не измеряет каждую строку
+        self.view.setUniformItemSizes(True)
+        self.view.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        layout.addWidget(self.view)
+
+        copy_action = QAction(self.view)
+        copy_action.setShortcut(QKeySequence.Copy)
+        copy_action.setShortcutContext(Qt.WidgetShortcut)
+        copy_action.triggered.connect(self.copy_selection)
+        self.view.addAction(copy_action)
+
+        self._update_counts()
+
+    def append(self, text, level=INFO):
+        """Добавление одной строки (для пачек - extend)"""
+        self.extend([(level, text)])
+
+    def extend(self, entries):
+        """Добавление пачки строк (уровень, текст) с прокруткой вниз"""
+        self.model.extend(entries)
+        self._update_counts()
+        self.view.scrollToBottom()
+
+    def clear(self):
+        self.model.clear()
+        self._update_counts()
+
+    def set_text(self, text, level=INFO):
+        """Замена всего вывода одной строкой"""
+        self.clear()
+        self.append(text, level)
+
+    def copy_selection(self):
+        """Копирование выделенных строк в буфер обмена"""
+        rows = sorted(index.row() for index in self.view.selectedIndexes())
+        if rows:
+            QApplication.clipboard().setText('\n'.join(self.model.text_at(row) for row in rows))
+
+    def _apply_filter(self):
+        self.model.set_shown_levels(level for level, checkbox in self._filters.items()
+                                    if checkbox.isChecked())
+        self.view.scrollToBottom()
+
+    def _update_counts(self):
+        for level, checkbox in self._filters.items():
+            checkbox.setText(f"{_LEVEL_NAMES[level]} ({self.model.counts[level]})")
@@ -4,117 +4,151 @@
 
 import sys
 import os
-from PyQt5.QtWidgets import QApplication
+from contextlib import nullcontext
 from assembler.instructions import INSTRUCTIONS
-from assembler.parser import Parser
-from assembler.compiler import Compiler
-from gui.editor import AssemblerGUI
+from assembler.engine import Assembler
+from assembler.output import code_buffer, write_bin, write_hex, remove_output
+from assembler.source import MappedSource, read_source, iter_code_lines
 
-def compile_file(input_file, output_file=None):
-    """Компиляция файла в CLI режиме"""
-    print(f"Compiling {input_file}...")
+# PyQt5 и модули GUI импортируются только в run_gui():
+# CLI режим не должен тратить время на загрузку Qt
+
+# Имя файла для потокового режима: stdin/stdout
+STDIO = '-'
+
+# Уровни подробности вывода CLI (-q, по умолчанию, -v, -vv)
+QUIET = -1
+NORMAL = 0
+VERBOSE = 1
+TRACE = 2
+
+# Буфер файла листинга: трассировка пишется крупными блоками
+LISTING_BUFFER = 1 << 20
+
+# Период опроса входных файлов в режиме --watch (секунды)
+WATCH_INTERVAL = 0.5
+
+# Файлы от этого размера compile_file читает через mmap и пишет потоково
+MMAP_THRESHOLD = 16 * 1024 * 1024
+
+# Потоковая запись: слов в буфере перед одним write()
+STREAM_BUFFER_WORDS = 64 * 1024
+
+# Опции сборки compile_file, входящие в ключ кэша (предел ошибок добавляется при сборке)
+CACHE_OPTIONS = (('format', 'bin'), ('stop_on_error', True))
+
+def compile_file(input_file, output_file=None, verbosity=NORMAL, listing_file=None, cache=None,
+                 assembler=None, stats=None, max_errors=1, jobs=None):
+    """
+    Компиляция файла в CLI режиме.
+
+    По умолчанию выводится только диагностика и итоговая строка;
+    -v добавляет ход компиляции, -vv - исходник и трассировку каждой
+    инструкции. Та же трассировка пишется в listing_file, если он задан.
+
+    Если передан cache (BuildCache), неизменённый исходник не
+    ассемблируется заново: образ берётся из кэша, диагностика повторяется.
+    Готовый assembler (Assembler) передаётся при повторных сборках,
+    чтобы не создавать Parser/Compiler заново.
+
+    Если передан stats (AssemblyStats), сборка идёт через
+    ProfilingAssembler и кэш не используется: профилю нужна настоящая
+    сборка.
+
+    Файл от MMAP_THRESHOLD байт собирается потоково (_compile_mapped),
+    если не нужны трассировка, листинг или профиль. С jobs (число
+    процессов) файл собирается параллельно по частям (_compile_parallel)
+    при тех же условиях и независимо от размера.
+
+    Сборка останавливается на max_errors-й ошибке (None - собирает все
+    ошибки); по умолчанию - на первой.
+    """
+    if verbosity >= VERBOSE:
+        print(f"Compiling {input_file}...")
     
     try:
-        with open(input_file, 'r') as f:
-            code = f.read()
-        
-        print(f"Code length: {len(code)} characters")
-        print("Code content:")
-        print("=" * 50)
-        print(code)
-        print("=" * 50)
+        if output_file and verbosity < TRACE and not listing_file and stats is None:
+            if jobs is not None:
+                return _compile_parallel(input_file, output_file, verbosity, jobs, max_errors)
+            if os.path.getsize(input_file) >= MMAP_THRESHOLD:
+                return _compile_mapped(input_file, output_file, verbosity, max_errors, assembler)
+
+        code = read_source(input_file)
+
+        # Трассировке нужен разбор строк, поэтому с -vv и --listing
+        # кэш не используется
+        use_cache = (cache is not None and output_file and stats is None
+                     and verbosity < TRACE and not listing_file)
+        if use_cache:
+            options = CACHE_OPTIONS + (('max_errors', max_errors),)
+            key = cache.key(code, options)
+            entry = cache.lookup(key)
+            if entry is not None:
+                return _replay_cached(input_file, output_file, entry, cache, verbosity)
         
-        # Создаем парсер и компилятор
-        from assembler.instructions import INSTRUCTIONS
-        parser = Parser(INSTRUCTIONS)
-        compiler = Compiler(parser)
+        if verbosity >= TRACE:
+            print(f"Code length: {len(code)} characters")
+            print("Code content:")
+            print("=" * 50)
+            print(code)
+            print("=" * 50)
         
+        # Создаем движок ассемблера (один проход с таблицей исправлений)
+        if stats is not None:
+            from assembler.profiling import ProfilingAssembler
+            assembler = ProfilingAssembler(INSTRUCTIONS, stats)
+        elif assembler is None:
+            assembler = Assembler(INSTRUCTIONS)
+        output_timer = stats.phase('output') if stats is not None else nullcontext()
+
         lines = code.split('\n')
-        machine_code = []
-        
-        print(f"\nParsing {len(lines)} lines...")
-        
-        # Первый проход: сбор меток
-        parser.current_address = 0
-        for i, line in enumerate(lines, 1):
-            line_clean = line.strip()
-            if not line_clean or line_clean.startswith('#'):
-                continue
-            
-            # Парсим для сбора меток
-            try:
-                instr_def, args, errors, warnings = parser.parse_line(line, i)
-                if errors:
-                    print(f"Line {i}: Errors: {errors}")
-            except Exception as e:
-                # Игнорируем ошибки парсинга в первом проходе
-                pass
-        
-        print(f"Labels found: {parser.labels}")
-        
-        # Второй проход: компиляция
-        parser.current_address = 0  # Сбрасываем адрес
-        for i, line in enumerate(lines, 1):
-            line_clean = line.rstrip()
-            if not line_clean or line_clean.startswith('#'):
-                print(f"Line {i}: Skipped (empty or comment)")
-                continue
-            
-            print(f"\nLine {i}: '{line_clean}'")
-            
-            try:
-                instr_def, args, errors, warnings = parser.parse_line(line_clean, i)
-                
-                if errors:
-                    for err in errors:
-                        print(f"  ERROR: {err}")
-                    return False
-                
-                if warnings:
-                    for warn in warnings:
-                        print(f"  WARNING: {warn}")
-                
-                if instr_def:
-                    print(f"  Instruction: {instr_def.name}")
-                    print(f"  Arguments: {args}")
-                    print(f"  Format: {instr_def.format_type}")
-                    
-                    try:
-                        errors, warnings = instr_def.validate(args)
-                        if errors:
-                            raise Exception(errors[0])
-                        for warn in warnings:
-                            if warn:
-                                print(f"  WARNING: {warn}")
-                        instruction = compiler.compile_instruction(instr_def, args)
-                        machine_code.append(instruction)
-                        print(f"  Machine code: 0x{instruction:08x}")
-                        print(f"  Binary: {instruction:032b}")
-                    except Exception as e:
-                        print(f"  COMPILATION ERROR: {str(e)}")
-                        return False
-                else:
-                    print(f"  No instruction (label only)")
-                    
-            except Exception as e:
-                print(f"  PARSE ERROR: {str(e)}")
-                return False
-        
-        print(f"\nCompilation completed successfully!")
-        print(f"Generated {len(machine_code)} instructions")
-        
+
+        if verbosity >= VERBOSE:
+            print(f"\nParsing {len(lines)} lines...")
+
+        result = assembler.assemble(lines, max_errors=max_errors)
+        machine_code = result.machine_code
+
+        if verbosity >= VERBOSE:
+            print(f"Labels found: {result.labels}")
+
+        if verbosity >= TRACE or listing_file:
+            if listing_file:
+                listing = open(listing_file, 'w', buffering=LISTING_BUFFER)
+            else:
+                listing = nullcontext(None)
+            with listing as listing_out:
+                _write_trace(result, verbosity >= TRACE, listing_out, max_errors)
+
+        diagnostics = result.diagnostics(max_errors=max_errors)
+        ok = not result.has_errors
+        if use_cache:
+            cache.store(key, ok, machine_code, diagnostics)
+
+        if verbosity < TRACE:
+            _print_diagnostics(diagnostics, verbosity)
+        if not ok:
+            if verbosity > QUIET:
+                print(f"{input_file}: compilation failed")
+            return False
+
         if output_file:
-            with open(output_file, 'wb') as f:
-                for instruction in machine_code:
-                    # Запись 32-битной инструкции как 4 байта (little-endian)
-                    f.write(instruction.to_bytes(4, byteorder='little'))
-            print(f"Saved to {output_file}")
-            print(f"File size: {len(machine_code) * 4} bytes")
+            # Старый файл мог быть жёсткой ссылкой на запись кэша
+            with output_timer:
+                remove_output(output_file)
+                with open(output_file, 'wb') as f:
+                    # Весь образ (little-endian) одной записью
+                    write_bin(f, machine_code)
+            if verbosity > QUIET:
+                print(f"{input_file}: {len(machine_code)} instructions "
+                      f"({len(machine_code) * 4} bytes) -> {output_file}")
         else:
+            if verbosity > QUIET:
+                print(f"{input_file}: {len(machine_code)} instructions")
             # Вывод в hex
             print("\nMachine code:")
-            for i, instr in enumerate(machine_code):
-                print(f"  0x{i*4:08x}: 0x{instr:08x}")
+            with output_timer:
+                write_hex(sys.stdout, machine_code, prefix='  ')
         
         return True
         
@@ -127,35 +161,575 @@ def compile_file(input_file, output_file=None):
         traceback.print_exc()
         return False
 
+def _compile_mapped(input_file, output_file, verbosity, max_errors=1, assembler=None):
+    """
+    Сборка большого файла: исходник читается через mmap, слова пишутся
+    в файл по мере готовности. В памяти нет ни всего текста, ни списка
+    строк, ни результатов по строкам; кэш сборки не используется.
+    assembler - готовый Assembler, как в compile_file.
+    """
+
+    # Образ пишется во временный файл рядом: при ошибке прежний выходной
+    # файл остаётся нетронутым, как при обычной сборке
+    tmp_file = output_file + '.part'
+    try:
+        with MappedSource(input_file) as source:
+            if verbosity >= VERBOSE:
+                print(f"Streaming {source.size} bytes through mmap...")
+            with open(tmp_file, 'wb') as out:
+                written = _stream_words(source, out, verbosity, log=sys.stdout,
+                                        max_errors=max_errors, assembler=assembler)
+        if written is not None:
+            os.replace(tmp_file, output_file)
+    finally:
+        remove_output(tmp_file)
+
+    if written is None:
+        if verbosity > QUIET:
+            print(f"{input_file}: compilation failed")
+        return False
+
+    if verbosity > QUIET:
+        print(f"{input_file}: {written} instructions ({written * 4} bytes) -> {output_file}")
+    return True
+
+def _compile_parallel(input_file, output_file, verbosity, jobs, max_errors=1):
+    """
+    Сборка одного файла в пуле из jobs процессов (assembler.parallel):
+    части файла разбираются и кодируются в воркерах, ссылки на метки
+    дописываются, когда известна таблица меток всего файла.
+    Диагностика та же, что у обычной сборки; кэш сборки не используется.
+    """
+    from assembler.parallel import assemble_file
+
+    # Образ пишется во временный файл рядом, как в _compile_mapped
+    tmp_file = output_file + '.part'
+    try:
+        with open(tmp_file, 'wb') as out:
+            result = assemble_file(input_file, out, jobs, max_errors)
+        if result.ok:
+            os.replace(tmp_file, output_file)
+    finally:
+        remove_output(tmp_file)
+
+    if verbosity >= VERBOSE:
+        print(f"Labels found: {result.labels}; {result.chunks} chunk(s) on "
+              f"{result.workers} worker(s) in {result.elapsed:.2f}s")
+    _print_diagnostics(result.diagnostics, verbosity)
+    if not result.ok:
+        if verbosity > QUIET:
+            print(f"{input_file}: compilation failed")
+        return False
+
+    if verbosity > QUIET:
+        print(f"{input_file}: {result.instructions} instructions "
+              f"({result.instructions * 4} bytes) -> {output_file}")
+    return True
+
+def _replay_cached(input_file, output_file, entry, cache, verbosity):
+    """Результат из кэша: диагностика как при сборке и копия образа"""
+    _print_diagnostics(entry.diagnostics, verbosity)
+    if not entry.ok:
+        if verbosity > QUIET:
+            print(f"{input_file}: compilation failed")
+        return False
+
+    cache.restore(entry, output_file)
+    if verbosity > QUIET:
+        print(f"{input_file}: {entry.instructions} instructions "
+              f"({entry.instructions * 4} bytes) -> {output_file} (cached)")
+    return True
+
+def _print_diagnostics(diagnostics, verbosity):
+    """Вывод диагностики; с -q только ошибки"""
+    for line_num, kind, message in diagnostics:
+        if kind != 'WARNING' or verbosity > QUIET:
+            print(f"Line {line_num}: {kind}: {message}")
+
+def _write_trace(result, to_stdout, listing_out=None, max_errors=1):
+    """Трассировка строк результата в stdout и/или файл листинга (до max_errors-й ошибки)"""
+    error_count = 0
+    for record in result.iter_lines():
+        text = '\n'.join(_trace_lines(record)) + '\n'
+        if to_stdout:
+            sys.stdout.write(text)
+        if listing_out is not None:
+            listing_out.write(text)
+        error_count += len(record.errors)
+        if max_errors is not None and error_count >= max_errors:
+            break
+
+def _trace_lines(record):
+    """Трассировка одной строки исходника (для -vv и листинга)"""
+    lines = [f"\nLine {record.line_num}: '{record.source}'"]
+
+    if record.instr_def:
+        lines.append(f"  Instruction: {record.instr_def.name}")
+        lines.append(f"  Arguments: {record.args}")
+        lines.append(f"  Format: {record.instr_def.format_type}")
+
+    if record.errors:
+        for kind, err in record.errors:
+            lines.append(f"  {kind}: {err}")
+        return lines
+
+    for warn in record.warnings:
+        lines.append(f"  WARNING: {warn}")
+
+    if record.word is not None:
+        lines.append(f"  Machine code: 0x{record.word:08x}")
+        lines.append(f"  Binary: {record.word:032b}")
+    elif not record.instr_def:
+        lines.append(f"  No instruction (label only)")
+    return lines
+
+def stream_file(input_file, output_file, verbosity=NORMAL, max_errors=1):
+    """
+    Потоковая компиляция: строки читаются по одной, а слова пишутся, как
+    только становятся окончательными. '-' означает stdin/stdout.
+
+    Диагностика выводится в stderr, чтобы не смешиваться с машинным кодом.
+    Выходной файл (не stdout) пишется через временный файл рядом, как в
+    _compile_mapped: при ошибке прежний образ остаётся нетронутым.
+    """
+    tmp_file = None if output_file == STDIO else output_file + '.part'
+    try:
+        with _open_source(input_file) as source, \
+             _open_stream(tmp_file or output_file, 'wb', sys.stdout.buffer) as out:
+            written = _stream_words(source, out, verbosity, max_errors=max_errors)
+        if written is not None and tmp_file is not None:
+            os.replace(tmp_file, output_file)
+    except FileNotFoundError:
+        print(f"Error: File '{input_file}' not found", file=sys.stderr)
+        return False
+    finally:
+        if tmp_file is not None:
+            remove_output(tmp_file)
+
+    if written is None:
+        return False
+    if verbosity > QUIET:
+        print(f"Generated {written} instructions", file=sys.stderr)
+    return True
+
+def _open_source(path):
+    """Исходник для потоковой сборки: stdin для '-', иначе файл через mmap"""
+    if path == STDIO:
+        # Байты stdin декодируются так же, как отображённый файл
+        return nullcontext(iter_code_lines(sys.stdin.buffer))
+    return MappedSource(path)
+
+def _open_stream(path, mode, std_stream):
+    """Открытие файла или стандартного потока для '-'"""
+    if path == STDIO:
+        return nullcontext(std_stream)
+    return open(path, mode)
+
+def _stream_words(source, out, verbosity=NORMAL, log=None, max_errors=1, assembler=None):
+    """
+    Запись машинного кода по мере ассемблирования.
+
+    Слова копятся в буфере и пишутся блоками по STREAM_BUFFER_WORDS.
+    Диагностика пишется в log (по умолчанию stderr). После первой ошибки
+    слова больше не пишутся, а сборка идёт дальше только ради
+    диагностики - до max_errors-й ошибки. Возвращает число записанных
+    слов или None при ошибке сборки. assembler - готовый Assembler (по
+    умолчанию создаётся новый).
+    """
+    log = log or sys.stderr
+    if assembler is None:
+        assembler = Assembler(INSTRUCTIONS)
+
+    # В файл с произвольным доступом слово для ссылки вперёд пишется
+    # заглушкой и исправляется на месте (в буфере, если ещё не записано);
+    # в канал (pipe) записи придерживаются до определения метки
+    seekable = out.seekable()
+    start = out.tell() if seekable else 0
+    buffer = code_buffer()
+    flushed = 0   # Слов уже в out
+    written = 0   # Слов в out и в буфере
+    failed = False
+
+    records = assembler.iter_assemble(source, ordered=not seekable, max_errors=max_errors)
+    for record in records:
+        patch = record.index is not None and record.index < written
+
+        for kind, err in record.errors:
+            print(f"Line {record.line_num}: {kind}: {err}", file=log)
+        if record.errors:
+            if not failed:
+                # Слова до первой ошибки уходят в out, как и без буфера
+                write_bin(out, buffer)
+                del buffer[:]
+            failed = True
+        elif not patch and verbosity > QUIET:
+            for warn in record.warnings:
+                print(f"Line {record.line_num}: WARNING: {warn}", file=log)
+
+        if failed or record.index is None:
+            continue
+
+        word = record.word or 0
+        if not patch:
+            buffer.append(word)
+            written += 1
+            if len(buffer) >= STREAM_BUFFER_WORDS:
+                write_bin(out, buffer)
+                flushed += len(buffer)
+                del buffer[:]
+        elif record.index >= flushed:
+            buffer[record.index - flushed] = word
+        else:
+            out.seek(start + record.index * 4)
+            write_bin(out, code_buffer((word,)))
+            out.seek(start + flushed * 4)
+
+    if failed:
+        return None
+    write_bin(out, buffer)
+    return written
+
+def batch_files(patterns, jobs=None, out_dir=None, verbosity=NORMAL, cache=None, max_errors=None):
+    """Пакетная компиляция множества файлов в пуле процессов"""
+    from assembler.batch import expand_inputs, run_batch
+
+    try:
+        input_files = expand_inputs(patterns)
+    except OSError as e:
+        print(f"Error: {e}")
+        return False
+
+    if not input_files:
+        print("Error: no input files matched")
+        return False
+
+    results, summary = run_batch(input_files, jobs, out_dir, cache, max_errors)
+
+    # Результаты уже упорядочены как входные файлы; по умолчанию
+    # перечисляются только файлы с диагностикой
+    for result in results:
+        if verbosity < VERBOSE and result.ok and (verbosity == QUIET or not result.diagnostics):
+            continue
+        status = "ok" if result.ok else "FAILED"
+        if result.cached:
+            status += ", cached"
+        print(f"{result.input_file}: {status} ({result.instructions} instructions)")
+        for diagnostic in result.diagnostics:
+            print(f"  {diagnostic}")
+
+    if verbosity > QUIET:
+        print(summary.format())
+    return summary.failed == 0
+
+def watch_files(input_files, output_file=None, verbosity=NORMAL, cache=None,
+                interval=WATCH_INTERVAL, out_dir=None, max_errors=1):
+    """
+    Режим наблюдения: процесс остаётся запущенным и пересобирает входные
+    файлы, как только меняются их размер или время изменения.
+
+    Таблица инструкций и Parser/Compiler создаются один раз, поэтому
+    пересборка стоит столько же, сколько ассемблирование самого файла.
+    Директив включения файлов в этом ассемблере нет: наблюдаются только
+    сами входные файлы. Завершается по Ctrl+C.
+
+    Args:
+        input_files: вызов без аргументов, возвращающий список входных
+            файлов (glob-шаблоны раскрываются на каждом опросе)
+        output_file: выходной файл для единственного входа или None
+            (имя по входному файлу, в каталоге out_dir, если он задан)
+    """
+    import time
+    from assembler.batch import output_path
+
+    assembler = Assembler(INSTRUCTIONS)
+    stamps = {}  # файл -> (время изменения, размер) при последней сборке
+
+    if verbosity > QUIET:
+        print(f"Watching for changes every {interval:g}s (Ctrl+C to stop)")
+
+    try:
+        while True:
+            for input_file in input_files():
+                try:
+                    stat = os.stat(input_file)
+                    stamp = (stat.st_mtime_ns, stat.st_size)
+                except OSError:
+                    stamp = None
+
+                if stamp == stamps.get(input_file, ()):
+                    continue
+                stamps[input_file] = stamp
+                if stamp is None:
+                    print(f"Error: File '{input_file}' not found")
+                    continue
+
+                start = time.perf_counter()
+                compile_file(input_file, output_file or output_path(input_file, out_dir),
+                             verbosity, cache=cache, assembler=assembler, max_errors=max_errors)
+                if verbosity >= VERBOSE:
+                    print(f"Rebuilt {input_file} in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        return True
+
+def profile_file(input_file, output_file, args):
+    """Компиляция с --profile: отчёт таблицей или JSON в stdout или файл"""
+    from assembler.profiling import AssemblyStats
+
+    stats = AssemblyStats()
+    success = compile_file(input_file, output_file, args.verbosity, args.listing, stats=stats,
+                           max_errors=error_limit(args.max_errors, 1))
+
+    report = stats.to_json() if args.profile_format == 'json' else stats.format_table()
+    if args.profile_file:
+        with open(args.profile_file, 'w') as f:
+            f.write(report + '\n')
+    else:
+        print(report)
+    return success
+
+def disassemble_file(image_file):
+    """Листинг образа в stdout"""
+    from assembler.disassembler import Disassembler, read_image
+
+    try:
+        segments = read_image(image_file)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        return False
+
+    disassembler = Disassembler()
+    for address, words in segments:
+        for text in disassembler.iter_listing(words, address):
+            sys.stdout.write(text)
+    return True
+
+def simulate_file(image_file, max_steps):
+    """Запуск образа в симуляторе; печать статистики и ненулевых регистров"""
+    from assembler.simulator import Simulator
+    from assembler.errors import SimulationError
+
+    simulator = Simulator()
+    try:
+        simulator.load_file(image_file)
+        result = simulator.run(max_steps)
+    except (OSError, ValueError, SimulationError) as e:
+        print(f"Error: {e}")
+        return False
+
+    status = "finished" if result.finished else f"stopped after {max_steps} steps"
+    print(f"{image_file}: {status}, {result.steps} instructions in {result.elapsed:.3f}s "
+          f"({result.instructions_per_second:,.0f} instructions/s), pc=0x{result.pc:08x}")
+    for number, value in enumerate(simulator.regs):
+        if value:
+            print(f"  x{number:<2} = 0x{value:08x} ({value - (1 << 32) if value >> 31 else value})")
+    return result.finished
+
+def parse_args(argv):
+    """Разбор аргументов командной строки"""
+    import argparse
+
+    arg_parser = argparse.ArgumentParser(
+        description="RISC-V 32-bit assembler. Without arguments starts the GUI.")
+    arg_parser.add_argument('input', nargs='?',
+                            help="source file ('-' for stdin)")
+    arg_parser.add_argument('output', nargs='?',
+                            help="output .bin file ('-' for stdout)")
+    arg_parser.add_argument('--batch', nargs='+', metavar='FILE',
+                            help="assemble many files: paths, glob patterns or @manifest")
+    arg_parser.add_argument('-j', '--jobs', type=int,
+                            help="worker processes for --batch, --parallel and --serve "
+                                 "(default: by CPU count)")
+    arg_parser.add_argument('--out-dir',
+                            help="directory for --batch outputs (default: next to inputs)")
+    arg_parser.add_argument('-v', '--verbose', action='count', default=0,
+                            help="-v: show progress, -vv: echo the source and trace every instruction")
+    arg_parser.add_argument('-q', '--quiet', action='store_true',
+                            help="print errors only")
+    arg_parser.add_argument('--max-errors', type=int, metavar='N',
+                            help="stop after N errors, 0 for no limit "
+                                 "(default: 1, or no limit with --batch)")
+    arg_parser.add_argument('--parallel', action='store_true',
+                            help="assemble one large file in chunks on -j worker processes")
+    arg_parser.add_argument('--listing', metavar='FILE',
+                            help="write the per-instruction trace to FILE")
+    arg_parser.add_argument('--profile', action='store_true',
+                            help="report time per assembly phase and instruction counts")
+    arg_parser.add_argument('--profile-format', choices=('table', 'json'), default='table',
+                            help="--profile report format (default: table)")
+    arg_parser.add_argument('--profile-file', metavar='FILE',
+                            help="write the --profile report to FILE instead of stdout")
+    arg_parser.add_argument('--watch', action='store_true',
+                            help="keep running and re-assemble inputs whenever they change")
+    arg_parser.add_argument('--watch-interval', type=float, default=WATCH_INTERVAL, metavar='SECONDS',
+                            help=f"polling period for --watch (default: {WATCH_INTERVAL})")
+    arg_parser.add_argument('--disassemble', metavar='IMAGE',
+                            help="print a listing of a .bin/.hex/.mem image and exit")
+    arg_parser.add_argument('--simulate', metavar='IMAGE',
+                            help="run a .bin/.hex/.mem image in the simulator and print the registers")
+    arg_parser.add_argument('--max-steps', type=int, default=100_000_000, metavar='N',
+                            help="instruction limit for --simulate (default: 100000000)")
+    arg_parser.add_argument('--serve', action='store_true',
+                            help="run an assembler server on a Unix socket (see asm_client.py)")
+    arg_parser.add_argument('--socket', metavar='PATH',
+                            help="socket path for --serve (default: $RISCV_ASM_SOCKET, else "
+                                 "riscv_asm.sock in $XDG_RUNTIME_DIR or in a private 0700 temp directory)")
+    arg_parser.add_argument('--no-cache', action='store_true',
+                            help="always re-assemble; do not read or write the build cache")
+    arg_parser.add_argument('--cache-dir',
+                            help="build cache directory (default: $RISCV_ASM_CACHE_DIR or ~/.cache/riscv_asm)")
+    arg_parser.add_argument('--cache-size', type=int, default=64, metavar='MB',
+                            help="build cache size limit; least recently used entries are evicted (default: 64)")
+    arg_parser.add_argument('--cache-link', action='store_true',
+                            help="hard-link outputs from the cache instead of copying them")
+
+    args = arg_parser.parse_args(argv)
+    if args.disassemble or args.simulate:
+        if args.disassemble and args.simulate:
+            arg_parser.error("--disassemble cannot be combined with --simulate")
+        if args.batch or args.input or args.serve or args.watch:
+            arg_parser.error("--disassemble and --simulate take no other inputs")
+        return args
+    if args.serve:
+        if args.batch or args.input or args.watch:
+            arg_parser.error("--serve takes no input files")
+        args.verbosity = QUIET if args.quiet else NORMAL
+        return args
+    if args.batch and args.input:
+        arg_parser.error("--batch cannot be combined with a positional input file")
+    if not args.batch and not args.input:
+        arg_parser.error("an input file or --batch is required")
+    if args.quiet and args.verbose:
+        arg_parser.error("-q cannot be combined with -v")
+    if args.max_errors is not None and args.max_errors < 0:
+        arg_parser.error("--max-errors must be 0 or more")
+    if args.parallel and (args.batch or args.watch or STDIO in (args.input, args.output)):
+        arg_parser.error("--parallel is only supported when compiling a single file")
+    if args.parallel and (args.listing or args.profile or args.profile_file or args.verbose >= TRACE):
+        arg_parser.error("--parallel cannot be combined with --listing, --profile or -vv")
+    if args.listing and (args.batch or STDIO in (args.input, args.output)):
+        arg_parser.error("--listing is only supported when compiling a single file")
+    if args.watch and STDIO in (args.input, args.output):
+        arg_parser.error("--watch cannot be used with stdin/stdout")
+    if args.profile_file:
+        args.profile = True
+    if args.profile and (args.batch or args.watch or STDIO in (args.input, args.output)):
+        arg_parser.error("--profile is only supported when compiling a single file")
+
+    args.verbosity = QUIET if args.quiet else min(args.verbose, TRACE)
+    return args
+
+def error_limit(max_errors, default):
+    """Предел ошибок из --max-errors: default, если опция не задана; 0 - без предела (None)"""
+    if max_errors is None:
+        return default
+    return max_errors or None
+
+def make_cache(args):
+    """Кэш сборки по аргументам командной строки (None при --no-cache)"""
+    if args.no_cache:
+        return None
+    from assembler.build_cache import BuildCache
+    return BuildCache(args.cache_dir, args.cache_size * 1024 * 1024, args.cache_link)
+
+def watch_from_args(args, cache):
+    """--watch для одного файла или для входов --batch"""
+    if args.batch:
+        from assembler.batch import expand_inputs
+        patterns = args.batch
+
+        def input_files():
+            try:
+                return expand_inputs(patterns)
+            except OSError as e:
+                print(f"Error: {e}")
+                return []
+
+        output_file = None
+    else:
+        def input_files():
+            return [args.input]
+
+        output_file = args.output
+
+    if args.out_dir:
+        os.makedirs(args.out_dir, exist_ok=True)
+    return watch_files(input_files, output_file, args.verbosity, cache,
+                       args.watch_interval, args.out_dir, error_limit(args.max_errors, 1))
+
 def main():
     """Точка входа программы"""
     
     # Проверка аргументов командной строки
     if len(sys.argv) > 1:
         # CLI режим
-        input_file = sys.argv[1]
+        args = parse_args(sys.argv[1:])
+
+        if args.disassemble:
+            success = disassemble_file(args.disassemble)
+            sys.exit(0 if success else 1)
+
+        if args.simulate:
+            success = simulate_file(args.simulate, args.max_steps)
+            sys.exit(0 if success else 1)
+
+        if args.serve:
+            from assembler.server import serve
+            success = serve(args.socket, args.jobs, verbose=args.verbosity > QUIET)
+            sys.exit(0 if success else 1)
+
+        cache = make_cache(args)
+
+        if args.watch:
+            success = watch_from_args(args, cache)
+            sys.exit(0 if success else 1)
+
+        if args.batch:
+            success = batch_files(args.batch, args.jobs, args.out_dir, args.verbosity, cache,
+                                  error_limit(args.max_errors, None))
+            sys.exit(0 if success else 1)
+
+        input_file = args.input
         
-        if len(sys.argv) > 2:
-            output_file = sys.argv[2]
+        if args.output:
+            output_file = args.output
+        elif input_file == STDIO:
+            output_file = STDIO
         else:
             # Генерация имени выходного файла
             base_name = os.path.splitext(input_file)[0]
             output_file = base_name + ".bin"
         
-        success = compile_file(input_file, output_file)
+        max_errors = error_limit(args.max_errors, 1)
+        if STDIO in (input_file, output_file):
+            success = stream_file(input_file, output_file, args.verbosity, max_errors)
+        elif args.profile:
+            success = profile_file(input_file, output_file, args)
+        else:
+            success = compile_file(input_file, output_file, args.verbosity, args.listing, cache,
+                                   max_errors=max_errors,
+                                   jobs=(args.jobs or os.cpu_count() or 1) if args.parallel else None)
         sys.exit(0 if success else 1)
     
     else:
         # GUI режим
-        app = QApplication(sys.argv)
-        
-        # Настройка темной темы (опционально)
-        app.setStyle('Fusion')
-        
-        window = AssemblerGUI()
-        window.show()
-        
-        sys.exit(app.exec_())
+        sys.exit(run_gui())
+
+def run_gui():
+    """Запуск графического интерфейса"""
+    from PyQt5.QtWidgets import QApplication
+    from gui.editor import AssemblerGUI
+
+    app = QApplication(sys.argv)
+    
+    # Настройка темной темы (опционально)
+    app.setStyle('Fusion')
+    
+    window = AssemblerGUI()
+    window.show()
+    
+    return app.exec_()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file